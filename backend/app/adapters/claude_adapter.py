@@ -1,32 +1,121 @@
 """
 Claude Adapter - Implementation of LLM port using Anthropic Claude
 """
-from typing import AsyncGenerator, List, Dict
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import AsyncGenerator, List, Dict, Optional
 import anthropic
 
+from app.adapters.llm_cache_adapter import get_llm_response_cache, response_cache_key
 from app.core.config import settings
 from app.ports.llm import LLMClient
 
-class ClaudeStreamingAdapter(LLMClient):
+logger = logging.getLogger(__name__)
+
+ELEMENT_COACH_SYSTEM = (
+    "You are a thinking coach helping a user apply the 5 Elements of Effective Thinking to an AI-utilization puzzle. "
+    "Your primary job is to train the user to think effectively about how to use AI. "
+    "You coach the THINKING PROCESS — the quality of how they apply the current element matters more than whether they reach the solution."
+)
+
+
+@lru_cache()
+def get_anthropic_client() -> anthropic.AsyncAnthropic:
+    """Process-wide async Anthropic client.
+
+    Every adapter instance shares this client so all LLM calls on a worker
+    reuse one httpx connection pool instead of opening their own.
+    """
+    return anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+
+
+class LLMUsageStats:
+    """Process-wide token counters, split by prompt-cache outcome.
+
+    `cache_read_input_tokens` were served from the prompt cache (billed at a
+    fraction of the input rate); `cache_creation_input_tokens` wrote a new
+    cache entry; `input_tokens` were neither.
+    """
+
+    FIELDS = ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens")
+
     def __init__(self):
-        self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        self.calls = 0
+        self.totals = dict.fromkeys(self.FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def record(self, usage) -> Dict[str, int]:
+        counts = {f: int(getattr(usage, f, 0) or 0) for f in self.FIELDS}
+        with self._lock:
+            self.calls += 1
+            for f, n in counts.items():
+                self.totals[f] += n
+        return counts
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            totals = dict(self.totals)
+            calls = self.calls
+        prompt_tokens = (
+            totals["input_tokens"]
+            + totals["cache_creation_input_tokens"]
+            + totals["cache_read_input_tokens"]
+        )
+        return {
+            "calls": calls,
+            **totals,
+            "cache_read_ratio": round(totals["cache_read_input_tokens"] / prompt_tokens, 3)
+            if prompt_tokens else 0.0,
+        }
+
+
+llm_usage = LLMUsageStats()
+
+
+def _log_usage(call: str, usage, started: float, first_token_at: Optional[float] = None) -> None:
+    counts = llm_usage.record(usage)
+    ttft = f" ttft={(first_token_at - started) * 1000:.0f}ms" if first_token_at else ""
+    logger.info(
+        "claude %s:%s input=%d cache_read=%d cache_write=%d output=%d",
+        call,
+        ttft,
+        counts["input_tokens"],
+        counts["cache_read_input_tokens"],
+        counts["cache_creation_input_tokens"],
+        counts["output_tokens"],
+    )
+
+
+class ClaudeStreamingAdapter(LLMClient):
+    def __init__(self, client: Optional[anthropic.AsyncAnthropic] = None):
+        self.client = client or get_anthropic_client()
         self.model = "claude-sonnet-4-20250514"  # Sonnet 4 for better coaching quality
 
+    @staticmethod
+    async def _timed_text(stream, call: str) -> AsyncGenerator[str, None]:
+        """Yield `stream`'s text, then log time-to-first-token and token usage."""
+        started = time.perf_counter()
+        first_token_at = None
+        async for text in stream.text_stream:
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            yield text
+        final = await stream.get_final_message()
+        _log_usage(call, final.usage, started, first_token_at)
+
     async def generate_stream(self, prompt: str, max_tokens: int = 200) -> AsyncGenerator[str, None]:
         """Generate streaming response from Claude"""
-        with self.client.messages.stream(
+        async with self.client.messages.stream(
             model=self.model,
             max_tokens=max_tokens,
             messages=[
                 {"role": "user", "content": prompt}
             ],
-            system=(
-                "You are a thinking coach helping a user apply the 5 Elements of Effective Thinking to an AI-utilization puzzle. "
-                "Your primary job is to train the user to think effectively about how to use AI. "
-                "You coach the THINKING PROCESS — the quality of how they apply the current element matters more than whether they reach the solution."
-            )
+            system=ELEMENT_COACH_SYSTEM,
         ) as stream:
-            for text in stream.text_stream:
+            async for text in self._timed_text(stream, "generate_stream"):
                 yield text
 
     async def generate_stream_with_system(
@@ -47,8 +136,8 @@ class ClaudeStreamingAdapter(LLMClient):
         )
         if system:
             kwargs["system"] = system
-        with self.client.messages.stream(**kwargs) as stream:
-            for text in stream.text_stream:
+        async with self.client.messages.stream(**kwargs) as stream:
+            async for text in self._timed_text(stream, "generate_stream_with_system"):
                 yield text
 
     async def generate_stream_with_messages(
@@ -63,7 +152,23 @@ class ClaudeStreamingAdapter(LLMClient):
         wants Claude to see proper {role: user|assistant} turns. Cramming
         the conversation into a single user prompt causes the model to
         hallucinate role-prefixed turns ("User: ...") in its output.
+
+        The newest turn carries a cache breakpoint, so the next request in
+        the same conversation reads everything up to it (system prompt
+        included) from the prompt cache. The system prompt gets no breakpoint
+        of its own: its static part is shorter than Sonnet's 1024-token
+        caching minimum, so a marker there would never be used.
         """
+        if messages:
+            last = messages[-1]
+            messages = messages[:-1] + [{
+                "role": last["role"],
+                "content": [{
+                    "type": "text",
+                    "text": last["content"],
+                    "cache_control": {"type": "ephemeral"},
+                }],
+            }]
         kwargs = dict(
             model=self.model,
             max_tokens=max_tokens,
@@ -71,17 +176,39 @@ class ClaudeStreamingAdapter(LLMClient):
         )
         if system:
             kwargs["system"] = system
-        with self.client.messages.stream(**kwargs) as stream:
-            for text in stream.text_stream:
+        async with self.client.messages.stream(**kwargs) as stream:
+            async for text in self._timed_text(stream, "generate_stream_with_messages"):
                 yield text
 
-    async def generate_text(self, prompt: str, system: str = "", max_tokens: int = 1500) -> str:
-        """Generate a complete (non-streaming) response from Claude."""
-        message = self.client.messages.create(
+    async def generate_text(
+        self,
+        prompt: str,
+        system: str = "",
+        max_tokens: int = 1500,
+        cache: bool = False,
+    ) -> str:
+        """Generate a complete (non-streaming) response from Claude.
+
+        `cache=True` serves repeats of the same (model, system, prompt,
+        max_tokens) from the LLM response cache.
+        """
+        if cache:
+            response_cache = get_llm_response_cache()
+            key = response_cache_key(self.model, system, prompt, max_tokens)
+            cached = await response_cache.get(key)
+            if cached is not None:
+                return cached
+            text = await self.generate_text(prompt, system=system, max_tokens=max_tokens)
+            if text:
+                await response_cache.set(key, self.model, text)
+            return text
+
+        started = time.perf_counter()
+        message = await self.client.messages.create(
             model=self.model,
             max_tokens=max_tokens,
             messages=[{"role": "user", "content": prompt}],
             **({"system": system} if system else {}),
         )
+        _log_usage("generate_text", message.usage, started)
         return message.content[0].text if message.content else ""
-    
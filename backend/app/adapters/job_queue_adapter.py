@@ -0,0 +1,114 @@
+"""
+Job queue adapter - durable background jobs in Postgres (migrations 027, 036)
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import List, Optional
+
+from app.adapters.supabase_adapter import get_supabase_client, run_query
+from app.domain.entities import Job
+from app.ports.jobs import JobQueue
+
+logger = logging.getLogger(__name__)
+
+
+class SupabaseJobQueue(JobQueue):
+    """Jobs table + claim_jobs RPC.
+
+    Completion and failure are only recorded while the caller still holds
+    the lease (`locked_by`), so a worker whose lease expired and was
+    reclaimed by another can't overwrite the newer attempt's outcome.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or get_supabase_client()
+
+    @staticmethod
+    def _parse_dt(value):
+        if not value:
+            return None
+        if isinstance(value, datetime):
+            return value
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+    def _to_entity(self, row: dict) -> Job:
+        return Job(
+            id=str(row["id"]),
+            kind=row["kind"],
+            payload=row.get("payload") or {},
+            status=row.get("status") or "queued",
+            attempts=row.get("attempts") or 0,
+            max_attempts=row.get("max_attempts") or 1,
+            run_after=self._parse_dt(row.get("run_after")),
+            locked_by=row.get("locked_by"),
+            locked_until=self._parse_dt(row.get("locked_until")),
+            last_error=row.get("last_error"),
+            created_at=self._parse_dt(row.get("created_at")),
+        )
+
+    async def enqueue(self, kind: str, payload: dict, max_attempts: int = 3) -> Job:
+        # At most one active job per (kind, course_id): the RPC returns the
+        # queued/running one instead of inserting a duplicate (migration 036)
+        result = await run_query(
+            self.client.rpc("enqueue_job", {
+                "p_kind": kind,
+                "p_payload": payload,
+                "p_max_attempts": max_attempts,
+            })
+        )
+        if not result.data:
+            raise ValueError(f"Failed to enqueue {kind} job")
+        return self._to_entity(result.data[0])
+
+    async def claim(self, kind: str, limit: int, worker_id: str, lease_seconds: float) -> List[Job]:
+        if limit <= 0:
+            return []
+        result = await run_query(
+            self.client.rpc("claim_jobs", {
+                "p_kind": kind,
+                "p_limit": limit,
+                "p_worker": worker_id,
+                "p_lease_seconds": int(lease_seconds),
+            })
+        )
+        return [self._to_entity(row) for row in result.data or []]
+
+    async def complete(self, job_id: str, worker_id: str) -> None:
+        await run_query(
+            self.client.table("jobs")
+            .update({
+                "status": "succeeded",
+                "locked_by": None,
+                "locked_until": None,
+                "last_error": None,
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+            })
+            .eq("id", job_id)
+            .eq("locked_by", worker_id)
+        )
+
+    async def fail(
+        self, job_id: str, worker_id: str, error: str, retry_in_seconds: Optional[float]
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        values = {
+            "status": "failed" if retry_in_seconds is None else "queued",
+            "locked_by": None,
+            "locked_until": None,
+            "last_error": error[:2000],
+            "updated_at": now.isoformat(),
+        }
+        if retry_in_seconds is not None:
+            values["run_after"] = (now + timedelta(seconds=retry_in_seconds)).isoformat()
+        await run_query(
+            self.client.table("jobs")
+            .update(values)
+            .eq("id", job_id)
+            .eq("locked_by", worker_id)
+        )
+
+
+@lru_cache()
+def get_job_queue() -> JobQueue:
+    return SupabaseJobQueue()
@@ -0,0 +1,121 @@
+"""
+LLM response cache - reuse answers to repeated, idempotent prompts
+"""
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+from app.adapters.supabase_adapter import get_supabase_client, run_query
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", str(text or "")).strip()
+
+
+def response_cache_key(model: str, system: str, prompt: str, max_tokens: int) -> str:
+    """Stable key for a call; whitespace differences don't produce a new key."""
+    raw = json.dumps([model, _normalize(system), _normalize(prompt), max_tokens])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SupabaseLLMResponseStore:
+    """Persistent tier in `llm_response_cache` (migrations/025_llm_response_cache.sql).
+
+    Shared by every worker and survives restarts. Failures are logged and
+    treated as misses so the cache can never break an LLM call.
+    """
+
+    def __init__(self):
+        self.client = get_supabase_client()
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            result = await run_query(
+                self.client.table("llm_response_cache")
+                .select("response")
+                .eq("key", key)
+                .gt("expires_at", datetime.now(timezone.utc).isoformat())
+            )
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+        return result.data[0]["response"] if result.data else None
+
+    async def set(self, key: str, model: str, response: str, ttl_seconds: float) -> None:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        try:
+            await run_query(
+                self.client.table("llm_response_cache").upsert({
+                    "key": key,
+                    "model": model,
+                    "response": response,
+                    "expires_at": expires_at.isoformat(),
+                })
+            )
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+
+class LLMResponseCache:
+    """In-process TTL/LRU tier in front of an optional persistent store."""
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_seconds: float,
+        store: Optional[SupabaseLLMResponseStore] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.memory: TTLCache[str] = TTLCache("llm_responses", maxsize, ttl_seconds)
+        self.store = store
+        self.store_hits = 0
+        self.store_misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        response = self.memory.get(key)
+        if response is not None or self.store is None:
+            return response
+        response = await self.store.get(key)
+        if response is None:
+            self.store_misses += 1
+            return None
+        self.store_hits += 1
+        self.memory.set(key, response)
+        return response
+
+    async def set(self, key: str, model: str, response: str) -> None:
+        self.memory.set(key, response)
+        if self.store is not None:
+            await self.store.set(key, model, response, self.ttl_seconds)
+
+    def stats(self) -> dict:
+        lookups = self.memory.hits + self.memory.misses
+        hits = self.memory.hits + self.store_hits
+        return {
+            "memory": self.memory.stats(),
+            "persistent": None if self.store is None else {
+                "hits": self.store_hits,
+                "misses": self.store_misses,
+            },
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+        }
+
+
+@lru_cache()
+def get_llm_response_cache() -> LLMResponseCache:
+    store = SupabaseLLMResponseStore() if settings.LLM_CACHE_PERSISTENT else None
+    return LLMResponseCache(
+        maxsize=settings.LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+        store=store,
+    )
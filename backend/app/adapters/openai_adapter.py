@@ -1,10 +1,10 @@
 """
 OpenAI Adapter - For DALL-E image generation with Supabase Storage persistence
 """
+import asyncio
 import logging
-import httpx
-import uuid
 from app.core.config import settings
+from app.services.image_pipeline import ImageStore
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +18,7 @@ except ImportError:
 
 # Try to import Supabase for storage
 try:
-    from supabase import create_client
+    from app.adapters.supabase_adapter import get_supabase_client
     SUPABASE_AVAILABLE = True
 except ImportError:
     SUPABASE_AVAILABLE = False
@@ -30,6 +30,7 @@ class OpenAIImageAdapter:
     def __init__(self):
         self.client = None
         self.supabase = None
+        self.images = None
         
         if not OPENAI_AVAILABLE:
             logger.error("OpenAI package not available")
@@ -49,42 +50,17 @@ class OpenAIImageAdapter:
         # Initialize Supabase for storage
         if SUPABASE_AVAILABLE and settings.SUPABASE_URL and settings.SUPABASE_SERVICE_KEY:
             try:
-                self.supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+                self.supabase = get_supabase_client()
+                self.images = ImageStore(self.supabase, self.STORAGE_BUCKET)
                 logger.info("Supabase storage client initialized for image persistence")
             except Exception as e:
                 logger.warning(f"Failed to initialize Supabase storage: {e}")
     
-    async def _download_image(self, url: str) -> bytes:
-        """Download image from URL and return bytes."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=30.0)
-            response.raise_for_status()
-            return response.content
-    
-    async def _upload_to_supabase(self, image_data: bytes, filename: str) -> str:
-        """Upload image to Supabase Storage and return public URL."""
-        if not self.supabase:
-            raise Exception("Supabase storage not configured")
-        
-        # Upload to storage bucket
-        file_path = f"{filename}"
-        
-        # Use upsert to overwrite if exists
-        result = self.supabase.storage.from_(self.STORAGE_BUCKET).upload(
-            file_path,
-            image_data,
-            file_options={"content-type": "image/png", "upsert": "true"}
-        )
-        
-        # Get public URL
-        public_url = self.supabase.storage.from_(self.STORAGE_BUCKET).get_public_url(file_path)
-        logger.info(f"Image uploaded to Supabase: {public_url[:80]}...")
-        return public_url
-    
-    async def generate_image(self, prompt: str, size: str = "256x256") -> str:
+    async def generate_image(self, prompt: str, size: str = "256x256", prefix: str = "generated") -> str:
         """
-        Generate an image using DALL-E, upload to Supabase Storage, and return permanent URL.
-        Returns empty string if generation fails or API key not configured.
+        Generate an image using DALL-E, store it (plus smaller renditions) in
+        Supabase Storage, and return a permanent URL sized for `size`: the
+        smallest rendition at least that wide, else the original 1024px PNG.
         """
         if not self.client:
             logger.error("OpenAI client not available - cannot generate image")
@@ -92,7 +68,8 @@ class OpenAIImageAdapter:
         
         try:
             logger.info(f"Calling DALL-E with prompt: {prompt[:100]}...")
-            response = self.client.images.generate(
+            response = await asyncio.to_thread(
+                self.client.images.generate,
                 model="dall-e-3",
                 prompt=prompt,
                 size="1024x1024",
@@ -111,14 +88,13 @@ class OpenAIImageAdapter:
                 
             logger.info(f"DALL-E image generated: {temp_url[:80]}...")
             
-            # Download and upload to permanent storage
-            if self.supabase:
+            # Stream to permanent storage and cut renditions off the event loop
+            if self.images:
                 try:
-                    image_data = await self._download_image(temp_url)
-                    filename = f"{uuid.uuid4()}.png"
-                    permanent_url = await self._upload_to_supabase(image_data, filename)
-                    logger.info(f"Image persisted to Supabase Storage: {permanent_url[:80]}...")
-                    return permanent_url
+                    stored = await asyncio.to_thread(self.images.store_from_url, temp_url, prefix)
+                    url = stored.url_for_width(int(size.split("x")[0]))
+                    logger.info(f"Image persisted to Supabase Storage: {url[:80]}...")
+                    return url
                 except Exception as e:
                     logger.error(f"Failed to persist image to Supabase: {e}")
                     # Fall back to temporary URL (will expire)
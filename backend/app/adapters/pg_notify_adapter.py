@@ -0,0 +1,98 @@
+"""
+Postgres LISTEN/NOTIFY bridge - fans course status changes out to every worker
+"""
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.core.status_bus import CourseStatusBus
+
+logger = logging.getLogger(__name__)
+
+# asyncpg is optional; without it (or without DATABASE_URL) status streams
+# only see changes made by their own worker.
+try:
+    import asyncpg
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    ASYNCPG_AVAILABLE = False
+
+CHANNEL = "course_status"  # see migrations/020_course_status_notify.sql
+
+
+class CourseStatusListener:
+    """Holds one LISTEN connection and republishes NOTIFY payloads on the bus.
+
+    Reconnects with backoff if the connection drops. While connected,
+    `bus.remote_connected` is true, so status streams can skip polling.
+    """
+
+    def __init__(self, bus: CourseStatusBus, dsn: str):
+        self.bus = bus
+        self.dsn = dsn
+        self._task: Optional[asyncio.Task] = None
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+            self.bus.publish(
+                str(event["course_id"]),
+                event.get("course_status"),
+                event.get("generation_error"),
+            )
+        except Exception as e:
+            logger.warning(f"Ignoring malformed {CHANNEL} notification: {e}")
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                await conn.add_listener(CHANNEL, self._on_notify)
+                logger.info(f"Listening for {CHANNEL} notifications")
+                self.bus.set_remote_connected(True)
+                delay = 1.0
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _conn: closed.set())
+                await closed.wait()
+                logger.warning(f"{CHANNEL} listener connection closed; reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"{CHANNEL} listener failed ({e}); retrying in {delay:.0f}s")
+            finally:
+                self.bus.set_remote_connected(False)
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+
+    @property
+    def connected(self) -> bool:
+        return self.bus.remote_connected
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def get_course_status_listener(bus: CourseStatusBus) -> Optional[CourseStatusListener]:
+    """Listener for `bus`, or None if DATABASE_URL/asyncpg aren't available."""
+    if not settings.DATABASE_URL:
+        return None
+    if not ASYNCPG_AVAILABLE:
+        logger.warning("DATABASE_URL is set but asyncpg is not installed; course status fan-out disabled")
+        return None
+    return CourseStatusListener(bus, settings.DATABASE_URL)
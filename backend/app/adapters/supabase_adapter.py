@@ -1,36 +1,113 @@
 """
 Supabase Adapter - Implementation of repository ports using Supabase
 """
-from typing import List, Optional
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
 from supabase import create_client, Client
+from supabase.lib.client_options import SyncClientOptions
 from datetime import datetime
 import uuid
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.status_bus import course_status_bus
 from app.domain.entities import (
     User, Session, Response, Hint, SessionStatus, Element, SubElement,
     Puzzle, Component, ElementMessage, DeepUnderstanding,
     Course, IntakeMessage, CoursePuzzle, Thought, ThoughtConnection,
+    CanvasVersion, CanvasTombstone,
 )
 from app.ports.repositories import (
     UserRepository, SessionRepository, ResponseRepository, HintRepository,
     PuzzleRepository, ComponentRepository, ElementMessageRepository,
     DeepUnderstandingRepository, CourseRepository, CoursePuzzleRepository,
-    ThoughtRepository, ThoughtConnectionRepository,
+    ThoughtRepository, ThoughtConnectionRepository, CanvasVersionRepository,
 )
 
+_client_lock = threading.Lock()
+_client: Optional[Client] = None
+_http_client: Optional[httpx.Client] = None
+
+
 def get_supabase_client() -> Client:
-    """Get Supabase client instance"""
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+    """Process-wide Supabase client.
+
+    Built once on first use (or at app startup) and shared by every
+    repository, route module and service, so PostgREST and Storage calls all
+    reuse one keep-alive HTTP/2 connection pool instead of paying a fresh
+    TCP/TLS handshake per client.
+    """
+    global _client, _http_client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _http_client = httpx.Client(
+                    http2=True,
+                    follow_redirects=True,
+                    timeout=httpx.Timeout(120.0),
+                    limits=httpx.Limits(
+                        max_connections=settings.SUPABASE_MAX_CONCURRENCY,
+                        max_keepalive_connections=settings.SUPABASE_MAX_CONCURRENCY,
+                        keepalive_expiry=settings.SUPABASE_KEEPALIVE_EXPIRY,
+                    ),
+                )
+                _client = create_client(
+                    settings.SUPABASE_URL,
+                    settings.SUPABASE_SERVICE_KEY,
+                    options=SyncClientOptions(httpx_client=_http_client),
+                )
+    return _client
+
+
+def close_supabase_client() -> None:
+    """Close the shared connection pool. Only call this at process shutdown."""
+    global _client, _http_client
+    with _client_lock:
+        if _http_client is not None:
+            _http_client.close()
+        _client = None
+        _http_client = None
+
+
+# supabase-py's `.execute()` is a blocking HTTP call. Every query goes through
+# this bounded pool so a DB round-trip never stalls the event loop, and the
+# worker count caps how many requests we have in flight against PostgREST.
+_DB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.SUPABASE_MAX_CONCURRENCY,
+    thread_name_prefix="supabase",
+)
+
+
+async def run_query(query: Any) -> Any:
+    """Execute a PostgREST query builder off the event loop and return its response."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_DB_EXECUTOR, query.execute)
+
+# Users keyed by Clerk id. get_current_user resolves the user on every
+# authenticated request, so serve it from memory; every write below goes
+# through the repository and refreshes the entry.
+_user_cache: TTLCache[User] = TTLCache(
+    "users",
+    maxsize=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
 
 class SupabaseUserRepository(UserRepository):
     def __init__(self):
         self.client = get_supabase_client()
     
     async def get_by_clerk_id(self, clerk_id: str) -> Optional[User]:
-        result = self.client.table("users").select("*").eq("clerk_id", clerk_id).execute()
+        cached = _user_cache.get(clerk_id)
+        if cached:
+            return cached
+        result = await run_query(self.client.table("users").select("*").eq("clerk_id", clerk_id))
         if result.data:
-            return User(**result.data[0])
+            user = User(**result.data[0])
+            _user_cache.set(clerk_id, user)
+            return user
         return None
     
     async def create(self, clerk_id: str, email: Optional[str] = None) -> User:
@@ -38,15 +115,17 @@ class SupabaseUserRepository(UserRepository):
             "clerk_id": clerk_id,
             "email": email,
         }
-        result = self.client.table("users").insert(data).execute()
-        return User(**result.data[0])
+        result = await run_query(self.client.table("users").insert(data))
+        user = User(**result.data[0])
+        _user_cache.set(clerk_id, user)
+        return user
     
     async def get_or_create(self, clerk_id: str, email: Optional[str] = None) -> User:
         user = await self.get_by_clerk_id(clerk_id)
         if user:
             # Sync email if it was missing and we now have it
             if email and not user.email:
-                self.client.table("users").update({"email": email}).eq("clerk_id", clerk_id).execute()
+                await run_query(self.client.table("users").update({"email": email}).eq("clerk_id", clerk_id))
                 user.email = email
             return user
         return await self.create(clerk_id, email)
@@ -58,10 +137,24 @@ class SupabaseUserRepository(UserRepository):
         }
         if avatar_image_url:
             update_data["avatar_image_url"] = avatar_image_url
-        result = self.client.table("users").update(update_data).eq("id", user_id).execute()
-        return User(**result.data[0])
+        result = await run_query(self.client.table("users").update(update_data).eq("id", user_id))
+        user = User(**result.data[0])
+        _user_cache.set(user.clerk_id, user)
+        return user
 
 class SupabaseSessionRepository(SessionRepository):
+    # Columns per read shape; list views skip the long text columns
+    # (understanding_document, thinker_description, conversation_summary)
+    COLUMNS = {
+        "stats": "id, user_id, status, prompts_completed, started_at",
+        "list": (
+            "id, user_id, puzzle_id, problem_description, started_at, ended_at, status, "
+            "prompts_completed, created_at, cube_primary_color, cube_secondary_color, "
+            "cube_complexity, cube_label, cube_image_url"
+        ),
+        "detail": "*",
+    }
+
     def __init__(self):
         self.client = get_supabase_client()
     
@@ -83,6 +176,8 @@ class SupabaseSessionRepository(SessionRepository):
             cube_label=row.get("cube_label"),
             cube_image_url=row.get("cube_image_url"),
             understanding_document=row.get("understanding_document"),
+            conversation_summary=row.get("conversation_summary"),
+            summary_through=datetime.fromisoformat(row["summary_through"].replace("Z", "+00:00")) if row.get("summary_through") else None,
         )
 
     async def create(self, user_id: str, problem_description: str, puzzle_id: str = None) -> Session:
@@ -94,29 +189,31 @@ class SupabaseSessionRepository(SessionRepository):
         }
         if puzzle_id:
             data["puzzle_id"] = puzzle_id
-        result = self.client.table("sessions").insert(data).execute()
+        result = await run_query(self.client.table("sessions").insert(data))
         return self._row_to_session(result.data[0])
     
     async def get_by_id(self, session_id: str) -> Optional[Session]:
-        result = self.client.table("sessions").select("*").eq("id", session_id).execute()
+        result = await run_query(self.client.table("sessions").select("*").eq("id", session_id))
         if result.data:
             return self._row_to_session(result.data[0])
         return None
     
-    async def get_user_sessions(self, user_id: str, limit: int = 50) -> List[Session]:
-        result = self.client.table("sessions").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(limit).execute()
+    async def get_user_sessions(
+        self, user_id: str, limit: int = 50, view: str = "list"
+    ) -> List[Session]:
+        result = await run_query(self.client.table("sessions").select(self.COLUMNS[view]).eq("user_id", user_id).order("created_at", desc=True).limit(limit))
         return [self._row_to_session(row) for row in result.data]
     
     async def get_active_session_for_puzzle(self, user_id: str, puzzle_id: str) -> Optional[Session]:
         """Find an active (in_progress) session for a specific puzzle"""
-        result = self.client.table("sessions").select("*").eq("user_id", user_id).eq("puzzle_id", puzzle_id).eq("status", SessionStatus.IN_PROGRESS.value).order("created_at", desc=True).limit(1).execute()
+        result = await run_query(self.client.table("sessions").select("*").eq("user_id", user_id).eq("puzzle_id", puzzle_id).eq("status", SessionStatus.IN_PROGRESS.value).order("created_at", desc=True).limit(1))
         if result.data:
             return self._row_to_session(result.data[0])
         return None
 
     async def get_active_session_by_description(self, user_id: str, problem_description: str) -> Optional[Session]:
         """Find an active (in_progress) session matching exact problem_description."""
-        result = self.client.table("sessions").select("*").eq("user_id", user_id).eq("problem_description", problem_description).eq("status", SessionStatus.IN_PROGRESS.value).order("created_at", desc=True).limit(1).execute()
+        result = await run_query(self.client.table("sessions").select("*").eq("user_id", user_id).eq("problem_description", problem_description).eq("status", SessionStatus.IN_PROGRESS.value).order("created_at", desc=True).limit(1))
         if result.data:
             return self._row_to_session(result.data[0])
         return None
@@ -131,7 +228,7 @@ class SupabaseSessionRepository(SessionRepository):
             if isinstance(v, datetime):
                 kwargs[k] = v.isoformat()
         
-        result = self.client.table("sessions").update(kwargs).eq("id", session_id).execute()
+        result = await run_query(self.client.table("sessions").update(kwargs).eq("id", session_id))
         return self._row_to_session(result.data[0])
 
     async def delete(self, session_id: str) -> bool:
@@ -139,7 +236,7 @@ class SupabaseSessionRepository(SessionRepository):
         Delete a session. Related responses/hints should cascade via FK constraints.
         Returns True if a row was deleted.
         """
-        result = self.client.table("sessions").delete().eq("id", session_id).execute()
+        result = await run_query(self.client.table("sessions").delete().eq("id", session_id))
         return bool(result.data)
 
 class SupabaseResponseRepository(ResponseRepository):
@@ -156,7 +253,7 @@ class SupabaseResponseRepository(ResponseRepository):
             "word_count": response.word_count,
             "time_spent_seconds": response.time_spent_seconds,
         }
-        result = self.client.table("responses").insert(data).execute()
+        result = await run_query(self.client.table("responses").insert(data))
         row = result.data[0]
         return Response(
             id=row["id"],
@@ -171,7 +268,7 @@ class SupabaseResponseRepository(ResponseRepository):
         )
     
     async def get_session_responses(self, session_id: str) -> List[Response]:
-        result = self.client.table("responses").select("*").eq("session_id", session_id).order("prompt_index").execute()
+        result = await run_query(self.client.table("responses").select("*").eq("session_id", session_id).order("prompt_index"))
         responses = []
         for row in result.data:
             responses.append(Response(
@@ -187,6 +284,17 @@ class SupabaseResponseRepository(ResponseRepository):
             ))
         return responses
 
+    async def get_element_word_counts(self, user_id: str) -> Dict[str, int]:
+        # user_stats is kept current by triggers on responses (migration 021);
+        # users with no row yet fall back to the grouped aggregate.
+        result = await run_query(
+            self.client.table("user_stats").select("element_words").eq("user_id", user_id)
+        )
+        if result.data:
+            return {k: int(v) for k, v in (result.data[0].get("element_words") or {}).items()}
+        result = await run_query(self.client.rpc("user_element_word_counts", {"p_user_id": user_id}))
+        return {row["element"]: int(row["word_count"]) for row in (result.data or [])}
+
 class SupabaseHintRepository(HintRepository):
     def __init__(self):
         self.client = get_supabase_client()
@@ -209,35 +317,35 @@ class SupabaseHintRepository(HintRepository):
             "element_focus": hint.element_focus.value if hint.element_focus else None,
             "patterns_detected": hint.patterns_detected,
         }
-        result = self.client.table("hints").insert(data).execute()
+        result = await run_query(self.client.table("hints").insert(data))
         return self._row_to_hint(result.data[0])
     
     async def get_by_session_id(self, session_id: str) -> Optional[Hint]:
-        result = self.client.table("hints").select("*").eq("session_id", session_id).order("created_at", desc=True).limit(1).execute()
+        result = await run_query(self.client.table("hints").select("*").eq("session_id", session_id).order("created_at", desc=True).limit(1))
         if result.data:
             return self._row_to_hint(result.data[0])
         return None
 
     async def get_hints_for_session(self, session_id: str) -> List[Hint]:
-        result = self.client.table("hints").select("*").eq("session_id", session_id).order("created_at").execute()
+        result = await run_query(self.client.table("hints").select("*").eq("session_id", session_id).order("created_at"))
         return [self._row_to_hint(row) for row in result.data]
 
     async def count_hints_for_puzzle_user(self, user_id: str, puzzle_id: str) -> int:
         """Count nudges a user has used across all sessions for a given puzzle."""
         # Get all session ids for this user + puzzle
-        sessions_result = self.client.table("sessions").select("id").eq("user_id", user_id).eq("puzzle_id", puzzle_id).execute()
+        sessions_result = await run_query(self.client.table("sessions").select("id").eq("user_id", user_id).eq("puzzle_id", puzzle_id))
         if not sessions_result.data:
             return 0
         session_ids = [s["id"] for s in sessions_result.data]
         # Count hints across those sessions
-        hints_result = self.client.table("hints").select("id", count="exact").in_("session_id", session_ids).execute()
+        hints_result = await run_query(self.client.table("hints").select("id", count="exact").in_("session_id", session_ids))
         return hints_result.count or 0
     
     async def update(self, hint_id: str, **kwargs) -> Hint:
         if "element_focus" in kwargs and isinstance(kwargs["element_focus"], Element):
             kwargs["element_focus"] = kwargs["element_focus"].value
         
-        result = self.client.table("hints").update(kwargs).eq("id", hint_id).execute()
+        result = await run_query(self.client.table("hints").update(kwargs).eq("id", hint_id))
         return self._row_to_hint(result.data[0])
 
 
@@ -264,17 +372,17 @@ class SupabasePuzzleRepository(PuzzleRepository):
             "example": puzzle.example,
             "solution": puzzle.solution,
         }
-        result = self.client.table("puzzles").insert(data).execute()
+        result = await run_query(self.client.table("puzzles").insert(data))
         return self._row_to_puzzle(result.data[0])
 
     async def get_by_id(self, puzzle_id: str) -> Optional[Puzzle]:
-        result = self.client.table("puzzles").select("*").eq("id", puzzle_id).execute()
+        result = await run_query(self.client.table("puzzles").select("*").eq("id", puzzle_id))
         if result.data:
             return self._row_to_puzzle(result.data[0])
         return None
 
     async def get_all(self) -> List[Puzzle]:
-        result = self.client.table("puzzles").select("*").order("created_at", desc=True).execute()
+        result = await run_query(self.client.table("puzzles").select("*").order("created_at", desc=True))
         return [self._row_to_puzzle(row) for row in result.data]
 
 
@@ -305,17 +413,17 @@ class SupabaseComponentRepository(ComponentRepository):
             "input_context": component.input_context,
             "output_capability": component.output_capability,
         }
-        result = self.client.table("components").insert(data).execute()
+        result = await run_query(self.client.table("components").insert(data))
         return self._row_to_component(result.data[0])
 
     async def get_by_session_id(self, session_id: str) -> Optional[Component]:
-        result = self.client.table("components").select("*").eq("session_id", session_id).limit(1).execute()
+        result = await run_query(self.client.table("components").select("*").eq("session_id", session_id).limit(1))
         if result.data:
             return self._row_to_component(result.data[0])
         return None
 
     async def get_by_user_id(self, user_id: str, limit: int = 50) -> List[Component]:
-        result = self.client.table("components").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(limit).execute()
+        result = await run_query(self.client.table("components").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(limit))
         return [self._row_to_component(row) for row in result.data]
 
 
@@ -343,39 +451,49 @@ class SupabaseElementMessageRepository(ElementMessageRepository):
         }
         if message.element_applied:
             data["element_applied"] = message.element_applied
-        result = self.client.table("element_messages").insert(data).execute()
+        result = await run_query(self.client.table("element_messages").insert(data))
         return self._row_to_msg(result.data[0])
 
     async def get_by_session_and_prompt(self, session_id: str, prompt_index: int) -> List[ElementMessage]:
-        result = (
+        result = await run_query(
             self.client.table("element_messages")
             .select("*")
             .eq("session_id", session_id)
             .eq("prompt_index", prompt_index)
             .order("created_at")
-            .execute()
         )
         return [self._row_to_msg(row) for row in result.data]
 
     async def get_all_for_session(self, session_id: str) -> List[ElementMessage]:
-        result = (
+        result = await run_query(
             self.client.table("element_messages")
             .select("*")
             .eq("session_id", session_id)
             .order("created_at")
-            .execute()
         )
         return [self._row_to_msg(row) for row in result.data]
 
+    async def get_for_session_since(
+        self, session_id: str, after: Optional[datetime]
+    ) -> List[ElementMessage]:
+        query = (
+            self.client.table("element_messages")
+            .select("*")
+            .eq("session_id", session_id)
+        )
+        if after is not None:
+            query = query.gt("created_at", after.isoformat())
+        result = await run_query(query.order("created_at"))
+        return [self._row_to_msg(row) for row in result.data]
+
     async def get_latest_user_messages_per_prompt(self, session_id: str) -> dict:
         """Get the most recent user message for each prompt_index."""
-        result = (
+        result = await run_query(
             self.client.table("element_messages")
             .select("*")
             .eq("session_id", session_id)
             .eq("role", "user")
             .order("created_at", desc=True)
-            .execute()
         )
         latest = {}
         for row in result.data:
@@ -408,21 +526,30 @@ class SupabaseDeepUnderstandingRepository(DeepUnderstandingRepository):
         # Only include prompt_index if it's set (for backward compatibility)
         if entry.prompt_index:
             data["prompt_index"] = entry.prompt_index
-        result = self.client.table("deep_understanding").insert(data).execute()
+        result = await run_query(self.client.table("deep_understanding").insert(data))
         return self._row_to_entry(result.data[0])
 
     async def get_by_session_id(self, session_id: str) -> list[DeepUnderstanding]:
-        result = (
+        result = await run_query(
             self.client.table("deep_understanding")
             .select("*")
             .eq("session_id", session_id)
             .order("created_at")
-            .execute()
         )
         return [self._row_to_entry(row) for row in result.data]
 
 
 class SupabaseCourseRepository(CourseRepository):
+    # Columns per read shape; "summary" leaves out the intake transcript
+    # and answers, which the courses list never shows
+    COLUMNS = {
+        "summary": (
+            "id, user_id, intake_status, intake_preview, crisp_statement, course_label, "
+            "domain, course_status, generation_error, created_at, updated_at"
+        ),
+        "detail": "*",
+    }
+
     def __init__(self):
         self.client = get_supabase_client()
 
@@ -455,6 +582,7 @@ class SupabaseCourseRepository(CourseRepository):
             user_id=row["user_id"],
             intake_status=row.get("intake_status", "in_progress"),
             intake_messages=messages,
+            intake_preview=row.get("intake_preview"),
             crisp_statement=row.get("crisp_statement"),
             course_label=row.get("course_label"),
             domain=row.get("domain"),
@@ -490,24 +618,33 @@ class SupabaseCourseRepository(CourseRepository):
             "intake_messages": [],
             "course_status": "awaiting_puzzles",
         }
-        result = self.client.table("courses").insert(data).execute()
+        result = await run_query(self.client.table("courses").insert(data))
         return self._row_to_course(result.data[0])
 
     async def get_by_id(self, course_id: str) -> Optional[Course]:
-        result = self.client.table("courses").select("*").eq("id", course_id).execute()
+        result = await run_query(self.client.table("courses").select("*").eq("id", course_id))
         if result.data:
             return self._row_to_course(result.data[0])
         return None
 
-    async def get_user_courses(self, user_id: str, limit: int = 50) -> List[Course]:
-        result = (
+    async def get_status(self, course_id: str) -> Optional[Dict[str, Optional[str]]]:
+        result = await run_query(
             self.client.table("courses")
-            .select("*")
+            .select("course_status, generation_error")
+            .eq("id", course_id)
+        )
+        return result.data[0] if result.data else None
+
+    async def get_user_courses(
+        self, user_id: str, limit: int = 50, view: str = "summary"
+    ) -> List[Course]:
+        result = await run_query(
+            self.client.table("courses")
+            .select(self.COLUMNS[view])
             .eq("user_id", user_id)
             .neq("intake_status", "draft")
             .order("created_at", desc=True)
             .limit(limit)
-            .execute()
         )
         # Belt-and-suspenders: exclude drafts here too. PostgREST `neq` can still
         # return drafts in odd cases; without this, pydantic rejects intake_status=draft.
@@ -517,32 +654,16 @@ class SupabaseCourseRepository(CourseRepository):
         return [self._row_to_course(row) for row in rows]
 
     async def append_intake_message(self, course_id: str, message: IntakeMessage) -> Course:
-        # Read-modify-write. Simpler than a Postgres function and adequate
-        # for one-message-at-a-time intake traffic.
-        existing = (
-            self.client.table("courses")
-            .select("intake_messages,intake_status")
-            .eq("id", course_id)
-            .execute()
+        # Appended server-side (migrations/022_append_intake_message.sql) so
+        # concurrent appends can't overwrite each other.
+        result = await run_query(
+            self.client.rpc(
+                "append_intake_message",
+                {"p_course_id": course_id, "p_message": self._msg_to_dict(message)},
+            )
         )
-        if not existing.data:
+        if not result.data:
             raise ValueError(f"Course {course_id} not found")
-        msgs = existing.data[0].get("intake_messages") or []
-        current_intake_status = existing.data[0].get("intake_status") or "in_progress"
-        msgs.append(self._msg_to_dict(message))
-        next_intake_status = (
-            "in_progress" if current_intake_status == "draft" else current_intake_status
-        )
-        result = (
-            self.client.table("courses")
-            .update({
-                "intake_messages": msgs,
-                "intake_status": next_intake_status,
-                "updated_at": datetime.utcnow().isoformat(),
-            })
-            .eq("id", course_id)
-            .execute()
-        )
         return self._row_to_course(result.data[0])
 
     async def complete_intake(
@@ -570,15 +691,17 @@ class SupabaseCourseRepository(CourseRepository):
             "course_status": "awaiting_puzzles",
             "updated_at": datetime.utcnow().isoformat(),
         }
-        result = self.client.table("courses").update(update).eq("id", course_id).execute()
+        result = await run_query(self.client.table("courses").update(update).eq("id", course_id))
+        course_status_bus.publish(course_id, "awaiting_puzzles")
         return self._row_to_course(result.data[0])
 
     async def abandon(self, course_id: str) -> None:
-        self.client.table("courses").update({
+        await run_query(self.client.table("courses").update({
             "intake_status": "abandoned",
             "course_status": "abandoned",
             "updated_at": datetime.utcnow().isoformat(),
-        }).eq("id", course_id).execute()
+        }).eq("id", course_id))
+        course_status_bus.publish(course_id, "abandoned")
 
     async def update_course_status(
         self,
@@ -603,15 +726,16 @@ class SupabaseCourseRepository(CourseRepository):
             if generation_error is not None:
                 update["generation_error"] = generation_error
 
-        result = (
+        result = await run_query(
             self.client.table("courses")
             .update(update)
             .eq("id", course_id)
-            .execute()
         )
         if not result.data:
             raise ValueError(f"Course {course_id} not found")
-        return self._row_to_course(result.data[0])
+        course = self._row_to_course(result.data[0])
+        course_status_bus.publish(course_id, course.course_status, course.generation_error)
+        return course
 
 
 class SupabaseCoursePuzzleRepository(CoursePuzzleRepository):
@@ -656,7 +780,7 @@ class SupabaseCoursePuzzleRepository(CoursePuzzleRepository):
             raise ValueError(
                 f"current_stage must be 1..3, got {current_stage}"
             )
-        result = (
+        result = await run_query(
             self.client.table("course_puzzles")
             .update(
                 {
@@ -665,7 +789,6 @@ class SupabaseCoursePuzzleRepository(CoursePuzzleRepository):
                 }
             )
             .eq("id", puzzle_id)
-            .execute()
         )
         if not result.data:
             raise ValueError(f"Puzzle {puzzle_id} not found")
@@ -693,42 +816,39 @@ class SupabaseCoursePuzzleRepository(CoursePuzzleRepository):
             }
             for p in puzzles
         ]
-        result = self.client.table("course_puzzles").insert(rows).execute()
+        result = await run_query(self.client.table("course_puzzles").insert(rows))
         # Order by position for determinism
         sorted_rows = sorted(result.data, key=lambda r: r.get("position", 0))
         return [self._row_to_course_puzzle(r) for r in sorted_rows]
 
     async def get_by_course(self, course_id: str) -> List[CoursePuzzle]:
-        result = (
+        result = await run_query(
             self.client.table("course_puzzles")
             .select("*")
             .eq("course_id", course_id)
             .order("position")
-            .execute()
         )
         return [self._row_to_course_puzzle(row) for row in result.data]
 
     async def get_by_id(self, puzzle_id: str) -> Optional[CoursePuzzle]:
-        result = (
+        result = await run_query(
             self.client.table("course_puzzles")
             .select("*")
             .eq("id", puzzle_id)
-            .execute()
         )
         if result.data:
             return self._row_to_course_puzzle(result.data[0])
         return None
 
     async def delete_by_course(self, course_id: str) -> int:
-        existing = (
+        existing = await run_query(
             self.client.table("course_puzzles")
             .select("id")
             .eq("course_id", course_id)
-            .execute()
         )
         count = len(existing.data or [])
         if count:
-            self.client.table("course_puzzles").delete().eq("course_id", course_id).execute()
+            await run_query(self.client.table("course_puzzles").delete().eq("course_id", course_id))
         return count
 
     async def update_status(self, puzzle_id: str, status: str) -> CoursePuzzle:
@@ -736,11 +856,10 @@ class SupabaseCoursePuzzleRepository(CoursePuzzleRepository):
         update: dict = {"status": status, "updated_at": now_iso}
         if status == "completed":
             update["completed_at"] = now_iso
-        result = (
+        result = await run_query(
             self.client.table("course_puzzles")
             .update(update)
             .eq("id", puzzle_id)
-            .execute()
         )
         if not result.data:
             raise ValueError(f"Puzzle {puzzle_id} not found")
@@ -753,14 +872,13 @@ class SupabaseCoursePuzzleRepository(CoursePuzzleRepository):
     ) -> CoursePuzzle:
         if phase not in ("reflect", "bridge"):
             raise ValueError(f"stage3_phase must be 'reflect' or 'bridge', got {phase}")
-        result = (
+        result = await run_query(
             self.client.table("course_puzzles")
             .update({
                 "stage3_phase": phase,
                 "updated_at": datetime.utcnow().isoformat(),
             })
             .eq("id", puzzle_id)
-            .execute()
         )
         if not result.data:
             raise ValueError(f"Puzzle {puzzle_id} not found")
@@ -772,7 +890,7 @@ class SupabaseCoursePuzzleRepository(CoursePuzzleRepository):
         synthesis: str,
     ) -> CoursePuzzle:
         now_iso = datetime.utcnow().isoformat()
-        result = (
+        result = await run_query(
             self.client.table("course_puzzles")
             .update({
                 "synthesis": synthesis,
@@ -782,7 +900,6 @@ class SupabaseCoursePuzzleRepository(CoursePuzzleRepository):
                 "updated_at": now_iso,
             })
             .eq("id", course_puzzle_id)
-            .execute()
         )
         if not result.data:
             raise ValueError(f"Puzzle {course_puzzle_id} not found")
@@ -794,7 +911,7 @@ class SupabaseCoursePuzzleRepository(CoursePuzzleRepository):
         reflection_answers: dict,
     ) -> CoursePuzzle:
         now_iso = datetime.utcnow().isoformat()
-        result = (
+        result = await run_query(
             self.client.table("course_puzzles")
             .update(
                 {
@@ -803,7 +920,6 @@ class SupabaseCoursePuzzleRepository(CoursePuzzleRepository):
                 }
             )
             .eq("id", puzzle_id)
-            .execute()
         )
         if not result.data:
             raise ValueError(f"Puzzle {puzzle_id} not found")
@@ -813,11 +929,10 @@ class SupabaseCoursePuzzleRepository(CoursePuzzleRepository):
         """Return (CoursePuzzle, course_user_id) tuple, or None.
         Uses PostgREST FK-join syntax `courses(user_id)` to fetch the owner
         in one round trip. Matches the ownership-check helper pattern."""
-        result = (
+        result = await run_query(
             self.client.table("course_puzzles")
             .select("*, courses(user_id)")
             .eq("id", course_puzzle_id)
-            .execute()
         )
         if not result.data:
             return None
@@ -865,7 +980,7 @@ class SupabaseThoughtRepository(ThoughtRepository):
             updated_at=self._parse_dt(row.get("updated_at")),
         )
 
-    async def create(
+    async def _insert(
         self,
         course_puzzle_id: str,
         user_id: str,
@@ -875,60 +990,64 @@ class SupabaseThoughtRepository(ThoughtRepository):
         pos_x: float,
         pos_y: float,
         time_spent_seconds: Optional[int],
-        is_nudge: bool = False,
+        is_nudge: bool,
+        kind: str,
     ) -> Thought:
-        # Assign flow_order = max(flow_order) + 1 for this puzzle.
-        # Race-condition tolerant per phase 4b design note — duplicate
-        # flow_order values are acceptable; we sort by created_at as tiebreak.
-        existing = (
-            self.client.table("thoughts")
-            .select("flow_order")
-            .eq("course_puzzle_id", course_puzzle_id)
-            .order("flow_order", desc=True)
-            .limit(1)
-            .execute()
+        # One round-trip: create_thought allocates the next flow_order for
+        # the canvas atomically (migrations/031_thought_flow_counters.sql)
+        result = await run_query(
+            self.client.rpc("create_thought", {
+                "p_course_puzzle_id": course_puzzle_id,
+                "p_user_id": user_id,
+                "p_content": content,
+                "p_element": element,
+                "p_sub_element": sub_element,
+                "p_pos_x": pos_x,
+                "p_pos_y": pos_y,
+                "p_time_spent_seconds": time_spent_seconds,
+                "p_is_nudge": is_nudge,
+                "p_kind": kind,
+            })
         )
-        max_order = 0
-        if existing.data:
-            max_order = existing.data[0].get("flow_order") or 0
-        next_order = max_order + 1
+        if not result.data:
+            raise ValueError(f"Failed to create thought on course puzzle {course_puzzle_id}")
+        return self._row_to_thought(result.data[0])
 
+    async def create(
+        self,
+        course_puzzle_id: str,
+        user_id: str,
+        content: str,
+        element: Optional[str],
+        sub_element: Optional[str],
+        pos_x: float,
+        pos_y: float,
+        time_spent_seconds: Optional[int],
+        is_nudge: bool = False,
+    ) -> Thought:
         # Derive kind from is_nudge for backwards compat
         kind = "nudge" if is_nudge else "thought"
-        data = {
-            "course_puzzle_id": course_puzzle_id,
-            "user_id": user_id,
-            "element": element,
-            "sub_element": sub_element,
-            "content": content,
-            "flow_order": next_order,
-            "time_spent_seconds": time_spent_seconds,
-            "pos_x": pos_x,
-            "pos_y": pos_y,
-            "is_nudge": is_nudge,
-            "kind": kind,
-        }
-        result = self.client.table("thoughts").insert(data).execute()
-        return self._row_to_thought(result.data[0])
+        return await self._insert(
+            course_puzzle_id, user_id, content, element, sub_element,
+            pos_x, pos_y, time_spent_seconds, is_nudge, kind,
+        )
 
     async def count_nudges(self, course_puzzle_id: str) -> int:
-        result = (
+        result = await run_query(
             self.client.table("thoughts")
             .select("id", count="exact")
             .eq("course_puzzle_id", course_puzzle_id)
             .eq("is_nudge", True)
-            .execute()
         )
         # Supabase Python client exposes the exact count via .count when
         # count="exact" is requested; fall back to len(data) defensively.
         return getattr(result, "count", None) or len(result.data or [])
 
     async def get_by_id(self, thought_id: str) -> Optional[Thought]:
-        result = (
+        result = await run_query(
             self.client.table("thoughts")
             .select("*")
             .eq("id", thought_id)
-            .execute()
         )
         if result.data:
             return self._row_to_thought(result.data[0])
@@ -937,14 +1056,16 @@ class SupabaseThoughtRepository(ThoughtRepository):
     async def get_by_course_puzzle(
         self,
         course_puzzle_id: str,
+        changed_since: Optional[int] = None,
     ) -> List[Thought]:
-        result = (
+        query = (
             self.client.table("thoughts")
             .select("*")
             .eq("course_puzzle_id", course_puzzle_id)
-            .order("flow_order")
-            .execute()
         )
+        if changed_since is not None:
+            query = query.gt("version", changed_since)
+        result = await run_query(query.order("flow_order"))
         return [self._row_to_thought(r) for r in result.data]
 
     async def create_reflection(
@@ -958,34 +1079,10 @@ class SupabaseThoughtRepository(ThoughtRepository):
         pos_y: float,
     ) -> Thought:
         """Create a reflection thought (Stage 3). Sets kind='reflection'."""
-        existing = (
-            self.client.table("thoughts")
-            .select("flow_order")
-            .eq("course_puzzle_id", course_puzzle_id)
-            .order("flow_order", desc=True)
-            .limit(1)
-            .execute()
+        return await self._insert(
+            course_puzzle_id, user_id, content, element, sub_element,
+            pos_x, pos_y, None, False, "reflection",
         )
-        max_order = 0
-        if existing.data:
-            max_order = existing.data[0].get("flow_order") or 0
-        next_order = max_order + 1
-
-        data = {
-            "course_puzzle_id": course_puzzle_id,
-            "user_id": user_id,
-            "element": element,
-            "sub_element": sub_element,
-            "content": content,
-            "flow_order": next_order,
-            "time_spent_seconds": None,
-            "pos_x": pos_x,
-            "pos_y": pos_y,
-            "is_nudge": False,
-            "kind": "reflection",
-        }
-        result = self.client.table("thoughts").insert(data).execute()
-        return self._row_to_thought(result.data[0])
 
     async def get_by_kind(
         self,
@@ -993,13 +1090,12 @@ class SupabaseThoughtRepository(ThoughtRepository):
         kind: str,
     ) -> List[Thought]:
         """Return thoughts of a given kind for a course_puzzle."""
-        result = (
+        result = await run_query(
             self.client.table("thoughts")
             .select("*")
             .eq("course_puzzle_id", course_puzzle_id)
             .eq("kind", kind)
             .order("flow_order")
-            .execute()
         )
         return [self._row_to_thought(r) for r in result.data]
 
@@ -1007,14 +1103,13 @@ class SupabaseThoughtRepository(ThoughtRepository):
         self,
         course_puzzle_id: str,
     ) -> Optional[Thought]:
-        result = (
+        result = await run_query(
             self.client.table("thoughts")
             .select("*")
             .eq("course_puzzle_id", course_puzzle_id)
             .eq("is_nudge", False)
             .order("created_at", desc=True)
             .limit(1)
-            .execute()
         )
         if result.data:
             return self._row_to_thought(result.data[0])
@@ -1025,13 +1120,12 @@ class SupabaseThoughtRepository(ThoughtRepository):
         course_puzzle_id: str,
     ) -> List[Thought]:
         """Return user-authored thoughts only (is_nudge=false), ordered by flow_order ASC."""
-        result = (
+        result = await run_query(
             self.client.table("thoughts")
             .select("*")
             .eq("course_puzzle_id", course_puzzle_id)
             .eq("is_nudge", False)
             .order("flow_order")
-            .execute()
         )
         return [self._row_to_thought(r) for r in result.data]
 
@@ -1040,64 +1134,87 @@ class SupabaseThoughtRepository(ThoughtRepository):
         thought_id: str,
         pos_x: float,
         pos_y: float,
+        owner_id: Optional[str] = None,
     ) -> Thought:
         update = {
             "pos_x": pos_x,
             "pos_y": pos_y,
             "updated_at": datetime.utcnow().isoformat(),
         }
-        result = (
+        return await self._update(thought_id, update, owner_id)
+
+    async def update_positions(
+        self,
+        owner_id: str,
+        positions: List[Tuple[str, float, float]],
+    ) -> int:
+        if not positions:
+            return 0
+        # One UPDATE ... FROM for the whole batch (migrations/032_thought_positions.sql)
+        result = await run_query(
+            self.client.rpc("apply_thought_positions", {
+                "p_table": "thoughts",
+                "p_user_id": owner_id,
+                "p_positions": [
+                    {"id": thought_id, "pos_x": x, "pos_y": y}
+                    for thought_id, x, y in positions
+                ],
+            })
+        )
+        return int(result.data or 0)
+
+    async def filter_owned(self, owner_id: str, thought_ids: List[str]) -> List[str]:
+        if not thought_ids:
+            return []
+        result = await run_query(
             self.client.table("thoughts")
-            .update(update)
-            .eq("id", thought_id)
-            .execute()
+            .select("id")
+            .eq("user_id", owner_id)
+            .in_("id", thought_ids)
         )
-        if not result.data:
-            raise ValueError(f"Thought {thought_id} not found")
-        return self._row_to_thought(result.data[0])
+        return [row["id"] for row in result.data or []]
 
     async def update_content(
         self,
         thought_id: str,
         content: str,
+        owner_id: Optional[str] = None,
     ) -> Thought:
         update = {
             "content": content,
             "updated_at": datetime.utcnow().isoformat(),
         }
-        result = (
-            self.client.table("thoughts")
-            .update(update)
-            .eq("id", thought_id)
-            .execute()
-        )
-        if not result.data:
-            raise ValueError(f"Thought {thought_id} not found")
-        return self._row_to_thought(result.data[0])
+        return await self._update(thought_id, update, owner_id)
 
     async def update_tagging(
         self,
         thought_id: str,
         element: Optional[str],
         sub_element: Optional[str],
+        owner_id: Optional[str] = None,
     ) -> Thought:
         update = {
             "element": element,
             "sub_element": sub_element,
             "updated_at": datetime.utcnow().isoformat(),
         }
-        result = (
-            self.client.table("thoughts")
-            .update(update)
-            .eq("id", thought_id)
-            .execute()
-        )
+        return await self._update(thought_id, update, owner_id)
+
+    async def _update(self, thought_id: str, update: dict, owner_id: Optional[str]) -> Thought:
+        query = self.client.table("thoughts").update(update).eq("id", thought_id)
+        if owner_id is not None:
+            query = query.eq("user_id", owner_id)
+        result = await run_query(query)
         if not result.data:
             raise ValueError(f"Thought {thought_id} not found")
         return self._row_to_thought(result.data[0])
 
-    async def delete(self, thought_id: str) -> None:
-        self.client.table("thoughts").delete().eq("id", thought_id).execute()
+    async def delete(self, thought_id: str, owner_id: Optional[str] = None) -> bool:
+        query = self.client.table("thoughts").delete().eq("id", thought_id)
+        if owner_id is not None:
+            query = query.eq("user_id", owner_id)
+        result = await run_query(query)
+        return bool(result.data)
 
 
 class SupabaseThoughtConnectionRepository(ThoughtConnectionRepository):
@@ -1133,13 +1250,12 @@ class SupabaseThoughtConnectionRepository(ThoughtConnectionRepository):
         # exists, return it. Otherwise insert. We fetch-then-insert instead of
         # upsert because PostgREST's upsert requires we send all columns and
         # will overwrite unrelated fields; for a tiny table this is fine.
-        existing = (
+        existing = await run_query(
             self.client.table("thought_connections")
             .select("*")
             .eq("course_puzzle_id", course_puzzle_id)
             .eq("from_thought_id", from_thought_id)
             .eq("to_thought_id", to_thought_id)
-            .execute()
         )
         if existing.data:
             return self._row_to_connection(existing.data[0])
@@ -1150,15 +1266,14 @@ class SupabaseThoughtConnectionRepository(ThoughtConnectionRepository):
             "from_thought_id": from_thought_id,
             "to_thought_id": to_thought_id,
         }
-        result = self.client.table("thought_connections").insert(data).execute()
+        result = await run_query(self.client.table("thought_connections").insert(data))
         return self._row_to_connection(result.data[0])
 
     async def get_by_id(self, connection_id: str) -> Optional[ThoughtConnection]:
-        result = (
+        result = await run_query(
             self.client.table("thought_connections")
             .select("*")
             .eq("id", connection_id)
-            .execute()
         )
         if result.data:
             return self._row_to_connection(result.data[0])
@@ -1167,56 +1282,93 @@ class SupabaseThoughtConnectionRepository(ThoughtConnectionRepository):
     async def get_by_course_puzzle(
         self,
         course_puzzle_id: str,
+        changed_since: Optional[int] = None,
     ) -> List[ThoughtConnection]:
-        result = (
+        query = (
             self.client.table("thought_connections")
             .select("*")
             .eq("course_puzzle_id", course_puzzle_id)
-            .order("created_at")
-            .execute()
         )
+        if changed_since is not None:
+            query = query.gt("version", changed_since)
+        result = await run_query(query.order("created_at"))
         return [self._row_to_connection(r) for r in result.data]
 
-    async def delete(self, connection_id: str) -> None:
-        self.client.table("thought_connections").delete().eq("id", connection_id).execute()
+    async def delete(self, connection_id: str, owner_id: Optional[str] = None) -> bool:
+        query = self.client.table("thought_connections").delete().eq("id", connection_id)
+        if owner_id is not None:
+            query = query.eq("user_id", owner_id)
+        result = await run_query(query)
+        return bool(result.data)
+
+
+class SupabaseCanvasVersionRepository(CanvasVersionRepository):
+    """Reads the counters and tombstones kept by migration 033's triggers."""
+
+    def __init__(self):
+        self.client = get_supabase_client()
+
+    async def get(self, canvas_id: str) -> CanvasVersion:
+        result = await run_query(
+            self.client.table("canvas_versions")
+            .select("version, pruned_through")
+            .eq("canvas_id", canvas_id)
+            .limit(1)
+        )
+        row = result.data[0] if result.data else {}
+        return CanvasVersion(
+            canvas_id=canvas_id,
+            version=int(row.get("version") or 0),
+            pruned_through=int(row.get("pruned_through") or 0),
+        )
+
+    async def get_tombstones(self, canvas_id: str, since: int) -> List[CanvasTombstone]:
+        result = await run_query(
+            self.client.table("canvas_tombstones")
+            .select("item_type, item_id, version")
+            .eq("canvas_id", canvas_id)
+            .gt("version", since)
+            .order("version")
+        )
+        return [
+            CanvasTombstone(item_type=r["item_type"], item_id=r["item_id"], version=r["version"])
+            for r in result.data
+        ]
 
 
 class SupabaseFireStarterRepository:
     def __init__(self, client):
         self.client = client
 
-    def create(self, fire_starter: dict) -> dict:
-        result = self.client.table("fire_starters").insert(fire_starter).execute()
+    async def create(self, fire_starter: dict) -> dict:
+        result = await run_query(self.client.table("fire_starters").insert(fire_starter))
         return result.data[0] if result.data else None
 
-    def list_by_user(self, user_id: str) -> list:
-        result = (
+    async def list_by_user(self, user_id: str) -> list:
+        result = await run_query(
             self.client.table("fire_starters")
             .select("*")
             .eq("user_id", user_id)
             .order("created_at", desc=True)
-            .execute()
         )
         return result.data or []
 
-    def list_by_course(self, course_id: str) -> list:
-        result = (
+    async def list_by_course(self, course_id: str) -> list:
+        result = await run_query(
             self.client.table("fire_starters")
             .select("*")
             .eq("course_id", course_id)
             .order("created_at", desc=True)
-            .execute()
         )
         return result.data or []
 
-    def get(self, fire_starter_id: str) -> dict | None:
+    async def get(self, fire_starter_id: str) -> dict | None:
         try:
-            result = (
+            result = await run_query(
                 self.client.table("fire_starters")
                 .select("*")
                 .eq("id", fire_starter_id)
                 .single()
-                .execute()
             )
             return result.data
         except Exception:
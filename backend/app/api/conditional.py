@@ -0,0 +1,33 @@
+"""
+Conditional GET helpers for versioned canvas payloads.
+"""
+from typing import Optional
+
+from fastapi import Response
+
+# Browsers may keep the payload but must revalidate it (If-None-Match) first
+CANVAS_CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+
+def version_etag(version: int) -> str:
+    return f'"v{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, **CANVAS_CACHE_HEADERS})
+
+
+def set_version_headers(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers.update(CANVAS_CACHE_HEADERS)
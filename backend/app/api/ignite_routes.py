@@ -3,20 +3,32 @@ Ignite mode — application workspace (ported patterns from Weaponry, DramaRama
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-
-from fastapi import APIRouter, Depends, HTTPException, Response
+import math
+from typing import AsyncIterator
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.position_buffer import PositionWriteBuffer
 from app.core.security import get_current_user
 from app.core.rate_limiter import rate_limit_user
 from app.adapters.supabase_adapter import (
     get_supabase_client,
+    run_query,
     SupabaseCourseRepository,
     SupabaseCoursePuzzleRepository,
     SupabaseFireStarterRepository,
+    SupabaseCanvasVersionRepository,
 )
 from app.adapters.claude_adapter import ClaudeStreamingAdapter
+from app.api.schemas import ThoughtPositionsRequest, ThoughtPositionsResponse
+from app.api.conditional import etag_matches, not_modified, set_version_headers, version_etag
 from app.api.streaming import sse_stream, streaming_sse_response
+from app.domain.entities import CoursePuzzle
 from app.domain.services import (
     ignite_guide_system_prompt,
     ignite_node_nudge_prompt,
@@ -33,9 +45,38 @@ client = get_supabase_client()
 course_repo = SupabaseCourseRepository()
 puzzle_repo = SupabaseCoursePuzzleRepository()
 fire_starter_repo = SupabaseFireStarterRepository(client)
+canvas_version_repo = SupabaseCanvasVersionRepository()
 llm = ClaudeStreamingAdapter()
 
 
+async def _apply_positions(user_id: str, rows: list[tuple[str, float, float]]) -> int:
+    if not rows:
+        return 0
+    res = await run_query(client.rpc("apply_thought_positions", {
+        "p_table": "ignite_thoughts",
+        "p_user_id": user_id,
+        "p_positions": [{"id": tid, "pos_x": x, "pos_y": y} for tid, x, y in rows],
+    }))
+    return int(res.data or 0)
+
+
+# Drag positions, written per user in one batch (app.core.position_buffer)
+ignite_positions = PositionWriteBuffer(
+    "ignite_positions",
+    _apply_positions,
+    interval_seconds=settings.POSITION_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.POSITION_BUFFER_MAX_PENDING,
+)
+
+# (user id, thought id) pairs seen to carry that user_id; the bulk endpoint
+# queues these without an ownership query (see app.api.routes)
+_position_owner_cache: TTLCache[bool] = TTLCache(
+    "ignite_position_owners",
+    maxsize=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CANVAS_OWNER_CACHE_TTL_SECONDS,
+)
+
+
 CANVAS_CENTER = 15800.0
 TERRAIN_BASE_X = CANVAS_CENTER - 1100.0
 TERRAIN_BASE_Y = CANVAS_CENTER - 520.0
@@ -171,13 +212,89 @@ def _parse_json_obj(raw: str) -> dict:
         raise
 
 
-def _verify_problem(problem_id: str, user_id: str) -> dict:
-    res = (
+def _thought_row(
+    content: str,
+    *,
+    pos_x: float,
+    pos_y: float,
+    flow_order: int,
+    element: str | None = None,
+    sub_element: str | None = None,
+    is_terrain: bool = False,
+    is_fire_starter_node: bool = False,
+    terrain_type: str | None = None,
+) -> dict:
+    # Every row carries the same keys so PostgREST accepts the batch as one insert.
+    return {
+        "content": content,
+        "element": element,
+        "sub_element": sub_element,
+        "pos_x": pos_x,
+        "pos_y": pos_y,
+        "is_terrain": is_terrain,
+        "is_fire_starter_node": is_fire_starter_node,
+        "terrain_type": terrain_type,
+        "flow_order": flow_order,
+    }
+
+
+async def _insert_ignite_graph(
+    problem_id: str,
+    user_id: str,
+    thoughts: list[dict],
+    connections: list[dict] | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """Insert `thoughts` and `connections`; return the new thought rows and
+    connection rows, each in input order.
+
+    Connection endpoints are `from_index`/`to_index` (position in `thoughts`)
+    or `from_thought_id`/`to_thought_id` (an existing thought). Costs one
+    multi-row insert per table, or a single transactional call with
+    IGNITE_GRAPH_RPC (migrations/035_ignite_graph_connections.sql).
+    """
+    if not thoughts:
+        return [], []
+    connections = connections or []
+    if settings.IGNITE_GRAPH_RPC:
+        res = await run_query(client.rpc("create_ignite_graph", {
+            "p_problem_id": problem_id,
+            "p_user_id": user_id,
+            "p_thoughts": thoughts,
+            "p_connections": connections,
+        }))
+        graph = res.data or {}
+        return graph.get("thoughts") or [], graph.get("connections") or []
+
+    res = await run_query(client.table("ignite_thoughts").insert([
+        {"ignite_problem_id": problem_id, "user_id": user_id, **t} for t in thoughts
+    ]))
+    created = res.data or []
+    ids = [row["id"] for row in created]
+
+    def endpoint(c: dict, side: str) -> str:
+        if f"{side}_thought_id" in c:
+            return c[f"{side}_thought_id"]
+        return ids[c[f"{side}_index"]]
+
+    if not connections:
+        return created, []
+    linked = await run_query(client.table("ignite_thought_connections").insert([
+        {
+            "ignite_problem_id": problem_id,
+            "from_thought_id": endpoint(c, "from"),
+            "to_thought_id": endpoint(c, "to"),
+        }
+        for c in connections
+    ]))
+    return created, linked.data or []
+
+
+async def _verify_problem(problem_id: str, user_id: str) -> dict:
+    res = await run_query(
         client.table("ignite_problems")
         .select("*")
         .eq("id", problem_id)
         .single()
-        .execute()
     )
     row = res.data
     if not row or row.get("user_id") != user_id:
@@ -190,101 +307,41 @@ async def list_ignite_problems(
     course_id: str | None = None,
     current_user: dict = Depends(get_current_user),
 ):
-    """List active Ignite problems for the signed-in user."""
+    """List active Ignite problems for the signed-in user.
+
+    `user_thought_count` is a trigger-maintained column
+    (migrations/024_ignite_user_thought_count.sql), so this is one query no
+    matter how large the canvases get.
+    """
     user = current_user["db_user"]
     q = (
-        client.table("ignite_problems")
-        .select("id, title, description, course_id, status, created_at")
-        .eq("user_id", user.id)
-        .order("created_at", desc=True)
-    )
-    if course_id:
-        q = q.eq("course_id", course_id)
-    res = q.execute()
-    problems = res.data or []
-    if not problems:
-        return {"problems": []}
-
-    ids = [p["id"] for p in problems]
-    th_res = (
-        client.table("ignite_thoughts")
-        .select("ignite_problem_id, is_terrain, is_fire_starter_node")
-        .in_("ignite_problem_id", ids)
-        .execute()
-    )
-    user_counts: dict[str, int] = {pid: 0 for pid in ids}
-    for row in th_res.data or []:
-        pid = row.get("ignite_problem_id")
-        if not pid:
-            continue
-        if row.get("is_terrain") or row.get("is_fire_starter_node"):
-            continue
-        user_counts[str(pid)] = user_counts.get(str(pid), 0) + 1
-
-    # Re-fetch with applied_fire_starter_id for status pills
-    q2 = (
         client.table("ignite_problems")
         .select(
-            "id, title, description, course_id, status, created_at, applied_fire_starter_id"
+            "id, title, description, course_id, status, created_at, "
+            "applied_fire_starter_id, user_thought_count"
         )
         .eq("user_id", user.id)
-        .in_("id", ids)
         .order("created_at", desc=True)
     )
     if course_id:
-        q2 = q2.eq("course_id", course_id)
-    enriched = q2.execute().data or problems
-    for p in enriched:
-        p["user_thought_count"] = user_counts.get(str(p["id"]), 0)
-    return {"problems": enriched}
+        q = q.eq("course_id", course_id)
+    res = await run_query(q)
+    return {"problems": res.data or []}
 
 
-@router.post("/ignite")
-async def create_ignite_problem(
-    payload: dict,
-    current_user: dict = Depends(get_current_user),
-):
-    """Create terrain + match Forge session + apply Fire Starter chain."""
-    user = current_user["db_user"]
-    title = (payload.get("title") or "").strip()
-    description = (payload.get("description") or "").strip()
-    course_id = (payload.get("course_id") or "").strip()
-    if not title or not description or not course_id:
-        raise HTTPException(status_code=400, detail="title, description, and course_id are required")
-
-    course = await course_repo.get_by_id(course_id)
-    if not course or course.user_id != user.id:
-        raise HTTPException(status_code=403, detail="Not your course")
+async def _map_terrain(
+    pid: str, user_id: str, title: str, description: str
+) -> tuple[list[dict], list[dict], list[dict]]:
+    """Terrain stage: LLM terrain map, persisted as soon as it parses.
 
-    starters = fire_starter_repo.list_by_course(course_id)
-    if not starters:
-        raise HTTPException(
-            status_code=400,
-            detail="Earn at least one Fire Starter in Forge for this goal before Ignite.",
-        )
-
-    ins = (
-        client.table("ignite_problems")
-        .insert(
-            {
-                "user_id": user.id,
-                "course_id": course_id,
-                "title": title,
-                "description": description,
-                "status": "active",
-            }
-        )
-        .execute()
-    )
-    problem = ins.data[0]
-    pid = problem["id"]
-
-    # --- Terrain mapping ---
+    Returns (terrain_nodes, created thought rows, created connection rows).
+    """
     try:
         raw_terrain = await llm.generate_text(
             prompt=build_terrain_mapping_prompt(title, description),
             system="Return ONLY JSON.",
             max_tokens=2000,
+            cache=True,
         )
         terrain = _parse_json_obj(raw_terrain)
     except Exception as e:
@@ -305,55 +362,39 @@ async def create_ignite_problem(
         ]
 
     terrain_positions = _terrain_positions(terrain_nodes)
-    terrain_ids: list[str] = []
+    terrain_rows: list[dict] = []
     for i, n in enumerate(terrain_nodes):
         content = (n.get("content") or "Note")[:220]
         tt = (n.get("terrain_type") or "fact").lower()
         if tt not in VALID_TERRAIN_TYPES:
             tt = "uncertainty"
         px, py = terrain_positions[i] if i < len(terrain_positions) else (TERRAIN_BASE_X, TERRAIN_BASE_Y)
-        row = (
-            client.table("ignite_thoughts")
-            .insert(
-                {
-                    "ignite_problem_id": pid,
-                    "user_id": user.id,
-                    "content": content,
-                    "element": None,
-                    "sub_element": None,
-                    "pos_x": px,
-                    "pos_y": py,
-                    "is_terrain": True,
-                    "is_fire_starter_node": False,
-                    "terrain_type": tt,
-                    "flow_order": i + 1,
-                }
-            )
-            .execute()
+        terrain_rows.append(
+            _thought_row(content, pos_x=px, pos_y=py, flow_order=i + 1, is_terrain=True, terrain_type=tt)
         )
-        terrain_ids.append(row.data[0]["id"])
 
+    terrain_links: list[dict] = []
     for c in terrain.get("connections") or []:
         try:
             fi = int(c.get("from_index"))
             ti = int(c.get("to_index"))
         except (TypeError, ValueError):
             continue
-        if 0 <= fi < len(terrain_ids) and 0 <= ti < len(terrain_ids) and fi != ti:
-            client.table("ignite_thought_connections").insert(
-                {
-                    "ignite_problem_id": pid,
-                    "from_thought_id": terrain_ids[fi],
-                    "to_thought_id": terrain_ids[ti],
-                }
-            ).execute()
+        if 0 <= fi < len(terrain_rows) and 0 <= ti < len(terrain_rows) and fi != ti:
+            terrain_links.append({"from_index": fi, "to_index": ti})
 
-    terrain_summary = [
-        {"content": n.get("content"), "terrain_type": n.get("terrain_type")}
-        for n in terrain_nodes
-    ]
+    created, linked = await _insert_ignite_graph(pid, user_id, terrain_rows, terrain_links)
+    return terrain_nodes, created, linked
+
+
+async def _match_fire_starter(
+    course_id: str, description: str, starters: list[dict]
+) -> tuple[dict, str | None, CoursePuzzle | None]:
+    """Match stage: pick the Forge puzzle (and its Fire Starter) closest to the problem.
 
-    # --- Match Forge puzzle ---
+    Independent of the terrain, so it runs alongside `_map_terrain`.
+    Returns (fire starter row, matched course_puzzle_id, matched puzzle).
+    """
     puzzles = await puzzle_repo.get_by_course(course_id)
     candidates = []
     for p in puzzles:
@@ -394,6 +435,29 @@ async def create_ignite_problem(
             starters[0],
         )
 
+    puzzle = None
+    if matched_puzzle_id:
+        puzzle = next((p for p in puzzles if str(p.id) == str(matched_puzzle_id)), None)
+        if puzzle is None:
+            puzzle = await puzzle_repo.get_by_id(str(matched_puzzle_id))
+    return fs_row, matched_puzzle_id, puzzle
+
+
+async def _apply_fire_starter(
+    pid: str,
+    user_id: str,
+    title: str,
+    description: str,
+    terrain_nodes: list[dict],
+    terrain_ids: list[str],
+    fs_row: dict,
+    puzzle: CoursePuzzle | None,
+) -> tuple[dict, list[dict], list[dict]]:
+    """Fire Starter stage: needs both the terrain and the match.
+
+    Returns (LLM payload, created Fire Starter thought rows, created
+    connection rows, including the link from the anchoring terrain node).
+    """
     combo = fs_row.get("element_combination") or []
     if isinstance(combo, str):
         try:
@@ -401,14 +465,11 @@ async def create_ignite_problem(
         except Exception:
             combo = []
 
-    puzzle = await puzzle_repo.get_by_id(str(matched_puzzle_id)) if matched_puzzle_id else None
-    ptitle = puzzle.title if puzzle else "your Forge session"
-    puzzle_text = puzzle.puzzle_text if puzzle else ""
-    primary_el = puzzle.primary_element if puzzle else "synthesis"
-    fs_name = fs_row.get("name") or "your Fire Starter"
-    fs_desc = fs_row.get("description") or ""
+    terrain_summary = [
+        {"content": n.get("content"), "terrain_type": n.get("terrain_type")}
+        for n in terrain_nodes
+    ]
 
-    # --- Apply Fire Starter (applied thinking moves) ---
     fs_payload: dict = {}
     try:
         raw_fs = await llm.generate_text(
@@ -416,11 +477,11 @@ async def create_ignite_problem(
                 problem_title=title,
                 problem_description=description,
                 terrain_json=json.dumps(terrain_summary, ensure_ascii=False),
-                puzzle_title=ptitle,
-                puzzle_text=puzzle_text,
-                primary_element=primary_el,
-                fire_starter_name=fs_name,
-                fire_starter_description=fs_desc,
+                puzzle_title=puzzle.title if puzzle else "your Forge session",
+                puzzle_text=puzzle.puzzle_text if puzzle else "",
+                primary_element=puzzle.primary_element if puzzle else "synthesis",
+                fire_starter_name=fs_row.get("name") or "your Fire Starter",
+                fire_starter_description=fs_row.get("description") or "",
                 element_combination_json=json.dumps(combo, ensure_ascii=False),
             ),
             system="Return ONLY JSON.",
@@ -459,8 +520,7 @@ async def create_ignite_problem(
         anchor_idx = 0
 
     fs_nodes_sorted = sorted(fs_nodes, key=lambda n: int(n.get("flow_order") or 0))
-    fs_ids: list[str] = []
-    prev_fs_id: str | None = None
+    fs_rows: list[dict] = []
     for n in fs_nodes_sorted[:8]:
         el_code = str(n.get("element") or "")
         el_base, sub = _element_code_to_storage(el_code)
@@ -470,55 +530,103 @@ async def create_ignite_problem(
         content = (n.get("content") or "")[:400]
         if not content.strip():
             continue
-        flow_order = int(n.get("flow_order") or len(fs_ids) + 1)
+        flow_order = int(n.get("flow_order") or len(fs_rows) + 1)
         px, py = _fire_starter_position(flow_order)
-        nrow = (
-            client.table("ignite_thoughts")
-            .insert(
-                {
-                    "ignite_problem_id": pid,
-                    "user_id": user.id,
-                    "content": content,
-                    "element": el_base,
-                    "sub_element": sub,
-                    "pos_x": px,
-                    "pos_y": py,
-                    "is_terrain": False,
-                    "is_fire_starter_node": True,
-                    "terrain_type": None,
-                    "flow_order": flow_order,
-                }
+        fs_rows.append(
+            _thought_row(
+                content,
+                pos_x=px,
+                pos_y=py,
+                flow_order=flow_order,
+                element=el_base,
+                sub_element=sub,
+                is_fire_starter_node=True,
             )
-            .execute()
         )
-        nid = nrow.data[0]["id"]
-        fs_ids.append(nid)
-        if prev_fs_id:
-            client.table("ignite_thought_connections").insert(
-                {
-                    "ignite_problem_id": pid,
-                    "from_thought_id": prev_fs_id,
-                    "to_thought_id": nid,
-                }
-            ).execute()
-        prev_fs_id = nid
 
-    if fs_ids and terrain_ids:
-        client.table("ignite_thought_connections").insert(
-            {
-                "ignite_problem_id": pid,
-                "from_thought_id": terrain_ids[anchor_idx],
-                "to_thought_id": fs_ids[0],
-            }
-        ).execute()
+    # Chain the applied moves in order, anchored to the chosen terrain node.
+    fs_links = [{"from_index": k - 1, "to_index": k} for k in range(1, len(fs_rows))]
+    if fs_rows and terrain_ids:
+        fs_links.append({"from_thought_id": terrain_ids[anchor_idx], "to_index": 0})
+    created, linked = await _insert_ignite_graph(pid, user_id, fs_rows, fs_links)
+    return fs_payload, created, linked
 
-    if matched_puzzle_id:
-        client.table("ignite_problems").update(
+
+async def _validate_ignite_create(payload: dict, user) -> tuple[str, str, str, list[dict]]:
+    title = (payload.get("title") or "").strip()
+    description = (payload.get("description") or "").strip()
+    course_id = (payload.get("course_id") or "").strip()
+    if not title or not description or not course_id:
+        raise HTTPException(status_code=400, detail="title, description, and course_id are required")
+
+    course = await course_repo.get_by_id(course_id)
+    if not course or course.user_id != user.id:
+        raise HTTPException(status_code=403, detail="Not your course")
+
+    starters = await fire_starter_repo.list_by_course(course_id)
+    if not starters:
+        raise HTTPException(
+            status_code=400,
+            detail="Earn at least one Fire Starter in Forge for this goal before Ignite.",
+        )
+    return title, description, course_id, starters
+
+
+async def _ignite_pipeline(
+    user, title: str, description: str, course_id: str, starters: list[dict]
+) -> AsyncIterator[dict]:
+    """Create an Ignite problem stage by stage, yielding a progress event per stage.
+
+    Terrain mapping and puzzle matching don't depend on each other and run
+    concurrently; each stage's nodes are persisted (and reported) as soon as
+    they parse. The Fire Starter application waits for both.
+    """
+    ins = await run_query(
+        client.table("ignite_problems")
+        .insert(
             {
-                "applied_fire_starter_id": fs_row["id"],
-                "matched_course_puzzle_id": matched_puzzle_id,
+                "user_id": user.id,
+                "course_id": course_id,
+                "title": title,
+                "description": description,
+                "status": "active",
             }
-        ).eq("id", pid).execute()
+        )
+    )
+    pid = ins.data[0]["id"]
+    yield {"stage": "created", "ignite_problem_id": pid}
+
+    terrain_task = asyncio.create_task(_map_terrain(pid, user.id, title, description))
+    match_task = asyncio.create_task(_match_fire_starter(course_id, description, starters))
+    try:
+        pending = {terrain_task, match_task}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if terrain_task in done:
+                terrain_nodes, terrain_created, terrain_connections = terrain_task.result()
+                yield {
+                    "stage": "terrain",
+                    "thoughts": terrain_created,
+                    "connections": terrain_connections,
+                }
+            if match_task in done:
+                fs_row, matched_puzzle_id, puzzle = match_task.result()
+                yield {
+                    "stage": "matched",
+                    "matched_course_puzzle_id": matched_puzzle_id,
+                    "fire_starter_id": fs_row.get("id"),
+                    "matched_puzzle_title": puzzle.title if puzzle else None,
+                }
+    finally:
+        # Client went away (or a stage failed): don't leave the other stage running.
+        for task in (terrain_task, match_task):
+            task.cancel()
+
+    terrain_ids = [row["id"] for row in terrain_created]
+    fs_payload, fs_created, fs_connections = await _apply_fire_starter(
+        pid, user.id, title, description, terrain_nodes, terrain_ids, fs_row, puzzle
+    )
+    yield {"stage": "fire_starter", "thoughts": fs_created, "connections": fs_connections}
 
     match_reasoning = (
         fs_payload.get("match_reasoning")
@@ -533,11 +641,11 @@ async def create_ignite_problem(
         or "Walk the chain on the right, then add your own thoughts where the terrain still has gaps."
     )
 
-    if fs_ids:
+    if fs_created:
         msg = _build_ignite_opening_message(
             terrain_nodes=terrain_nodes,
-            matched_puzzle_title=ptitle,
-            fire_starter_name=fs_name,
+            matched_puzzle_title=puzzle.title if puzzle else "your Forge session",
+            fire_starter_name=fs_row.get("name") or "your Fire Starter",
             match_reasoning=str(match_reasoning),
             insights_after_applying=str(insights),
             suggested_next_step=str(next_step),
@@ -549,52 +657,120 @@ async def create_ignite_problem(
             "if the chain is missing."
         )
 
-    client.table("ignite_chat_messages").insert(
-        {
-            "ignite_problem_id": pid,
-            "user_id": user.id,
-            "role": "assistant",
-            "content": msg,
-            "metadata": {},
-        }
-    ).execute()
+    writes = [
+        run_query(client.table("ignite_chat_messages").insert(
+            {
+                "ignite_problem_id": pid,
+                "user_id": user.id,
+                "role": "assistant",
+                "content": msg,
+                "metadata": {},
+            }
+        ))
+    ]
+    if matched_puzzle_id:
+        writes.append(run_query(client.table("ignite_problems").update(
+            {
+                "applied_fire_starter_id": fs_row["id"],
+                "matched_course_puzzle_id": matched_puzzle_id,
+            }
+        ).eq("id", pid)))
+    await asyncio.gather(*writes)
 
+    yield {"stage": "done", "ignite_problem_id": pid}
+
+
+@router.post("/ignite")
+async def create_ignite_problem(
+    payload: dict,
+    current_user: dict = Depends(get_current_user),
+):
+    """Create terrain + match Forge session + apply Fire Starter chain."""
+    user = current_user["db_user"]
+    title, description, course_id, starters = await _validate_ignite_create(payload, user)
+    pid = None
+    async for event in _ignite_pipeline(user, title, description, course_id, starters):
+        pid = event.get("ignite_problem_id", pid)
     return {"ignite_problem_id": pid}
 
 
+@router.post("/ignite/stream")
+async def create_ignite_problem_stream(
+    payload: dict,
+    current_user: dict = Depends(get_current_user),
+):
+    """Same as POST /ignite, streaming one SSE event per pipeline stage.
+
+    Events (in `data:`): created -> terrain / matched (either order) ->
+    fire_starter -> done, then [DONE]. Thoughts in `terrain` and
+    `fire_starter` are the persisted rows, so the canvas can render them
+    immediately.
+    """
+    user = current_user["db_user"]
+    title, description, course_id, starters = await _validate_ignite_create(payload, user)
+
+    async def gen():
+        try:
+            async for event in _ignite_pipeline(user, title, description, course_id, starters):
+                yield f"data: {json.dumps(event, default=str)}\n\n".encode("utf-8")
+        except Exception as e:
+            logger.error("ignite pipeline failed: %s", e)
+            yield f"data: {json.dumps({'error': str(e)})}\n\n".encode("utf-8")
+        yield b"data: [DONE]\n\n"
+
+    return streaming_sse_response(gen)
+
+
 @router.get("/ignite/{ignite_problem_id}")
 async def get_ignite_problem(
     ignite_problem_id: str,
+    response: Response,
+    since: int | None = Query(None, ge=0),
+    if_none_match: str | None = Header(None),
     current_user: dict = Depends(get_current_user),
 ):
+    """Problem, thoughts, connections and chat. ETag / `?since=` work as for
+    GET /canvas/{id}; a delta also lists deleted_*_ids."""
     user = current_user["db_user"]
-    prob = _verify_problem(ignite_problem_id, user.id)
-    th = (
-        client.table("ignite_thoughts")
-        .select("*")
-        .eq("ignite_problem_id", ignite_problem_id)
-        .order("flow_order")
-        .execute()
-    )
-    conn = (
-        client.table("ignite_thought_connections")
-        .select("*")
-        .eq("ignite_problem_id", ignite_problem_id)
-        .execute()
-    )
-    msgs = (
-        client.table("ignite_chat_messages")
-        .select("*")
-        .eq("ignite_problem_id", ignite_problem_id)
-        .order("created_at")
-        .execute()
-    )
-    return {
+    await ignite_positions.flush(user.id)
+    # Version before the problem row (as in get_canvas_state): an update
+    # landing in between is sent again next time, never cached under the
+    # newer ETag with the older body
+    current = await canvas_version_repo.get(ignite_problem_id)
+    prob = await _verify_problem(ignite_problem_id, user.id)
+    etag = version_etag(current.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    set_version_headers(response, etag)
+    is_delta = since is not None and current.pruned_through <= since <= current.version
+
+    def rows(table: str, order: str):
+        query = client.table(table).select("*").eq("ignite_problem_id", ignite_problem_id)
+        if is_delta:
+            query = query.gt("version", since)
+        return run_query(query.order(order))
+
+    reads = [
+        rows("ignite_thoughts", "flow_order"),
+        rows("ignite_thought_connections", "created_at"),
+        rows("ignite_chat_messages", "created_at"),
+    ]
+    if is_delta:
+        reads.append(canvas_version_repo.get_tombstones(ignite_problem_id, since))
+    th, conn, msgs, *tombstones = await asyncio.gather(*reads)
+    out = {
         "problem": prob,
         "thoughts": th.data or [],
         "connections": conn.data or [],
         "messages": msgs.data or [],
+        "version": current.version,
+        "since": None,
     }
+    if is_delta:
+        out["since"] = since
+        for kind in ("thought", "connection", "message"):
+            out[f"deleted_{kind}_ids"] = [t.item_id for t in tombstones[0] if t.item_type == kind]
+    return out
 
 
 @router.post("/ignite/{ignite_problem_id}/guide")
@@ -604,7 +780,7 @@ async def ignite_guide_stream(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    prob = _verify_problem(ignite_problem_id, user.id)
+    prob = await _verify_problem(ignite_problem_id, user.id)
     if not rate_limit_user(user.id, "canvas_chat"):
         raise HTTPException(status_code=429, detail="Slow down a moment.")
 
@@ -615,7 +791,7 @@ async def ignite_guide_stream(
 
     fs_name = fs_elems = fs_desc = fs_flow = matched_title = None
     if prob.get("applied_fire_starter_id"):
-        fs = fire_starter_repo.get(str(prob["applied_fire_starter_id"]))
+        fs = await fire_starter_repo.get(str(prob["applied_fire_starter_id"]))
         if fs:
             fs_name = fs.get("name")
             fs_desc = fs.get("description") or ""
@@ -639,12 +815,11 @@ async def ignite_guide_stream(
         if mp:
             matched_title = mp.title
 
-    th = (
+    th = await run_query(
         client.table("ignite_thoughts")
         .select("content, is_terrain, is_fire_starter_node, terrain_type, flow_order, element")
         .eq("ignite_problem_id", ignite_problem_id)
         .order("flow_order")
-        .execute()
     )
     terrain_lines = []
     fs_lines = []
@@ -661,14 +836,13 @@ async def ignite_guide_stream(
             fs_lines.append(f"- ({order}) [{el}] {content}")
 
     opening_msg = ""
-    first_asst = (
+    first_asst = await run_query(
         client.table("ignite_chat_messages")
         .select("content")
         .eq("ignite_problem_id", ignite_problem_id)
         .eq("role", "assistant")
         .order("created_at")
         .limit(1)
-        .execute()
     )
     if first_asst.data:
         opening_msg = (first_asst.data[0].get("content") or "").strip()
@@ -711,12 +885,12 @@ async def ignite_nudge(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    _verify_problem(ignite_problem_id, user.id)
+    await _verify_problem(ignite_problem_id, user.id)
     content = (payload.get("content") or "").strip()
     element = payload.get("element")
     sub = payload.get("sub_element")
     prompt = ignite_node_nudge_prompt(content, element, sub)
-    text = await llm.generate_text(prompt=prompt, system="Be brief.", max_tokens=200)
+    text = await llm.generate_text(prompt=prompt, system="Be brief.", max_tokens=200, cache=True)
     return {"nudge": text.strip()}
 
 
@@ -726,7 +900,7 @@ async def ignite_organize(
     current_user: dict = Depends(get_current_user),
 ):
     """Stub organizer — returns success without layout changes (TODO: full layout)."""
-    _verify_problem(ignite_problem_id, current_user["db_user"].id)
+    await _verify_problem(ignite_problem_id, current_user["db_user"].id)
     # TODO: call Claude for positions + persist updates
     return {"ok": True, "message": "Organize is a stub — layout unchanged."}
 
@@ -738,50 +912,37 @@ async def ignite_fan3(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    _verify_problem(ignite_problem_id, user.id)
+    await _verify_problem(ignite_problem_id, user.id)
     parent_id = payload.get("parent_thought_id")
     if not parent_id:
         raise HTTPException(status_code=400, detail="parent_thought_id required")
-    parent = (
+    parent = (await run_query(
         client.table("ignite_thoughts")
         .select("*")
         .eq("id", parent_id)
         .single()
-        .execute()
-    ).data
+    )).data
     if not parent:
         raise HTTPException(status_code=404, detail="Thought not found")
     px, py = float(parent.get("pos_x") or 0), float(parent.get("pos_y") or 0)
-    created = []
-    for k in range(3):
-        row = (
-            client.table("ignite_thoughts")
-            .insert(
-                {
-                    "ignite_problem_id": ignite_problem_id,
-                    "user_id": user.id,
-                    "content": f"Branch {k+1}: what else follows?",
-                    "element": parent.get("element"),
-                    "sub_element": parent.get("sub_element"),
-                    "pos_x": px + 320,
-                    "pos_y": py + (k - 1) * 140,
-                    "is_terrain": False,
-                    "is_fire_starter_node": False,
-                    "flow_order": 500 + k,
-                }
-            )
-            .execute()
+    branches = [
+        _thought_row(
+            f"Branch {k+1}: what else follows?",
+            pos_x=px + 320,
+            pos_y=py + (k - 1) * 140,
+            flow_order=500 + k,
+            element=parent.get("element"),
+            sub_element=parent.get("sub_element"),
         )
-        tid = row.data[0]["id"]
-        client.table("ignite_thought_connections").insert(
-            {
-                "ignite_problem_id": ignite_problem_id,
-                "from_thought_id": parent_id,
-                "to_thought_id": tid,
-            }
-        ).execute()
-        created.append(row.data[0])
-    return {"thoughts": created}
+        for k in range(3)
+    ]
+    created, linked = await _insert_ignite_graph(
+        ignite_problem_id,
+        user.id,
+        branches,
+        [{"from_thought_id": parent_id, "to_index": k} for k in range(3)],
+    )
+    return {"thoughts": created, "connections": linked}
 
 
 @router.post("/ignite/{ignite_problem_id}/forward-flow")
@@ -791,7 +952,7 @@ async def ignite_forward_flow(
     current_user: dict = Depends(get_current_user),
 ):
     """Stub — TODO stream Weaponry-style forward flow."""
-    _verify_problem(ignite_problem_id, current_user["db_user"].id)
+    await _verify_problem(ignite_problem_id, current_user["db_user"].id)
     return {"steps": [], "message": "Forward flow stub — TODO port streaming walk."}
 
 
@@ -801,10 +962,10 @@ async def ignite_extract(
     payload: dict,
     current_user: dict = Depends(get_current_user),
 ):
-    _verify_problem(ignite_problem_id, current_user["db_user"].id)
+    await _verify_problem(ignite_problem_id, current_user["db_user"].id)
     node = (payload.get("content") or "").strip()
     prompt = f"Ignite — extract one crisp insight (1-2 sentences) implied by:\n{node}"
-    insight = await llm.generate_text(prompt=prompt, system="Be direct.", max_tokens=200)
+    insight = await llm.generate_text(prompt=prompt, system="Be direct.", max_tokens=200, cache=True)
     return {"insight": insight.strip()}
 
 
@@ -813,12 +974,11 @@ async def ignite_structural_potential(
     ignite_problem_id: str,
     current_user: dict = Depends(get_current_user),
 ):
-    _verify_problem(ignite_problem_id, current_user["db_user"].id)
-    th = (
+    await _verify_problem(ignite_problem_id, current_user["db_user"].id)
+    th = await run_query(
         client.table("ignite_thoughts")
         .select("id,content")
         .eq("ignite_problem_id", ignite_problem_id)
-        .execute()
     )
     lines = "\n".join(f'- {r["id"]}: {r["content"][:120]}' for r in (th.data or []))
     prompt = f"""Ignite canvas nodes:
@@ -839,17 +999,16 @@ async def ignite_create_thought(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    _verify_problem(ignite_problem_id, user.id)
-    existing = (
+    await _verify_problem(ignite_problem_id, user.id)
+    existing = await run_query(
         client.table("ignite_thoughts")
         .select("flow_order")
         .eq("ignite_problem_id", ignite_problem_id)
         .order("flow_order", desc=True)
         .limit(1)
-        .execute()
     )
     next_order = (existing.data[0].get("flow_order") or 0) + 1 if existing.data else 1
-    row = (
+    row = await run_query(
         client.table("ignite_thoughts")
         .insert(
             {
@@ -865,40 +1024,76 @@ async def ignite_create_thought(
                 "flow_order": next_order,
             }
         )
-        .execute()
     )
     return row.data[0]
 
 
+@router.patch("/ignite/thoughts/positions", response_model=ThoughtPositionsResponse)
+async def ignite_patch_thought_positions(
+    request: ThoughtPositionsRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """Bulk move; same contract as PATCH /canvas/thoughts/positions."""
+    user = current_user["db_user"]
+    latest = {str(p.id): (p.pos_x, p.pos_y) for p in request.positions}
+    unseen = [tid for tid in latest if not _position_owner_cache.get((user.id, tid))]
+    owned: set[str] = set()
+    if unseen:
+        res = await run_query(
+            client.table("ignite_thoughts").select("id").eq("user_id", user.id).in_("id", unseen)
+        )
+        owned = {row["id"] for row in res.data or []}
+    for tid in owned:
+        _position_owner_cache.set((user.id, tid), True)
+    rejected = [tid for tid in unseen if tid not in owned]
+    rows = [(tid, x, y) for tid, (x, y) in latest.items() if tid not in rejected]
+    if not ignite_positions.enabled:
+        written = await _apply_positions(user.id, rows)
+        return ThoughtPositionsResponse(accepted=len(rows), written=written, rejected_ids=rejected)
+    ignite_positions.add(user.id, rows)
+    written = await ignite_positions.flush(user.id) if request.flush else 0
+    return ThoughtPositionsResponse(accepted=len(rows), written=written, rejected_ids=rejected)
+
+
+def _finite_position(payload: dict) -> tuple[float, float]:
+    try:
+        x, y = float(payload.get("pos_x") or 0), float(payload.get("pos_y") or 0)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="pos_x and pos_y must be numbers")
+    if not (math.isfinite(x) and math.isfinite(y)):
+        raise HTTPException(status_code=422, detail="pos_x and pos_y must be finite")
+    return x, y
+
+
 @router.patch("/ignite/thoughts/{thought_id}/position")
 async def ignite_patch_thought_position(
-    thought_id: str,
+    thought_id: UUID,
     payload: dict,
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    t = (
+    thought_id = str(thought_id)
+    pos_x, pos_y = _finite_position(payload)
+    if ignite_positions.enabled:
+        await ignite_positions.supersede(user.id, thought_id)
+    t = (await run_query(
         client.table("ignite_thoughts")
         .select("ignite_problem_id")
         .eq("id", thought_id)
         .single()
-        .execute()
-    ).data
+    )).data
     if not t:
         raise HTTPException(status_code=404, detail="Thought not found")
-    _verify_problem(t["ignite_problem_id"], user.id)
-    upd = (
+    await _verify_problem(t["ignite_problem_id"], user.id)
+    upd = await run_query(
         client.table("ignite_thoughts")
-        .update(
-            {
-                "pos_x": float(payload.get("pos_x") or 0),
-                "pos_y": float(payload.get("pos_y") or 0),
-            }
-        )
+        .update({"pos_x": pos_x, "pos_y": pos_y})
         .eq("id", thought_id)
-        .execute()
     )
-    return upd.data[0]
+    row = upd.data[0]
+    if row.get("user_id") == user.id:
+        _position_owner_cache.set((user.id, thought_id), True)
+    return row
 
 
 @router.delete("/ignite/thoughts/{thought_id}")
@@ -907,19 +1102,18 @@ async def ignite_delete_thought(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    t = (
+    t = (await run_query(
         client.table("ignite_thoughts")
         .select("ignite_problem_id")
         .eq("id", thought_id)
         .single()
-        .execute()
-    ).data
+    )).data
     if not t:
         raise HTTPException(status_code=404, detail="Not found")
-    _verify_problem(t["ignite_problem_id"], user.id)
-    client.table("ignite_thought_connections").delete().eq("from_thought_id", thought_id).execute()
-    client.table("ignite_thought_connections").delete().eq("to_thought_id", thought_id).execute()
-    client.table("ignite_thoughts").delete().eq("id", thought_id).execute()
+    await _verify_problem(t["ignite_problem_id"], user.id)
+    await run_query(client.table("ignite_thought_connections").delete().eq("from_thought_id", thought_id))
+    await run_query(client.table("ignite_thought_connections").delete().eq("to_thought_id", thought_id))
+    await run_query(client.table("ignite_thoughts").delete().eq("id", thought_id))
     return {"ok": True}
 
 
@@ -930,11 +1124,11 @@ async def ignite_create_connection(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    _verify_problem(ignite_problem_id, user.id)
+    await _verify_problem(ignite_problem_id, user.id)
     fid, tid = payload.get("from_thought_id"), payload.get("to_thought_id")
     if not fid or not tid or fid == tid:
         raise HTTPException(status_code=400, detail="Invalid connection")
-    row = (
+    row = await run_query(
         client.table("ignite_thought_connections")
         .insert(
             {
@@ -943,7 +1137,6 @@ async def ignite_create_connection(
                 "to_thought_id": tid,
             }
         )
-        .execute()
     )
     return row.data[0]
 
@@ -954,17 +1147,16 @@ async def ignite_delete_connection(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    row = (
+    row = (await run_query(
         client.table("ignite_thought_connections")
         .select("ignite_problem_id")
         .eq("id", connection_id)
         .single()
-        .execute()
-    ).data
+    )).data
     if not row:
         raise HTTPException(status_code=404, detail="Not found")
-    _verify_problem(row["ignite_problem_id"], user.id)
-    client.table("ignite_thought_connections").delete().eq("id", connection_id).execute()
+    await _verify_problem(row["ignite_problem_id"], user.id)
+    await run_query(client.table("ignite_thought_connections").delete().eq("id", connection_id))
     return Response(status_code=204)
 
 
@@ -975,12 +1167,12 @@ async def ignite_post_chat_message(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    _verify_problem(ignite_problem_id, user.id)
+    await _verify_problem(ignite_problem_id, user.id)
     role = (payload.get("role") or "user").lower()
     content = (payload.get("content") or "").strip()
     if not content:
         raise HTTPException(status_code=400, detail="content required")
-    row = (
+    row = await run_query(
         client.table("ignite_chat_messages")
         .insert(
             {
@@ -991,7 +1183,6 @@ async def ignite_post_chat_message(
                 "metadata": payload.get("metadata") or {},
             }
         )
-        .execute()
     )
     return row.data[0]
 
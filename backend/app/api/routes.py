@@ -1,13 +1,20 @@
 """
 API Routes - HTTP endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi import Response as HTTPResponse
 from typing import List, Optional
+from uuid import UUID
 import re
+from datetime import date, timedelta
+from functools import lru_cache
 
 from app.core.security import get_current_user
+from app.core.cache import TTLCache
+from app.core.position_buffer import PositionWriteBuffer
 from app.core.config import settings
 from app.core.rate_limiter import rate_limit_user
+from app.core.status_bus import course_status_bus
 from app.api.schemas import (
     SessionStartRequest, SessionStartResponse,
     SessionCompleteRequest,
@@ -21,6 +28,7 @@ from app.api.schemas import (
     CourseSummary, UserCoursesResponse, CourseDetailResponse,
     CoursePuzzleResponse, CoursePuzzlesResponse, RetryGenerationResponse,
     ThoughtCreateRequest, ThoughtUpdatePositionRequest,
+    ThoughtPositionsRequest, ThoughtPositionsResponse,
     ThoughtUpdateContentRequest, ThoughtUpdateTaggingRequest,
     ThoughtResponse, ConnectionCreateRequest, ConnectionResponse,
     CanvasStateResponse, DevRedirectResponse,
@@ -36,7 +44,7 @@ from app.api.schemas import (
 from app.domain.entities import (
     Response, Hint, Element, SessionStatus,
     Component, ElementMessage, DeepUnderstanding,
-    IntakeMessage,
+    IntakeMessage, JOB_FIRE_STARTER_IMAGE, JOB_PUZZLE_GENERATION,
 )
 from app.domain.services import (
     build_session_completion_prompt, build_extract_understanding_prompt,
@@ -57,14 +65,20 @@ from app.adapters.supabase_adapter import (
     SupabaseCoursePuzzleRepository,
     SupabaseThoughtRepository,
     SupabaseThoughtConnectionRepository,
+    SupabaseCanvasVersionRepository,
     SupabaseFireStarterRepository,
     get_supabase_client,
 )
 from app.adapters.claude_adapter import ClaudeStreamingAdapter
+from app.adapters.job_queue_adapter import get_job_queue
 from app.adapters.openai_adapter import OpenAIImageAdapter
+from app.services.image_pipeline import SESSION_BACKGROUND_PREFIX
 from app.dependencies import get_fire_starter_image_service
 from app.api.streaming import sse_stream
 from app.domain.puzzle_generation import generate_course_puzzles
+from app.domain.canvas import load_canvas_delta, load_canvas_snapshot
+from app.api.conditional import etag_matches, not_modified, set_version_headers, version_etag
+from app.domain.conversation_state import compact_conversation, load_conversation_state
 from fastapi.responses import StreamingResponse
 import asyncio
 import json
@@ -86,17 +100,69 @@ course_repo = SupabaseCourseRepository()
 puzzle_repo = SupabaseCoursePuzzleRepository()
 thought_repo = SupabaseThoughtRepository()
 connection_repo = SupabaseThoughtConnectionRepository()
+canvas_version_repo = SupabaseCanvasVersionRepository()
 fire_starter_repo = SupabaseFireStarterRepository(get_supabase_client())
 llm_client = ClaudeStreamingAdapter()
 image_client = OpenAIImageAdapter()
 
+# Aggregated /user/stats numbers per user id (the archetype/avatar fields are
+# read from the user on every request). Dropped whenever one of the user's
+# sessions is started, completed, cancelled or deleted.
+_dashboard_stats_cache: TTLCache[dict] = TTLCache(
+    "dashboard_stats",
+    maxsize=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.DASHBOARD_STATS_CACHE_TTL_SECONDS,
+)
+
+# Owner user id per course_puzzle id. Filled by every puzzle ownership
+# check; lets thought/connection creates skip the ownership query. Owners
+# never change, so the TTL only bounds how long a deleted puzzle is trusted.
+_canvas_owner_cache: TTLCache[str] = TTLCache(
+    "canvas_owners",
+    maxsize=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CANVAS_OWNER_CACHE_TTL_SECONDS,
+)
+
+# Drag positions, written per user in one batch (app.core.position_buffer)
+canvas_positions = PositionWriteBuffer(
+    "canvas_positions",
+    thought_repo.update_positions,
+    interval_seconds=settings.POSITION_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.POSITION_BUFFER_MAX_PENDING,
+)
+
+# (user id, thought id) pairs whose row carries that user_id. The bulk
+# position endpoint queues these without asking the database again; other
+# ids are checked in one query and rejected if they aren't the caller's.
+_position_owner_cache: TTLCache[bool] = TTLCache(
+    "canvas_position_owners",
+    maxsize=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CANVAS_OWNER_CACHE_TTL_SECONDS,
+)
+
+# /course/{id}/status-stream: hard cap on stream lifetime, and how often an
+# idle stream sends a keep-alive comment.
+COURSE_STATUS_STREAM_MAX_SECONDS = 120
+COURSE_STATUS_KEEPALIVE_SECONDS = 15
+
 # Module-level set to keep references to background tasks so asyncio doesn't
 # garbage-collect them mid-execution. Tasks remove themselves via done_callback.
 _BACKGROUND_TASKS: set = set()
 
 
-def _spawn_fire_starter_image_generation(fire_starter_id: str) -> None:
-    """Fire-and-forget Fire Starter illustration generation."""
+async def _spawn_fire_starter_image_generation(fire_starter_id: str) -> None:
+    """Fire-and-forget Fire Starter illustration generation.
+
+    With JOB_QUEUE_ENABLED the work is enqueued for app.worker instead, so
+    it survives restarts and runs under the worker's concurrency cap.
+    """
+    if settings.JOB_QUEUE_ENABLED:
+        await get_job_queue().enqueue(
+            JOB_FIRE_STARTER_IMAGE,
+            {"fire_starter_id": fire_starter_id},
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+        )
+        return
 
     async def _run() -> None:
         service = get_fire_starter_image_service()
@@ -107,8 +173,25 @@ def _spawn_fire_starter_image_generation(fire_starter_id: str) -> None:
     task.add_done_callback(_BACKGROUND_TASKS.discard)
 
 
-def _spawn_puzzle_generation(course_id: str) -> None:
-    """Fire-and-forget puzzle generation task. Pinned in _BACKGROUND_TASKS."""
+def _spawn_conversation_compaction(session, conversation) -> None:
+    """Fire-and-forget fold of older chat turns into the session summary."""
+    task = asyncio.create_task(
+        compact_conversation(session, conversation, llm_client, session_repo)
+    )
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+async def _spawn_puzzle_generation(course_id: str) -> None:
+    """Fire-and-forget puzzle generation task. Pinned in _BACKGROUND_TASKS,
+    or enqueued for app.worker when JOB_QUEUE_ENABLED."""
+    if settings.JOB_QUEUE_ENABLED:
+        await get_job_queue().enqueue(
+            JOB_PUZZLE_GENERATION,
+            {"course_id": course_id},
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+        )
+        return
     task = asyncio.create_task(
         generate_course_puzzles(
             course_id=course_id,
@@ -164,6 +247,7 @@ async def start_session(
         user_id=user.id,
         problem_description=problem_description,
     )
+    _dashboard_stats_cache.invalidate(user.id)
     
     return SessionStartResponse(
         session_id=session.id,
@@ -209,7 +293,9 @@ async def generate_puzzle_background(
         # Generate a muted, artistic background - NOT black and white, just desaturated/muted
         image_prompt = f"Minimalist artistic illustration inspired by '{puzzle_title}'. Soft muted tones, very low saturation, gentle grays and subtle warm undertones. Abstract shapes, soft gradients, dreamlike quality. No text, no people, no faces. Suitable as a subtle background texture. Elegant and understated."
         
-        background_url = await image_client.generate_image(image_prompt)
+        background_url = await image_client.generate_image(
+            image_prompt, size="1024x1024", prefix=SESSION_BACKGROUND_PREFIX
+        )
         
         return {"success": True, "background_url": background_url}
     except Exception as e:
@@ -257,19 +343,16 @@ async def chat_with_session(
     )
     await element_message_repo.create(user_msg)
     
-    # Get conversation history (including the message just saved)
-    all_messages = await element_message_repo.get_all_for_session(session_id)
-    conversation_history = [
-        {"role": msg.role, "message_text": msg.message_text}
-        for msg in all_messages
-    ]
+    # Rolling summary + the turns after its checkpoint (including the message just saved)
+    conversation = await load_conversation_state(session, element_message_repo)
     
     # Single batched LLM call: element + coaching response + understanding doc
     prompt = build_batched_chat_prompt(
         problem_description=problem_description,
-        conversation_history=conversation_history,
+        conversation_history=conversation.history(),
         user_message=user_message,
         existing_document=session.understanding_document or "",
+        conversation_summary=conversation.summary,
     )
     raw = await llm_client.generate_text(prompt, max_tokens=1800)
     
@@ -305,7 +388,9 @@ async def chat_with_session(
         message_text=assistant_text,
         element_applied=selected_element,
     )
-    await element_message_repo.create(assistant_msg)
+    conversation.add(await element_message_repo.create(assistant_msg))
+    if conversation.to_compact():
+        _spawn_conversation_compaction(session, conversation)
     
     # Persist updated understanding doc (skip the no-insights sentinel)
     if updated_doc and updated_doc != "__no_insights__":
@@ -417,6 +502,7 @@ async def complete_session(
         status=SessionStatus.COMPLETED,
         ended_at=datetime.now()
     )
+    _dashboard_stats_cache.invalidate(user.id)
     
     return {
         "success": True,
@@ -450,6 +536,7 @@ async def cancel_session(
         status=SessionStatus.ABANDONED,
         ended_at=datetime.now(),
     )
+    _dashboard_stats_cache.invalidate(user.id)
     return {"success": True}
 
 # ============ User Endpoints ============
@@ -560,6 +647,7 @@ async def delete_session(
         raise HTTPException(status_code=403, detail="Not authorized")
 
     deleted = await session_repo.delete(session_id)
+    _dashboard_stats_cache.invalidate(user.id)
     return {"success": deleted}
 
 @router.post("/user/regenerate-avatar")
@@ -578,13 +666,10 @@ async def regenerate_avatar(
     
     try:
         # Get element breakdown
-        sessions = await session_repo.get_user_sessions(user.id, limit=100)
-        element_counts = {"earth": 0, "fire": 0, "air": 0, "water": 0, "change": 0}
-        for s in sessions:
-            responses = await response_repo.get_session_responses(s.id)
-            for r in responses:
-                if r.element.value in element_counts:
-                    element_counts[r.element.value] += r.word_count
+        word_counts = await response_repo.get_element_word_counts(user.id)
+        element_counts = {
+            e: word_counts.get(e, 0) for e in ("earth", "fire", "air", "water", "change")
+        }
         
         archetype_name = user.archetype_name or "The Thinker"
         sorted_elements = sorted(element_counts.items(), key=lambda x: x[1], reverse=True)
@@ -610,7 +695,7 @@ async def regenerate_avatar(
         
         avatar_prompt = f"Minimalist artistic visualization of a human brain, professional scientific illustration style. The brain shows neural pathways and regions with {regions_desc}. COLOR PALETTE: ONLY use white, black, and purple (#9B5DE5). White background, black fine line details, purple for highlights and glowing neural connections. Style: clean, intellectual, modern medical illustration meets abstract art. Subtle geometric patterns in the neural connections. No text, no other colors, elegant and sophisticated. The image should feel professional and cerebral, suitable for a thinking/learning application."
         logger.info(f"Regenerating avatar for user {user.id}")
-        avatar_image_url = await image_client.generate_image(avatar_prompt)
+        avatar_image_url = await image_client.generate_image(avatar_prompt, prefix="avatars")
         
         if avatar_image_url:
             await user_repo.update_archetype(
@@ -626,6 +711,18 @@ async def regenerate_avatar(
         logger.error(f"Failed to regenerate avatar: {e}")
         return {"success": False, "error": str(e)}
 
+def _current_streak(session_dates: set) -> int:
+    """Consecutive days with a session, ending today (or yesterday if none yet today)."""
+    day = date.today()
+    if day not in session_dates:
+        day -= timedelta(days=1)
+    streak = 0
+    while day in session_dates:
+        streak += 1
+        day -= timedelta(days=1)
+    return streak
+
+
 @router.get("/user/stats", response_model=DashboardStatsResponse)
 async def get_user_stats(
     current_user: dict = Depends(get_current_user)
@@ -633,53 +730,30 @@ async def get_user_stats(
     """Get dashboard stats for current user"""
     user = current_user["db_user"]
     
-    sessions = await session_repo.get_user_sessions(user.id, limit=100)
-    
-    completed = [s for s in sessions if s.status == SessionStatus.COMPLETED]
-    
-    # Calculate joules (simplified: 10 joules per completed prompt)
-    total_joules = sum(s.prompts_completed * 10 for s in sessions)
-    
-    # Calculate streak (simplified: consecutive days with sessions)
-    streak = 0
-    if sessions:
-        from datetime import date, timedelta
-        today = date.today()
-        current_date = today
-        session_dates = set(s.started_at.date() for s in sessions if s.started_at)
-        
-        while current_date in session_dates or (current_date == today and sessions):
-            streak += 1
-            current_date -= timedelta(days=1)
-        
-        # If no session today, start checking from yesterday
-        if today not in session_dates:
-            streak = 0
-            current_date = today - timedelta(days=1)
-            while current_date in session_dates:
-                streak += 1
-                current_date -= timedelta(days=1)
-    
-    # Element breakdown (count responses per element)
-    element_counts = {"earth": 0, "fire": 0, "air": 0, "water": 0}
-    for s in sessions:
-        responses = await response_repo.get_session_responses(s.id)
-        for r in responses:
-            if r.element.value in element_counts:
-                element_counts[r.element.value] += r.word_count
-    
-    # Determine strongest element
-    strongest_element = max(element_counts.items(), key=lambda x: x[1])[0] if any(element_counts.values()) else "earth"
+    stats = _dashboard_stats_cache.get(user.id)
+    if stats is None:
+        sessions, word_counts = await asyncio.gather(
+            session_repo.get_user_sessions(user.id, limit=100, view="stats"),
+            response_repo.get_element_word_counts(user.id),
+        )
+        # Element breakdown (total response words per element)
+        element_counts = {e: word_counts.get(e, 0) for e in ("earth", "fire", "air", "water")}
+        stats = {
+            "total_sessions": len(sessions),
+            "completed_sessions": sum(1 for s in sessions if s.status == SessionStatus.COMPLETED),
+            # Calculate joules (simplified: 10 joules per completed prompt)
+            "total_joules": sum(s.prompts_completed * 10 for s in sessions),
+            "current_streak": _current_streak({s.started_at.date() for s in sessions if s.started_at}),
+            "element_breakdown": element_counts,
+            # Determine strongest element
+            "strongest_element": max(element_counts.items(), key=lambda x: x[1])[0] if any(element_counts.values()) else "earth",
+        }
+        _dashboard_stats_cache.set(user.id, stats)
     
     return DashboardStatsResponse(
-        total_sessions=len(sessions),
-        completed_sessions=len(completed),
-        total_joules=total_joules,
-        current_streak=streak,
-        element_breakdown=element_counts,
+        **stats,
         archetype_name=user.archetype_name,
         archetype_description=user.archetype_description,
-        strongest_element=strongest_element,
         avatar_image_url=user.avatar_image_url,
     )
 
@@ -784,7 +858,12 @@ async def get_deep_understanding(
 # ============ Course Endpoints (Phase 2) ============
 
 def _intake_preview_snippet(course) -> Optional[str]:
-    """Short snippet from the first non-empty user turn — for unfinished intakes."""
+    """Short snippet from the first non-empty user turn — for unfinished intakes.
+
+    Stored as courses.intake_preview (migration 034 keeps the same rules);
+    computed here only for rows read without it."""
+    if getattr(course, "intake_preview", None):
+        return course.intake_preview
     for m in course.intake_messages or []:
         if (getattr(m, "role", None) or "") != "user":
             continue
@@ -1002,7 +1081,7 @@ async def finalize_course_intake(
         raw_quotes=data.get("raw_quotes", []) or [],
     )
 
-    _spawn_puzzle_generation(course_id)
+    await _spawn_puzzle_generation(course_id)
 
     return CourseIntakeFinalizeResponse(success=True, course_id=course_id)
 
@@ -1088,37 +1167,70 @@ async def course_status_stream(
 ):
     """Stream course_status changes via SSE.
 
-    Polls the DB every second; emits a payload when status changes; ends
-    streaming on terminal states (ready, generation_failed, abandoned) or
-    after a 2-minute hard cap.
+    Sends the current status, then waits on the in-process status bus and
+    emits a payload whenever the status changes. The bus only hears other
+    processes (app.worker with JOB_QUEUE_ENABLED, other API workers) through
+    the NOTIFY listener, which needs DATABASE_URL. While that listener is
+    connected an idle stream costs no queries; while it isn't (or once after
+    it reconnects, for changes it missed), a keep-alive interval without an
+    event re-reads the status (one status-only select). Ends streaming on
+    terminal states (ready, generation_failed, abandoned) or after a
+    2-minute hard cap.
     """
     user = current_user["db_user"]
-    course = await course_repo.get_by_id(course_id)
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    if course.user_id != user.id:
-        raise HTTPException(status_code=403, detail="Not your course")
+    # Subscribe before reading so a transition between the read and the
+    # first wait can't be missed.
+    updates = course_status_bus.subscribe(course_id)
+    remote_epoch = course_status_bus.remote_epoch
+    try:
+        course = await course_repo.get_by_id(course_id)
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found")
+        if course.user_id != user.id:
+            raise HTTPException(status_code=403, detail="Not your course")
+    except Exception:
+        course_status_bus.unsubscribe(course_id, updates)
+        raise
 
     async def gen():
+        nonlocal remote_epoch
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + COURSE_STATUS_STREAM_MAX_SECONDS
         last_status = None
-        for _ in range(120):
-            current_course = await course_repo.get_by_id(course_id)
-            if not current_course:
-                break
-
-            current_status = current_course.course_status
-            if current_status != last_status:
-                payload = json.dumps({
-                    "course_status": current_status,
-                    "generation_error": current_course.generation_error,
-                })
-                yield f"data: {payload}\n\n".encode("utf-8")
-                last_status = current_status
-
-            if current_status in ("ready", "generation_failed", "abandoned"):
-                break
-
-            await asyncio.sleep(1)
+        event = {
+            "course_status": course.course_status,
+            "generation_error": course.generation_error,
+        }
+        try:
+            while True:
+                if event is None:
+                    # Comment line keeps proxies from timing out an idle stream
+                    yield b": keep-alive\n\n"
+                elif event["course_status"] != last_status:
+                    yield f"data: {json.dumps(event)}\n\n".encode("utf-8")
+                    last_status = event["course_status"]
+
+                if last_status in ("ready", "generation_failed", "abandoned"):
+                    break
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(
+                        updates.get(), timeout=min(remaining, COURSE_STATUS_KEEPALIVE_SECONDS)
+                    )
+                except asyncio.TimeoutError:
+                    event = None
+                    if (
+                        not course_status_bus.remote_connected
+                        or course_status_bus.remote_epoch != remote_epoch
+                    ):
+                        remote_epoch = course_status_bus.remote_epoch
+                        event = await course_repo.get_status(course_id)
+                        if event is not None and event["course_status"] == last_status:
+                            event = None
+        finally:
+            course_status_bus.unsubscribe(course_id, updates)
 
         yield b"data: [DONE]\n\n"
 
@@ -1154,7 +1266,7 @@ async def retry_course_generation(
             detail=f"Cannot retry generation from status '{course.course_status}'",
         )
 
-    _spawn_puzzle_generation(course_id)
+    await _spawn_puzzle_generation(course_id)
     return RetryGenerationResponse(success=True, course_id=course_id)
 
 
@@ -1214,13 +1326,48 @@ async def _verify_puzzle_ownership(course_puzzle_id: str, user):
     parent course. Returns the CoursePuzzle on success."""
     result = await puzzle_repo.get_with_course(course_puzzle_id)
     if not result:
+        _canvas_owner_cache.invalidate(course_puzzle_id)
         raise HTTPException(status_code=404, detail="Puzzle not found")
     cp, course_user_id = result
+    _canvas_owner_cache.set(course_puzzle_id, course_user_id)
     if course_user_id != user.id:
         raise HTTPException(status_code=403, detail="Not your puzzle")
     return cp
 
 
+async def _verify_puzzle_owner(course_puzzle_id: str, user) -> None:
+    """Ownership check for writes that don't need the CoursePuzzle row:
+    answered from _canvas_owner_cache when possible (no round-trip)."""
+    owner_id = _canvas_owner_cache.get(course_puzzle_id)
+    if owner_id is None:
+        await _verify_puzzle_ownership(course_puzzle_id, user)
+    elif owner_id != user.id:
+        raise HTTPException(status_code=403, detail="Not your puzzle")
+
+
+async def _owner_scoped(user, mutate, verify, not_found: str):
+    """Run `mutate(owner_id=user.id)`, a write whose WHERE clause includes the
+    caller's user_id, so an owner's drag/edit/delete is one round-trip.
+    Only when that matches nothing does `verify()` run the full ownership
+    check (404/403); if it passes, the row's user_id isn't the caller's
+    (rows are created with the owner's id, so this is legacy data) and the
+    write is retried unscoped."""
+    try:
+        result = await mutate(owner_id=user.id)
+    except ValueError:
+        result = None
+    if result:
+        return result
+    await verify()
+    try:
+        result = await mutate(owner_id=None)
+    except ValueError:
+        result = None
+    if not result:
+        raise HTTPException(status_code=404, detail=not_found)
+    return result
+
+
 async def _verify_thought_ownership(thought_id: str, user):
     """Verify that `thought_id` exists and the caller owns the parent course.
     Returns the Thought on success."""
@@ -1284,21 +1431,63 @@ async def update_canvas_stage(
 )
 async def get_canvas_state(
     course_puzzle_id: str,
+    response: HTTPResponse,
+    since: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user),
 ):
-    """Single round-trip load: puzzle + thoughts + connections."""
+    """Single round-trip load: puzzle + thoughts + connections.
+
+    Versioned by the canvas counter (migration 033): a matching
+    If-None-Match gets 304 after one small query, and `?since=<version>`
+    returns only what changed after that version.
+    """
     user = current_user["db_user"]
-    cp = await _verify_puzzle_ownership(course_puzzle_id, user)
+    owner_id = _canvas_owner_cache.get(course_puzzle_id)
+    if owner_id is not None and owner_id != user.id:
+        raise HTTPException(status_code=403, detail="Not your puzzle")
+    # Positions still in this worker's buffer would load stale
+    await canvas_positions.flush(user.id)
+    # Read the version before the rows: a write landing in between is
+    # sent again next time rather than missed
+    current = await canvas_version_repo.get(course_puzzle_id)
+    # Owner not cached: the ownership check must pass before a 304, and the
+    # CoursePuzzle it reads (after the version) is the one we return
+    cp = await _verify_puzzle_ownership(course_puzzle_id, user) if owner_id is None else None
+    etag = version_etag(current.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    if cp is None:
+        cp = await _verify_puzzle_ownership(course_puzzle_id, user)
     # Mark puzzle as in_progress the first time the canvas is opened so the
     # course page can show "Resume" instead of "Begin" on return visits.
     if cp.status == "pending":
         cp = await puzzle_repo.update_status(course_puzzle_id, "in_progress")
-    thoughts = await thought_repo.get_by_course_puzzle(course_puzzle_id)
-    connections = await connection_repo.get_by_course_puzzle(course_puzzle_id)
+        current = await canvas_version_repo.get(course_puzzle_id)
+        etag = version_etag(current.version)
+    set_version_headers(response, etag)
+
+    if since is not None and current.pruned_through <= since <= current.version:
+        delta = await load_canvas_delta(
+            course_puzzle_id, since, thought_repo, connection_repo, canvas_version_repo
+        )
+        return CanvasStateResponse(
+            course_puzzle=_cp_to_response(cp),
+            thoughts=[_thought_to_response(t) for t in delta.thoughts],
+            connections=[_connection_to_response(c) for c in delta.connections],
+            version=current.version,
+            since=since,
+            deleted_thought_ids=delta.deleted_thought_ids,
+            deleted_connection_ids=delta.deleted_connection_ids,
+        )
+    # No `since`, or one we can't diff from: full snapshot (since stays null)
+    canvas = await load_canvas_snapshot(course_puzzle_id, thought_repo, connection_repo)
     return CanvasStateResponse(
         course_puzzle=_cp_to_response(cp),
-        thoughts=[_thought_to_response(t) for t in thoughts],
-        connections=[_connection_to_response(c) for c in connections],
+        thoughts=[_thought_to_response(t) for t in canvas.thoughts],
+        connections=[_connection_to_response(c) for c in canvas.connections],
+        version=current.version,
     )
 
 
@@ -1312,7 +1501,7 @@ async def create_thought(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    await _verify_puzzle_ownership(course_puzzle_id, user)
+    await _verify_puzzle_owner(course_puzzle_id, user)
     if not request.content or not request.content.strip():
         raise HTTPException(status_code=400, detail="content is required")
     t = await thought_repo.create(
@@ -1328,18 +1517,61 @@ async def create_thought(
     return _thought_to_response(t)
 
 
+@router.patch(
+    "/canvas/thoughts/positions",
+    response_model=ThoughtPositionsResponse,
+)
+async def update_thought_positions(
+    request: ThoughtPositionsRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """Move many blocks at once. Positions are buffered and written with the
+    user's next batch; `flush: true` (canvas unload) writes them before
+    responding. Ids of thoughts the caller didn't create come back in
+    `rejected_ids` and are not written."""
+    user = current_user["db_user"]
+    latest = {str(p.id): (p.pos_x, p.pos_y) for p in request.positions}
+    unseen = [tid for tid in latest if not _position_owner_cache.get((user.id, tid))]
+    owned = set(await thought_repo.filter_owned(user.id, unseen)) if unseen else set()
+    for thought_id in owned:
+        _position_owner_cache.set((user.id, thought_id), True)
+    rejected = [tid for tid in unseen if tid not in owned]
+    rows = [(tid, x, y) for tid, (x, y) in latest.items() if tid not in rejected]
+    if not canvas_positions.enabled:
+        written = await thought_repo.update_positions(user.id, rows)
+        return ThoughtPositionsResponse(accepted=len(rows), written=written, rejected_ids=rejected)
+    canvas_positions.add(user.id, rows)
+    written = await canvas_positions.flush(user.id) if request.flush else 0
+    return ThoughtPositionsResponse(accepted=len(rows), written=written, rejected_ids=rejected)
+
+
 @router.patch(
     "/canvas/thoughts/{thought_id}/position",
     response_model=ThoughtResponse,
 )
 async def update_thought_position(
-    thought_id: str,
+    thought_id: UUID,
     request: ThoughtUpdatePositionRequest,
     current_user: dict = Depends(get_current_user),
 ):
+    """Immediate write returning the thought. Drags that send many moves
+    should use PATCH /canvas/thoughts/positions, which coalesces them."""
     user = current_user["db_user"]
-    await _verify_thought_ownership(thought_id, user)
-    t = await thought_repo.update_position(thought_id, request.pos_x, request.pos_y)
+    thought_id = str(thought_id)
+    if canvas_positions.enabled:
+        await canvas_positions.supersede(user.id, thought_id)
+    t = await _owner_scoped(
+        user,
+        lambda owner_id: thought_repo.update_position(
+            thought_id, request.pos_x, request.pos_y, owner_id=owner_id
+        ),
+        lambda: _verify_thought_ownership(thought_id, user),
+        "Thought not found",
+    )
+    # Saves the bulk endpoint's ownership query for this thought. Legacy rows
+    # under another user_id aren't cached: the batched write would skip them
+    if t.user_id == user.id:
+        _position_owner_cache.set((user.id, thought_id), True)
     return _thought_to_response(t)
 
 
@@ -1353,10 +1585,16 @@ async def update_thought_content(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    await _verify_thought_ownership(thought_id, user)
     if not request.content or not request.content.strip():
         raise HTTPException(status_code=400, detail="content is required")
-    t = await thought_repo.update_content(thought_id, request.content)
+    t = await _owner_scoped(
+        user,
+        lambda owner_id: thought_repo.update_content(
+            thought_id, request.content, owner_id=owner_id
+        ),
+        lambda: _verify_thought_ownership(thought_id, user),
+        "Thought not found",
+    )
     return _thought_to_response(t)
 
 
@@ -1370,9 +1608,13 @@ async def update_thought_tagging(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    await _verify_thought_ownership(thought_id, user)
-    t = await thought_repo.update_tagging(
-        thought_id, request.element, request.sub_element
+    t = await _owner_scoped(
+        user,
+        lambda owner_id: thought_repo.update_tagging(
+            thought_id, request.element, request.sub_element, owner_id=owner_id
+        ),
+        lambda: _verify_thought_ownership(thought_id, user),
+        "Thought not found",
     )
     return _thought_to_response(t)
 
@@ -1383,8 +1625,12 @@ async def delete_thought_endpoint(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    await _verify_thought_ownership(thought_id, user)
-    await thought_repo.delete(thought_id)
+    await _owner_scoped(
+        user,
+        lambda owner_id: thought_repo.delete(thought_id, owner_id=owner_id),
+        lambda: _verify_thought_ownership(thought_id, user),
+        "Thought not found",
+    )
     # 204 No Content
     return None
 
@@ -1399,7 +1645,7 @@ async def create_connection(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    await _verify_puzzle_ownership(course_puzzle_id, user)
+    await _verify_puzzle_owner(course_puzzle_id, user)
 
     if request.from_thought_id == request.to_thought_id:
         raise HTTPException(status_code=400, detail="Self-connections are not allowed")
@@ -1434,8 +1680,12 @@ async def delete_connection_endpoint(
     current_user: dict = Depends(get_current_user),
 ):
     user = current_user["db_user"]
-    await _verify_connection_ownership(connection_id, user)
-    await connection_repo.delete(connection_id)
+    await _owner_scoped(
+        user,
+        lambda owner_id: connection_repo.delete(connection_id, owner_id=owner_id),
+        lambda: _verify_connection_ownership(connection_id, user),
+        "Connection not found",
+    )
     return None
 
 
@@ -1478,6 +1728,9 @@ def _build_canvas_chat_system_prompt(
     The puzzle's `answer` is intentionally NOT included — the bot must
     never give it, and the simplest way to guarantee that is to keep it
     out of context.
+
+    The stage instructions and hard rules come first; the puzzle and
+    canvas follow them.
     """
     primary = cp.primary_element or "synthesis"
 
@@ -1492,6 +1745,32 @@ def _build_canvas_chat_system_prompt(
     else:
         conn_block = "  (no connections drawn)"
 
+    return _canvas_chat_prompt_prefix(stage) + f"""
+THE PUZZLE:
+- Title: {cp.title}
+- Prompt: {cp.puzzle_text}
+- Primary thinking territory: {primary}
+
+THE USER'S CANVAS:
+
+USER THOUGHTS (Stage 1, kind='thought'):
+{user_block}
+
+AI NUDGE NODES ON CANVAS (Stage 2, kind='nudge'):
+{nudge_block}
+
+USER REFLECTION THOUGHTS (Stage 3, kind='reflection'):
+{reflection_block}
+
+CONNECTIONS:
+{conn_block}
+
+Reply with just your next message in the conversation. No preamble, no metadata.
+"""
+
+
+@lru_cache(maxsize=8)
+def _canvas_chat_prompt_prefix(stage: int) -> str:
     if stage == 1:
         stage_directive = (
             "\nSTAGE 1 — INDEPENDENT THINKING\n"
@@ -1543,26 +1822,7 @@ def _build_canvas_chat_system_prompt(
             "- Help them notice what they did. Don't tell them what they should have done.\n"
         )
 
-    return f"""You are guiding a user through Edward Burger's "Making Up Your Own Mind" thinking practice on a canvas. Your role varies by stage.
-
-THE PUZZLE:
-- Title: {cp.title}
-- Prompt: {cp.puzzle_text}
-- Primary thinking territory: {primary}
-
-THE USER'S CANVAS:
-
-USER THOUGHTS (Stage 1, kind='thought'):
-{user_block}
-
-AI NUDGE NODES ON CANVAS (Stage 2, kind='nudge'):
-{nudge_block}
-
-USER REFLECTION THOUGHTS (Stage 3, kind='reflection'):
-{reflection_block}
-
-CONNECTIONS:
-{conn_block}
+    return f"""You are guiding a user through Edward Burger's "Making Up Your Own Mind" thinking practice on a canvas. Your role varies by stage. The puzzle and the user's canvas follow these instructions.
 {stage_directive}
 ================================================================
 HARD RULES (always)
@@ -1574,8 +1834,6 @@ HARD RULES (always)
 4. When relevant, quote the user's actual words back to them.
 5. Tone: curious friend at a coffee shop. Not coach. Not therapist.
 6. ONE question per turn. Never ask multiple questions in a row.
-
-Reply with just your next message in the conversation. No preamble, no metadata.
 """
 
 
@@ -1618,22 +1876,15 @@ async def canvas_chat_stream(
         )
 
     # Load full canvas state so the chat can reference specific thoughts.
-    user_thoughts = await thought_repo.get_by_kind(course_puzzle_id, "thought")
-    nudge_thoughts = await thought_repo.get_by_kind(course_puzzle_id, "nudge")
-    reflection_thoughts = await thought_repo.get_by_kind(course_puzzle_id, "reflection")
-    raw_connections = await connection_repo.get_by_course_puzzle(course_puzzle_id)
-    connections = [
-        {"from_id": str(c.from_thought_id), "to_id": str(c.to_thought_id)}
-        for c in raw_connections
-    ]
+    canvas = await load_canvas_snapshot(course_puzzle_id, thought_repo, connection_repo)
 
     system_prompt = _build_canvas_chat_system_prompt(
         stage=request.stage,
         cp=cp,
-        user_thoughts=user_thoughts,
-        nudge_thoughts=nudge_thoughts,
-        reflection_thoughts=reflection_thoughts,
-        connections=connections,
+        user_thoughts=canvas.user_thoughts,
+        nudge_thoughts=canvas.nudge_thoughts,
+        reflection_thoughts=canvas.reflection_thoughts,
+        connections=canvas.connection_pairs(),
     )
     prompt = _format_canvas_chat_prompt(request.history, user_message)
 
@@ -1737,13 +1988,13 @@ async def generate_stage2_nudges(
     user = current_user["db_user"]
     cp = await _verify_puzzle_ownership(course_puzzle_id, user)
 
-    existing_nudges = await thought_repo.get_by_kind(course_puzzle_id, "nudge")
+    canvas = await load_canvas_snapshot(course_puzzle_id, thought_repo, connection_repo)
+    existing_nudges = canvas.nudge_thoughts
     if existing_nudges:
-        all_connections = await connection_repo.get_by_course_puzzle(course_puzzle_id)
         nudge_ids = {str(t.id) for t in existing_nudges}
         nudge_connections = [
             c
-            for c in all_connections
+            for c in canvas.connections
             if str(c.from_thought_id) in nudge_ids or str(c.to_thought_id) in nudge_ids
         ]
         return CanvasNudgesResponse(
@@ -1766,7 +2017,7 @@ async def generate_stage2_nudges(
             detail="Slow down — give it a few seconds before generating again.",
         )
 
-    user_thoughts = await thought_repo.get_by_kind(course_puzzle_id, "thought")
+    user_thoughts = canvas.user_thoughts
     thought_lines = "\n".join(
         f'- [{t.id}] "{(t.content or "").strip()}" (element={t.element}, sub={t.sub_element})'
         for t in user_thoughts
@@ -1923,13 +2174,8 @@ def _build_stage3_chat_system_prompt(
 
     Canvas state (thoughts + reflections + connections) is embedded so
     the reflection chat can quote the user's actual work back to them.
+    The voice, rules and phase instructions come before the canvas.
     """
-    forbidden = (
-        "FORBIDDEN WORDS — never use these in your response: "
-        "earth, fire, air, water, element, synthesis, change, Change, "
-        "quintessence, coaching, coach."
-    )
-
     user_block = _format_thoughts_compact(user_thoughts or []) or "  (none)"
     nudge_block = _format_thoughts_compact(nudge_thoughts or []) or "  (none)"
     reflection_block = _format_thoughts_compact(reflection_thoughts or []) or "  (none)"
@@ -1948,15 +2194,33 @@ def _build_stage3_chat_system_prompt(
         f"CONNECTIONS:\n{conn_block}\n"
     )
 
+    tail = (
+        f"\nPUZZLE CONTEXT:\n"
+        f"- Title: {cp.title}\n"
+        f"- Prompt: {cp.puzzle_text}\n\n"
+        f"{canvas_block}"
+    )
+    if phase != "reflect":
+        user_goal = course.crisp_statement or "their goal"
+        domain = course.domain or "their domain"
+        tail += f"\nThey care about: \"{user_goal}\" (context: {domain}).\n"
+    return _stage3_chat_prompt_prefix(phase) + tail
+
+
+@lru_cache(maxsize=4)
+def _stage3_chat_prompt_prefix(phase: str) -> str:
+    forbidden = (
+        "FORBIDDEN WORDS — never use these in your response: "
+        "earth, fire, air, water, element, synthesis, change, Change, "
+        "quintessence, coaching, coach."
+    )
+
     base = (
         "You are a curious friend talking to someone who just worked "
         "through a thinking puzzle. Be warm, direct, and concise (2–4 "
         "short paragraphs max). Use light Markdown with **bold** for "
-        "emphasis. Never include code fences.\n\n"
-        f"PUZZLE CONTEXT:\n"
-        f"- Title: {cp.title}\n"
-        f"- Prompt: {cp.puzzle_text}\n\n"
-        f"{canvas_block}\n"
+        "emphasis. Never include code fences. The puzzle and their canvas "
+        "follow these instructions.\n\n"
         f"{forbidden}\n\n"
         "HARD RULES:\n"
         "- NEVER give the puzzle's answer or any solution-shaped hint.\n"
@@ -1974,15 +2238,13 @@ def _build_stage3_chat_system_prompt(
         )
 
     # phase == "bridge"
-    user_goal = course.crisp_statement or "their goal"
-    domain = course.domain or "their domain"
     return base + (
-        f"\nPHASE: BRIDGE\n"
-        f"They care about: \"{user_goal}\" (context: {domain}).\n"
-        f"We're not summarizing the puzzle — we're linking practice to life.\n"
-        f"Ask one grounded question at a time about where this *kind of thinking*\n"
-        f"already shows up for them, or where they might try it next. No jargon.\n"
-        f"Do NOT mention element names."
+        "\nPHASE: BRIDGE\n"
+        "Their goal and its context are given after the canvas below.\n"
+        "We're not summarizing the puzzle — we're linking practice to life.\n"
+        "Ask one grounded question at a time about where this *kind of thinking*\n"
+        "already shows up for them, or where they might try it next. No jargon.\n"
+        "Do NOT mention element names.\n"
     )
 
 
@@ -2126,30 +2388,24 @@ async def stage3_chat_stream(
             detail="You're chatting fast — give it a few seconds and try again.",
         )
 
-    # We need the parent course for bridge-phase prompts
-    course = await course_repo.get_by_id(cp.course_id)
+    # We need the parent course for bridge-phase prompts, and the canvas
+    # state so the reflection chat can quote actual thoughts.
+    course, canvas = await asyncio.gather(
+        course_repo.get_by_id(cp.course_id),
+        load_canvas_snapshot(course_puzzle_id, thought_repo, connection_repo),
+    )
     if not course:
         raise HTTPException(status_code=500, detail="Parent course not found")
 
-    # Load canvas state so the reflection chat can quote actual thoughts.
-    user_thoughts = await thought_repo.get_by_kind(course_puzzle_id, "thought")
-    nudge_thoughts = await thought_repo.get_by_kind(course_puzzle_id, "nudge")
-    reflection_thoughts = await thought_repo.get_by_kind(course_puzzle_id, "reflection")
-    raw_connections = await connection_repo.get_by_course_puzzle(course_puzzle_id)
-    connections = [
-        {"from_id": str(c.from_thought_id), "to_id": str(c.to_thought_id)}
-        for c in raw_connections
-    ]
-
     if cp.status == "completed":
         system_prompt = _build_completed_puzzle_chat_system_prompt(
             cp,
             course,
             getattr(cp, "synthesis", None),
-            user_thoughts=user_thoughts,
-            nudge_thoughts=nudge_thoughts,
-            reflection_thoughts=reflection_thoughts,
-            connections=connections,
+            user_thoughts=canvas.user_thoughts,
+            nudge_thoughts=canvas.nudge_thoughts,
+            reflection_thoughts=canvas.reflection_thoughts,
+            connections=canvas.connection_pairs(),
         )
     else:
         phase = cp.stage3_phase or "reflect"
@@ -2157,10 +2413,10 @@ async def stage3_chat_stream(
             cp,
             course,
             phase,
-            user_thoughts=user_thoughts,
-            nudge_thoughts=nudge_thoughts,
-            reflection_thoughts=reflection_thoughts,
-            connections=connections,
+            user_thoughts=canvas.user_thoughts,
+            nudge_thoughts=canvas.nudge_thoughts,
+            reflection_thoughts=canvas.reflection_thoughts,
+            connections=canvas.connection_pairs(),
         )
 
     # Build message history for Claude structured messages API
@@ -2369,6 +2625,7 @@ def _row_to_fire_starter_response(row: dict) -> FireStarterResponse:
         flow_of_ideas=row.get("flow_of_ideas") or [],
         created_at=row.get("created_at"),
         image_url=row.get("image_url"),
+        image_renditions=row.get("image_renditions"),
         image_generation_status=row.get("image_generation_status") or "pending",
         image_generation_error=row.get("image_generation_error"),
         image_generated_at=row.get("image_generated_at"),
@@ -2391,7 +2648,7 @@ async def create_fire_starter(
     if not name or not desc:
         raise HTTPException(status_code=400, detail="name and description are required")
 
-    row = fire_starter_repo.create(
+    row = await fire_starter_repo.create(
         {
             "user_id": user.id,
             "course_id": cp.course_id,
@@ -2406,7 +2663,7 @@ async def create_fire_starter(
     if not row:
         raise HTTPException(status_code=500, detail="Failed to save Fire Starter")
 
-    _spawn_fire_starter_image_generation(str(row["id"]))
+    await _spawn_fire_starter_image_generation(str(row["id"]))
 
     course = await course_repo.get_by_id(cp.course_id)
     if not course:
@@ -2445,9 +2702,9 @@ async def list_fire_starters(
         course = await course_repo.get_by_id(course_id)
         if not course or course.user_id != user.id:
             raise HTTPException(status_code=403, detail="Not your course")
-        rows = fire_starter_repo.list_by_course(course_id)
+        rows = await fire_starter_repo.list_by_course(course_id)
     else:
-        rows = fire_starter_repo.list_by_user(user.id)
+        rows = await fire_starter_repo.list_by_user(user.id)
     return [_row_to_fire_starter_response(r) for r in rows]
 
 
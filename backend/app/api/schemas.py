@@ -4,6 +4,7 @@ API Schemas - Request and Response models
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
+from uuid import UUID
 
 # Session schemas
 class SessionStartRequest(BaseModel):
@@ -215,8 +216,30 @@ class ThoughtCreateRequest(BaseModel):
 
 
 class ThoughtUpdatePositionRequest(BaseModel):
-    pos_x: float
-    pos_y: float
+    pos_x: float = Field(allow_inf_nan=False)
+    pos_y: float = Field(allow_inf_nan=False)
+
+
+class ThoughtPosition(BaseModel):
+    # Typed so one malformed entry is a 422 here rather than a failed
+    # batch write for every queued position
+    id: UUID
+    pos_x: float = Field(allow_inf_nan=False)
+    pos_y: float = Field(allow_inf_nan=False)
+
+
+class ThoughtPositionsRequest(BaseModel):
+    positions: List[ThoughtPosition] = Field(default_factory=list, max_length=500)
+    # Write this user's buffered positions before responding (canvas unload)
+    flush: bool = False
+
+
+class ThoughtPositionsResponse(BaseModel):
+    accepted: int
+    # Rows written by this call; 0 when the positions were only buffered
+    written: int = 0
+    # Ids that are not the caller's thoughts (or don't exist); not queued
+    rejected_ids: List[str] = Field(default_factory=list)
 
 
 class ThoughtUpdateContentRequest(BaseModel):
@@ -258,10 +281,20 @@ class ConnectionResponse(BaseModel):
 
 
 class CanvasStateResponse(BaseModel):
-    """Single round-trip payload for the canvas page on mount."""
+    """Single round-trip payload for the canvas page on mount.
+
+    With `?since=<version>` (and `since` set in the response) `thoughts` and
+    `connections` hold only items added or changed after that version, and
+    the deleted_* lists name items removed since. `version` is what to pass
+    as `since` next time; it is also the response's ETag.
+    """
     course_puzzle: CoursePuzzleResponse
     thoughts: List[ThoughtResponse]
     connections: List[ConnectionResponse]
+    version: int = 0
+    since: Optional[int] = None
+    deleted_thought_ids: List[str] = []
+    deleted_connection_ids: List[str] = []
 
 
 class DevRedirectResponse(BaseModel):
@@ -383,6 +416,8 @@ class FireStarterResponse(BaseModel):
     flow_of_ideas: List[dict]
     created_at: Optional[datetime] = None
     image_url: Optional[str] = None
+    # {"webp": {"256": url, "512": url}}; empty until renditions exist
+    image_renditions: Optional[dict] = None
     image_generation_status: Optional[str] = "pending"
     image_generation_error: Optional[str] = None
     image_generated_at: Optional[datetime] = None
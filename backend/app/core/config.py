@@ -15,15 +15,77 @@ class Settings(BaseSettings):
     # Supabase
     SUPABASE_URL: str = ""
     SUPABASE_SERVICE_KEY: str = ""
+    # Max concurrent PostgREST calls per process (thread-offload pool size)
+    SUPABASE_MAX_CONCURRENCY: int = 16
+    # Idle seconds before a pooled keep-alive connection to Supabase is dropped
+    SUPABASE_KEEPALIVE_EXPIRY: float = 60.0
+
+    # Direct Postgres connection (optional): enables LISTEN/NOTIFY fan-out of
+    # course status changes across workers. Without it, status streams learn
+    # about changes made elsewhere (e.g. by app.worker) by re-reading the
+    # status every keep-alive interval (15s) instead of immediately
+    DATABASE_URL: str = ""
+    # Write Ignite thoughts + connections through the transactional
+    # create_ignite_graph RPC (migrations 023, 035) instead of two bulk inserts
+    IGNITE_GRAPH_RPC: bool = False
     
     # Clerk
     CLERK_JWKS_URL: str = ""
+    # Seconds between scheduled JWKS refreshes (unknown kids also trigger one)
+    CLERK_JWKS_REFRESH_SECONDS: float = 3600.0
+    # Verified-token claims memoized until the token's `exp`
+    CLERK_TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    # Authenticated-user cache (keyed by Clerk `sub`); TTL 0 disables it
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    # Cached /user/stats aggregates; TTL bounds staleness from writes made elsewhere
+    DASHBOARD_STATS_CACHE_TTL_SECONDS: float = 300.0
+    # Canvas owner per course_puzzle, so thought/connection creates skip the
+    # ownership query; short because puzzles are deleted on regeneration
+    CANVAS_OWNER_CACHE_TTL_SECONDS: float = 60.0
+    # Positions sent to the bulk PATCH .../thoughts/positions endpoints are
+    # buffered and written per user in one batch this often (migration 032).
+    # Bounds how much movement a crash can lose; 0 writes every update
+    # through. Forced to 0 on Lambda (see get_settings). A buffer holding
+    # max-pending positions flushes early.
+    POSITION_FLUSH_INTERVAL_SECONDS: float = 1.0
+    POSITION_BUFFER_MAX_PENDING: int = 5000
+    
+    # Rate limiting: share counters across workers via Redis (empty = per process)
+    RATE_LIMIT_REDIS_URL: str = ""
+    # Redis calls block the event loop, so connect/read are capped tightly;
+    # after an error, limits use per-process counters for this many seconds
+    RATE_LIMIT_REDIS_TIMEOUT_SECONDS: float = 0.25
+    RATE_LIMIT_REDIS_BACKOFF_SECONDS: float = 30.0
     
     # Anthropic
     ANTHROPIC_API_KEY: str = ""
+    # Responses cached for generate_text(cache=True) call sites; TTL 0 disables
+    LLM_CACHE_TTL_SECONDS: float = 86400.0
+    LLM_CACHE_MAX_ENTRIES: int = 2000
+    # Also keep cached responses in Postgres (migration 025), shared by workers
+    LLM_CACHE_PERSISTENT: bool = False
+    # Session chat: messages sent verbatim after the rolling summary, and how
+    # many more may accumulate before older ones are folded into it
+    CHAT_RECENT_MESSAGES: int = 6
+    CHAT_COMPACT_EVERY_MESSAGES: int = 8
+    # Durable job queue (migration 027): when enabled, puzzle and image
+    # generation are enqueued for `python -m app.worker` instead of running
+    # as in-process tasks
+    JOB_QUEUE_ENABLED: bool = False
+    JOB_CONCURRENCY_PUZZLE_GENERATION: int = 2
+    JOB_CONCURRENCY_FIRE_STARTER_IMAGE: int = 2
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_LEASE_SECONDS: int = 900
+    JOB_POLL_SECONDS: float = 2.0
+    JOB_RETRY_BASE_SECONDS: float = 30.0
     
     # OpenAI
     OPENAI_API_KEY: str = ""
+    # Generated images: widths (px) and formats of the downscaled renditions
+    # stored next to each original (needs Pillow; "avif" needs Pillow 11.3+)
+    IMAGE_RENDITION_WIDTHS: str = "256,512"
+    IMAGE_RENDITION_FORMATS: str = "webp"
     
     # Frontend
     FRONTEND_URL: str = "http://localhost:3000"
@@ -56,7 +118,13 @@ def get_settings() -> Settings:
         except Exception as e:
             logger.error(f"Failed to load AWS secrets, falling back to .env: {e}")
     
-    return Settings()
+    loaded = Settings()
+    # Lambda freezes or recycles the container between invocations, so a
+    # background flush may never run: write positions through instead
+    if os.getenv("AWS_LAMBDA_FUNCTION_NAME") and loaded.POSITION_FLUSH_INTERVAL_SECONDS > 0:
+        logger.info("Running on Lambda; position buffering disabled")
+        loaded.POSITION_FLUSH_INTERVAL_SECONDS = 0.0
+    return loaded
 
 settings = get_settings()
 
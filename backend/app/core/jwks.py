@@ -0,0 +1,107 @@
+"""
+Clerk JWKS manager - kid-indexed public keys with background refresh
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSManager:
+    """Holds Clerk's signing keys, already parsed, indexed by `kid`.
+
+    Keys are refetched every `refresh_interval` seconds (by `start()`'s
+    background task, or lazily on the next lookup if no task is running) and
+    whenever a token names a `kid` we don't know yet, which is how Clerk key
+    rotation shows up. Concurrent refreshes share one in-flight fetch, and
+    unknown-kid refreshes are spaced at least `min_refresh_interval` apart
+    so a stream of tokens with bogus kids can't hammer Clerk.
+
+    A failed fetch keeps the previous keys and is retried on the next miss;
+    it is never cached as "no keys".
+    """
+
+    def __init__(
+        self,
+        url: str,
+        refresh_interval: float = 3600.0,
+        min_refresh_interval: float = 30.0,
+        timeout: float = 10.0,
+    ):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at: Optional[float] = None
+        self._attempted_at: Optional[float] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def get_key(self, kid: Optional[str]) -> Optional[Any]:
+        """Public key for `kid`, refreshing the key set if it's stale or lacks `kid`."""
+        stale = self._fetched_at is None or time.monotonic() - self._fetched_at > self.refresh_interval
+        if stale and self._may_refresh():
+            await self.refresh()
+        key = self._keys.get(kid)
+        if key is None and self._may_refresh():
+            await self.refresh()
+            key = self._keys.get(kid)
+        return key
+
+    def _may_refresh(self) -> bool:
+        if self._inflight is not None and not self._inflight.done():
+            return True
+        return self._attempted_at is None or time.monotonic() - self._attempted_at >= self.min_refresh_interval
+
+    async def refresh(self) -> None:
+        """Refetch the key set; concurrent callers await the same request."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._fetch())
+        await asyncio.shield(self._inflight)
+
+    async def _fetch(self) -> None:
+        self._attempted_at = time.monotonic()
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                response = await client.get(self.url)
+                response.raise_for_status()
+                jwks = response.json()
+        except Exception as e:
+            logger.error(f"Failed to fetch JWKS: {e}")
+            return
+
+        keys: Dict[str, Any] = {}
+        for jwk in jwks.get("keys", []):
+            try:
+                keys[jwk.get("kid")] = jwt.algorithms.RSAAlgorithm.from_jwk(jwk)
+            except Exception as e:
+                logger.warning(f"Skipping unparseable JWK {jwk.get('kid')}: {e}")
+        if keys:
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+            logger.info(f"Loaded {len(keys)} JWKS key(s)")
+
+    def start(self) -> None:
+        """Begin refreshing on a schedule from the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
@@ -0,0 +1,204 @@
+"""
+Write-behind buffer for canvas block positions.
+
+A drag emits a position update per move event for every selected block.
+Instead of one UPDATE per event, `add` records the latest (x, y) per thought
+and a background task writes each user's batch once per
+`POSITION_FLUSH_INTERVAL_SECONDS` through a single bulk call. Newer positions
+for the same thought replace older ones, so a drag costs one write per
+interval however many events it sends.
+
+Durability: positions not yet flushed live only in this worker's memory.
+A crash loses at most one interval of drag movement; a clean shutdown
+flushes everything (see `stop_position_buffers`). Reads that must see the
+latest positions (loading a canvas) call `flush(user_id)` first. Other
+workers see new positions up to one interval late. A batch whose write
+fails is retried on the next flush only for connection errors, and at most
+`MAX_FLUSH_ATTEMPTS` times; anything else (a rejected request, bad data)
+drops it, counted in `dropped`. Buffers register themselves so
+`/health/position-writes` can report lag and write counts.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MAX_FLUSH_ATTEMPTS = 5
+
+_REGISTRY: Dict[str, "PositionWriteBuffer"] = {}
+
+# (owner user id, [(thought_id, x, y), ...]) -> rows written
+PositionWriter = Callable[[str, List[Tuple[str, float, float]]], Awaitable[int]]
+
+
+@dataclass
+class _Batch:
+    since: float = field(default_factory=time.monotonic)
+    positions: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    attempts: int = 0
+
+
+def _is_transient(error: Exception) -> bool:
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ConnectionError))
+
+
+class PositionWriteBuffer:
+    """Latest position per thought, flushed per user in one bulk write.
+
+    `interval_seconds <= 0` disables buffering: `add` callers should write
+    through instead (check `enabled`).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write: PositionWriter,
+        interval_seconds: float,
+        max_pending: int,
+    ):
+        self.name = name
+        self.write = write
+        self.interval_seconds = interval_seconds
+        self.max_pending = max_pending
+        self.received = 0
+        self.coalesced = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self._pending: Dict[str, _Batch] = {}
+        self._size = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        _REGISTRY[name] = self
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval_seconds > 0
+
+    def add(self, user_id: str, positions: Iterable[Tuple[str, float, float]]) -> int:
+        """Queue positions for `user_id`'s thoughts; returns how many were accepted."""
+        batch = self._pending.setdefault(user_id, _Batch())
+        count = 0
+        for thought_id, x, y in positions:
+            if thought_id in batch.positions:
+                self.coalesced += 1
+            else:
+                self._size += 1
+            batch.positions[thought_id] = (x, y)
+            count += 1
+        self.received += count
+        self._ensure_running()
+        if self._size >= self.max_pending:
+            self._wake.set()
+        return count
+
+    async def supersede(self, user_id: str, thought_id: str) -> None:
+        """Drop any queued position for `thought_id` and wait out a flush in
+        progress, so a direct write made next isn't overwritten by an older
+        buffered one. Writes the user's other pending positions, if any."""
+        batch = self._pending.get(user_id)
+        if batch and batch.positions.pop(thought_id, None) is not None:
+            self._size -= 1
+        await self.flush(user_id)
+
+    async def flush(self, user_id: Optional[str] = None) -> int:
+        """Write pending positions now (one user's, or everyone's); returns rows written."""
+        async with self._lock:
+            keys = [user_id] if user_id is not None else list(self._pending)
+            written = 0
+            for key in keys:
+                batch = self._pending.pop(key, None)
+                if not batch or not batch.positions:
+                    continue
+                self._size -= len(batch.positions)
+                rows = [(tid, x, y) for tid, (x, y) in batch.positions.items()]
+                try:
+                    written += await self.write(key, rows)
+                except Exception as e:
+                    self.failures += 1
+                    batch.attempts += 1
+                    if _is_transient(e) and batch.attempts < MAX_FLUSH_ATTEMPTS:
+                        logger.warning("Writing %d %s position(s) failed (%s); retrying next flush",
+                                       len(rows), self.name, e)
+                        self._requeue(key, batch)
+                    else:
+                        self.dropped += len(rows)
+                        logger.error("Dropping %d %s position(s) after %d attempt(s): %s",
+                                     len(rows), self.name, batch.attempts, e)
+                    continue
+                lag_ms = (time.monotonic() - batch.since) * 1000
+                self.last_lag_ms = lag_ms
+                self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+                self.flushes += 1
+            self.written += written
+            return written
+
+    def _requeue(self, user_id: str, failed: _Batch) -> None:
+        # Positions added while the write was in flight are newer; keep them
+        current = self._pending.setdefault(user_id, _Batch(since=failed.since))
+        current.since = min(current.since, failed.since)
+        current.attempts = max(current.attempts, failed.attempts)
+        for thought_id, xy in failed.positions.items():
+            if thought_id not in current.positions:
+                current.positions[thought_id] = xy
+                self._size += 1
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def stop(self) -> None:
+        """Cancel the flush task and write whatever is still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, float]:
+        now = time.monotonic()
+        oldest = min((b.since for b in self._pending.values() if b.positions), default=None)
+        return {
+            "pending": self._size,
+            "pending_users": sum(1 for b in self._pending.values() if b.positions),
+            "oldest_pending_ms": round((now - oldest) * 1000, 1) if oldest else 0.0,
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_lag_ms": round(self.last_lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+        }
+
+
+def position_buffer_stats() -> Dict[str, Dict[str, float]]:
+    return {name: buf.stats() for name, buf in _REGISTRY.items()}
+
+
+async def stop_position_buffers() -> None:
+    for buf in list(_REGISTRY.values()):
+        await buf.stop()
@@ -1,51 +1,233 @@
 """
 Rate Limiter - Protect against token abuse
-Uses in-memory storage with sliding window algorithm
+Sliding-window-counter algorithm (O(1) per check) over a pluggable counter
+backend: in-memory per process, or Redis so limits hold across workers and
+survive Lambda cold starts. The Redis client is synchronous and called from
+async handlers, so its timeouts are short and errors fall back to in-memory
+counters for a while (RATE_LIMIT_REDIS_BACKOFF_SECONDS).
 """
+import math
+import threading
 import time
-from collections import defaultdict
-from functools import wraps
+from abc import ABC, abstractmethod
 from fastapi import HTTPException, Request, Depends
-from typing import Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple
 import logging
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+# Redis is optional; without it (or without RATE_LIMIT_REDIS_URL) limits are per process
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class RateLimitBackend(ABC):
+    """Counter storage for the sliding-window-counter limiter.
+
+    Counts are bucketed by fixed window index (`int(now // window_seconds)`);
+    the limiter only ever needs the current and previous bucket for a key.
+    """
+
+    @abstractmethod
+    def incr(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        """Add one hit to `window`; return (previous window count, current count)."""
+
+    @abstractmethod
+    def decr(self, key: str, window: int, window_seconds: int) -> None:
+        """Undo one hit in `window` (used when the hit is rejected)."""
+
+    @abstractmethod
+    def counts(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        """Return (previous window count, current count) without recording a hit."""
+
+
+class InMemoryBackend(RateLimitBackend):
+    """Per-process counters. Idle keys are swept every `sweep_interval` seconds."""
+
+    def __init__(self, sweep_interval: float = 60.0):
+        # {key: [window, previous_count, current_count, expires_at]}
+        self._buckets: Dict[str, List] = {}
+        self._lock = threading.Lock()
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def _roll(self, key: str, window: int, window_seconds: int) -> List:
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket[0] < window - 1:
+            bucket = [window, 0, 0, 0.0]
+            self._buckets[key] = bucket
+        elif bucket[0] == window - 1:
+            bucket[:3] = [window, bucket[2], 0]
+        # A bucket stays relevant until the window after `window` ends
+        bucket[3] = (window + 2) * window_seconds
+        return bucket
+
+    def _maybe_sweep(self) -> None:
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval
+        wall = time.time()
+        stale = [k for k, b in self._buckets.items() if b[3] <= wall]
+        for k in stale:
+            del self._buckets[k]
+
+    def incr(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        with self._lock:
+            self._maybe_sweep()
+            bucket = self._roll(key, window, window_seconds)
+            bucket[2] += 1
+            return bucket[1], bucket[2]
+
+    def decr(self, key: str, window: int, window_seconds: int) -> None:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket and bucket[0] == window and bucket[2] > 0:
+                bucket[2] -= 1
+
+    def counts(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or bucket[0] < window - 1:
+                return 0, 0
+            if bucket[0] == window - 1:
+                return bucket[2], 0
+            return bucket[1], bucket[2]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RedisBackend(RateLimitBackend):
+    """Counters shared by every worker through Redis (one key per window, auto-expiring)."""
+
+    def __init__(self, client, prefix: str = "ratelimit"):
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key: str, window: int) -> str:
+        return f"{self.prefix}:{key}:{window}"
+
+    def incr(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        current = self._key(key, window)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.incr(current)
+        pipe.expire(current, window_seconds * 2)
+        pipe.get(self._key(key, window - 1))
+        cur, _, prev = pipe.execute()
+        return int(prev or 0), int(cur)
+
+    def decr(self, key: str, window: int, window_seconds: int) -> None:
+        self.client.decr(self._key(key, window))
+
+    def counts(self, key: str, window: int, window_seconds: int) -> Tuple[int, int]:
+        prev, cur = self.client.mget(self._key(key, window - 1), self._key(key, window))
+        return int(prev or 0), int(cur or 0)
+
+
 class RateLimiter:
-    """Simple in-memory rate limiter with sliding window."""
-    
-    def __init__(self):
-        # Store: {key: [(timestamp, count), ...]}
-        self.requests = defaultdict(list)
-        
-    def _clean_old_requests(self, key: str, window_seconds: int):
-        """Remove requests outside the current window."""
-        cutoff = time.time() - window_seconds
-        self.requests[key] = [
-            (ts, count) for ts, count in self.requests[key] 
-            if ts > cutoff
-        ]
-    
+    """Sliding-window-counter rate limiter.
+
+    The hit count over the last `window_seconds` is estimated as
+    `previous_window * (1 - elapsed_fraction) + current_window`, which needs
+    two counters per key instead of a timestamp per request.
+
+    With a `fallback` backend, an error from `backend` switches every check
+    to the fallback for `backoff_seconds` before the backend is tried again,
+    so an unreachable Redis costs one timeout per backoff period instead of
+    one per request. Without a fallback the request is allowed and a warning
+    logged.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[RateLimitBackend] = None,
+        fallback: Optional[RateLimitBackend] = None,
+        backoff_seconds: float = 30.0,
+    ):
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.fallback = fallback
+        self.backoff_seconds = backoff_seconds
+        self._skip_until = 0.0
+
+    def _active(self) -> RateLimitBackend:
+        if self.fallback is not None and time.monotonic() < self._skip_until:
+            return self.fallback
+        return self.backend
+
+    def _backend_failed(self, backend: RateLimitBackend, e: Exception) -> Optional[RateLimitBackend]:
+        """Start the backoff; returns the backend to retry this call on, if any."""
+        if self.fallback is None or backend is self.fallback:
+            return None
+        self._skip_until = time.monotonic() + self.backoff_seconds
+        logger.warning(
+            f"Rate limit backend unavailable, using per-process limits for "
+            f"{self.backoff_seconds:.0f}s: {e}"
+        )
+        return self.fallback
+
+    @staticmethod
+    def _position(window_seconds: int) -> Tuple[int, float]:
+        now = time.time()
+        return int(now // window_seconds), (now % window_seconds) / window_seconds
+
     def is_allowed(self, key: str, max_requests: int, window_seconds: int) -> bool:
-        """Check if request is allowed under rate limit."""
-        self._clean_old_requests(key, window_seconds)
-        
-        total = sum(count for _, count in self.requests[key])
-        
-        if total >= max_requests:
-            return False
-        
-        self.requests[key].append((time.time(), 1))
+        """Check if request is allowed under rate limit (and record it if so)."""
+        window, elapsed = self._position(window_seconds)
+        backend: Optional[RateLimitBackend] = self._active()
+        while backend is not None:
+            try:
+                prev, cur = backend.incr(key, window, window_seconds)
+                if prev * (1 - elapsed) + cur > max_requests:
+                    backend.decr(key, window, window_seconds)
+                    return False
+                return True
+            except Exception as e:
+                backend = self._backend_failed(backend, e)
+                if backend is None:
+                    logger.warning(f"Rate limit backend unavailable, allowing {key}: {e}")
         return True
-    
+
     def get_remaining(self, key: str, max_requests: int, window_seconds: int) -> int:
         """Get remaining requests in current window."""
-        self._clean_old_requests(key, window_seconds)
-        total = sum(count for _, count in self.requests[key])
-        return max(0, max_requests - total)
+        window, elapsed = self._position(window_seconds)
+        backend: Optional[RateLimitBackend] = self._active()
+        while backend is not None:
+            try:
+                prev, cur = backend.counts(key, window, window_seconds)
+                return max(0, max_requests - math.ceil(prev * (1 - elapsed) + cur))
+            except Exception as e:
+                backend = self._backend_failed(backend, e)
+                if backend is None:
+                    logger.warning(f"Rate limit backend unavailable for {key}: {e}")
+        return max_requests
+
+
+def _default_limiter() -> RateLimiter:
+    if settings.RATE_LIMIT_REDIS_URL:
+        if REDIS_AVAILABLE:
+            logger.info("Rate limiting with shared Redis counters")
+            timeout = settings.RATE_LIMIT_REDIS_TIMEOUT_SECONDS
+            client = redis.Redis.from_url(
+                settings.RATE_LIMIT_REDIS_URL,
+                socket_connect_timeout=timeout,
+                socket_timeout=timeout,
+            )
+            return RateLimiter(
+                RedisBackend(client),
+                fallback=InMemoryBackend(),
+                backoff_seconds=settings.RATE_LIMIT_REDIS_BACKOFF_SECONDS,
+            )
+        logger.warning("RATE_LIMIT_REDIS_URL is set but redis is not installed; using in-memory limits")
+    return RateLimiter(InMemoryBackend())
 
 # Global rate limiter instance
-rate_limiter = RateLimiter()
+rate_limiter = _default_limiter()
 
 # Rate limit configurations
 RATE_LIMITS = {
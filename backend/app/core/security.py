@@ -1,49 +1,60 @@
 """
 Security utilities - JWT validation with Clerk
 """
+import hashlib
+import time
+
 import jwt
-import httpx
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from functools import lru_cache
 from typing import Optional, Dict, Any
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.jwks import JWKSManager
 from app.domain.entities import User
 
 security = HTTPBearer()
 optional_security = HTTPBearer(auto_error=False)
 
 @lru_cache(maxsize=1)
-def get_jwks():
-    """Fetch JWKS from Clerk (cached)"""
+def get_jwks_manager() -> Optional[JWKSManager]:
+    """Process-wide Clerk key manager (None when Clerk isn't configured)."""
     if not settings.CLERK_JWKS_URL:
         return None
-    
-    try:
-        response = httpx.get(settings.CLERK_JWKS_URL)
-        return response.json()
-    except Exception as e:
-        print(f"Failed to fetch JWKS: {e}")
-        return None
+    return JWKSManager(
+        settings.CLERK_JWKS_URL,
+        refresh_interval=settings.CLERK_JWKS_REFRESH_SECONDS,
+    )
+
+# Claims of tokens we've already verified, keyed by a digest of the token and
+# kept until the token's `exp`, so repeat requests skip the RSA check.
+_verified_tokens: TTLCache[dict] = TTLCache(
+    "verified_tokens",
+    maxsize=settings.CLERK_TOKEN_CACHE_MAX_ENTRIES,
+    ttl_seconds=24 * 3600,
+)
 
-def get_public_key(token: str):
+async def get_public_key(token: str):
     """Get the public key for verifying the JWT"""
-    jwks = get_jwks()
-    if not jwks:
+    manager = get_jwks_manager()
+    if not manager:
         return None
     
     try:
-        unverified_header = jwt.get_unverified_header(token)
-        kid = unverified_header.get("kid")
-        
-        for key in jwks.get("keys", []):
-            if key.get("kid") == kid:
-                return jwt.algorithms.RSAAlgorithm.from_jwk(key)
+        kid = jwt.get_unverified_header(token).get("kid")
     except Exception as e:
         print(f"Failed to get public key: {e}")
-    
-    return None
+        return None
+    return await manager.get_key(kid)
+
+@lru_cache(maxsize=1)
+def get_user_repo():
+    """User repository shared across requests (one Supabase client per process)."""
+    # Lazy import to avoid circular dependency
+    from app.adapters.supabase_adapter import SupabaseUserRepository
+    return SupabaseUserRepository()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Security(security)
@@ -60,12 +71,8 @@ async def get_current_user(
     token = credentials.credentials
     jwt_user = await get_user_from_token(token)
     
-    # Lazy import to avoid circular dependency
-    from app.adapters.supabase_adapter import SupabaseUserRepository
-    
     # Get or create user in database
-    user_repo = SupabaseUserRepository()
-    db_user = await user_repo.get_or_create(
+    db_user = await get_user_repo().get_or_create(
         clerk_id=jwt_user["user_id"],
         email=jwt_user.get("email")
     )
@@ -91,7 +98,12 @@ async def get_user_from_token(token: str) -> dict:
             "email": "dev@example.com",
         }
     
-    public_key = get_public_key(token)
+    token_key = hashlib.sha256(token.encode()).digest()
+    cached = _verified_tokens.get(token_key)
+    if cached:
+        return cached
+    
+    public_key = await get_public_key(token)
     if not public_key:
         # IMPORTANT: Do NOT silently fall back to a fake user when Clerk is configured.
         # That creates identity mismatches (session created as one user, responded as another).
@@ -113,10 +125,13 @@ async def get_user_from_token(token: str) -> dict:
         print(f"[DEBUG] JWT payload keys: {list(payload.keys())}")
         # Clerk may put email in different places
         email = payload.get("email") or payload.get("primary_email_address") or payload.get("email_addresses", [{}])[0].get("email_address")
-        return {
+        jwt_user = {
             "user_id": payload.get("sub"),
             "email": email,
         }
+        if payload.get("exp"):
+            _verified_tokens.set(token_key, jwt_user, ttl_seconds=payload["exp"] - time.time())
+        return jwt_user
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired. Get a fresh token from DramaRama and try again.")
     except jwt.InvalidTokenError as e:
@@ -0,0 +1,73 @@
+"""
+In-process pub/sub for course status changes.
+
+`SupabaseCourseRepository` publishes whenever it writes `course_status`;
+`/course/{id}/status-stream` subscribes and wakes on the next change instead
+of polling the database. Subscribers only see changes made by this worker
+unless the Postgres NOTIFY bridge (app.adapters.pg_notify_adapter) is
+running, which republishes changes made anywhere.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CourseStatusBus:
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(set)
+        # Set by the NOTIFY bridge: whether changes made by other processes
+        # are reaching this bus right now, and how many times it has
+        # (re)connected. Changes made while it was down were never published.
+        self.remote_connected = False
+        self.remote_epoch = 0
+
+    def set_remote_connected(self, connected: bool) -> None:
+        if connected and not self.remote_connected:
+            self.remote_epoch += 1
+        self.remote_connected = connected
+
+    def subscribe(self, course_id: str) -> asyncio.Queue:
+        """Queue that receives `{"course_status", "generation_error"}` dicts for `course_id`.
+
+        Must be called from the event loop that will read the queue; pair
+        with `unsubscribe` in a `finally`.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers[course_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, course_id: str, queue: asyncio.Queue) -> None:
+        subs = self._subscribers.get(course_id)
+        if not subs:
+            return
+        for entry in [e for e in subs if e[1] is queue]:
+            subs.discard(entry)
+        if not subs:
+            self._subscribers.pop(course_id, None)
+
+    def publish(
+        self,
+        course_id: str,
+        course_status: str,
+        generation_error: Optional[str] = None,
+    ) -> None:
+        """Deliver a status change to every subscriber. Safe to call from any thread."""
+        event: Dict[str, Any] = {
+            "course_status": course_status,
+            "generation_error": generation_error,
+        }
+        for loop, queue in list(self._subscribers.get(str(course_id), ())):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # Subscriber's loop has closed; it'll never unsubscribe itself
+                self.unsubscribe(str(course_id), queue)
+
+    def subscriber_count(self) -> int:
+        return sum(len(s) for s in self._subscribers.values())
+
+
+course_status_bus = CourseStatusBus()
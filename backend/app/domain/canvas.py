@@ -0,0 +1,103 @@
+"""
+Canvas snapshot - everything the canvas chat prompts need, loaded in one go.
+
+The chat endpoints used to await one query per thought kind plus one for
+connections, all in series, before the first token could stream. The
+loader here fetches every thought for the course puzzle in a single query
+(partitioned by `kind` in memory) and the connections concurrently.
+
+`load_canvas_delta` serves `?since=<version>` refreshes: only the rows
+written after that canvas version, plus tombstones for deleted ones.
+"""
+import asyncio
+from typing import Dict, List
+
+from app.domain.entities import Thought, ThoughtConnection
+from app.ports.repositories import (
+    CanvasVersionRepository,
+    ThoughtConnectionRepository,
+    ThoughtRepository,
+)
+
+
+class CanvasSnapshot:
+    def __init__(self, thoughts: List[Thought], connections: List[ThoughtConnection]):
+        self.thoughts = thoughts
+        self.connections = connections
+        self._by_kind: Dict[str, List[Thought]] = {"thought": [], "nudge": [], "reflection": []}
+        for t in thoughts:
+            self._by_kind.setdefault(t.kind, []).append(t)
+
+    def by_kind(self, kind: str) -> List[Thought]:
+        """Thoughts of `kind`, in flow_order (same as `ThoughtRepository.get_by_kind`)."""
+        return self._by_kind.get(kind, [])
+
+    @property
+    def user_thoughts(self) -> List[Thought]:
+        return self.by_kind("thought")
+
+    @property
+    def nudge_thoughts(self) -> List[Thought]:
+        return self.by_kind("nudge")
+
+    @property
+    def reflection_thoughts(self) -> List[Thought]:
+        return self.by_kind("reflection")
+
+    def connection_pairs(self) -> List[Dict[str, str]]:
+        """Connections as the `{"from_id", "to_id"}` dicts the chat prompt builders take."""
+        return [
+            {"from_id": str(c.from_thought_id), "to_id": str(c.to_thought_id)}
+            for c in self.connections
+        ]
+
+
+async def load_canvas_snapshot(
+    course_puzzle_id: str,
+    thought_repo: ThoughtRepository,
+    connection_repo: ThoughtConnectionRepository,
+) -> CanvasSnapshot:
+    thoughts, connections = await asyncio.gather(
+        thought_repo.get_by_course_puzzle(course_puzzle_id),
+        connection_repo.get_by_course_puzzle(course_puzzle_id),
+    )
+    return CanvasSnapshot(thoughts, connections)
+
+
+class CanvasDelta:
+    def __init__(
+        self,
+        since: int,
+        thoughts: List[Thought],
+        connections: List[ThoughtConnection],
+        deleted_thought_ids: List[str],
+        deleted_connection_ids: List[str],
+    ):
+        self.since = since
+        self.thoughts = thoughts
+        self.connections = connections
+        self.deleted_thought_ids = deleted_thought_ids
+        self.deleted_connection_ids = deleted_connection_ids
+
+
+async def load_canvas_delta(
+    course_puzzle_id: str,
+    since: int,
+    thought_repo: ThoughtRepository,
+    connection_repo: ThoughtConnectionRepository,
+    version_repo: CanvasVersionRepository,
+) -> CanvasDelta:
+    """Changes after version `since`. The caller checks `since` against the
+    canvas's pruned_through first; older versions need a full snapshot."""
+    thoughts, connections, tombstones = await asyncio.gather(
+        thought_repo.get_by_course_puzzle(course_puzzle_id, changed_since=since),
+        connection_repo.get_by_course_puzzle(course_puzzle_id, changed_since=since),
+        version_repo.get_tombstones(course_puzzle_id, since),
+    )
+    return CanvasDelta(
+        since=since,
+        thoughts=thoughts,
+        connections=connections,
+        deleted_thought_ids=[t.item_id for t in tombstones if t.item_type == "thought"],
+        deleted_connection_ids=[t.item_id for t in tombstones if t.item_type == "connection"],
+    )
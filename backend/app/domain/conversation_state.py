@@ -0,0 +1,78 @@
+"""
+Rolling conversation state for session chat.
+
+Each /session/{id}/chat turn used to resend the whole transcript. The
+session instead keeps a compacted summary of older turns plus a
+checkpoint (`summary_through`, the created_at of the last folded message).
+A turn loads only the messages after the checkpoint; once more than
+`recent + compact_every` of them pile up, everything but the last `recent`
+is folded into the summary, so prompt size stays flat however long the
+session runs.
+"""
+import logging
+from typing import List
+
+from app.core.config import settings
+from app.domain.entities import ElementMessage, Session
+from app.domain.services import build_conversation_summary_prompt
+from app.ports.llm import LLMClient
+from app.ports.repositories import ElementMessageRepository, SessionRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationState:
+    def __init__(self, summary: str, messages: List[ElementMessage]):
+        self.summary = summary
+        # Everything after the checkpoint, oldest first
+        self.messages = messages
+
+    def add(self, message: ElementMessage) -> None:
+        self.messages.append(message)
+
+    def history(self) -> List[dict]:
+        """The messages to send verbatim, as `build_batched_chat_prompt` takes them."""
+        return [{"role": m.role, "message_text": m.message_text} for m in self.messages]
+
+    def to_compact(self) -> List[ElementMessage]:
+        """Messages due to be folded into the summary (empty until the window overflows)."""
+        recent = settings.CHAT_RECENT_MESSAGES
+        if len(self.messages) <= recent + settings.CHAT_COMPACT_EVERY_MESSAGES:
+            return []
+        return self.messages[: len(self.messages) - recent]
+
+
+async def load_conversation_state(
+    session: Session, message_repo: ElementMessageRepository
+) -> ConversationState:
+    messages = await message_repo.get_for_session_since(session.id, session.summary_through)
+    return ConversationState(session.conversation_summary or "", messages)
+
+
+async def compact_conversation(
+    session: Session,
+    state: ConversationState,
+    llm: LLMClient,
+    session_repo: SessionRepository,
+) -> None:
+    """Fold `state.to_compact()` into the session's summary and move the checkpoint."""
+    folded = state.to_compact()
+    if not folded or folded[-1].created_at is None:
+        return
+    prompt = build_conversation_summary_prompt(
+        problem_description=session.problem_description or "",
+        existing_summary=state.summary,
+        messages=[{"role": m.role, "message_text": m.message_text} for m in folded],
+    )
+    try:
+        summary = (await llm.generate_text(prompt, max_tokens=400)).strip()
+    except Exception as e:
+        logger.warning(f"Conversation compaction failed for session {session.id}: {e}")
+        return
+    if not summary:
+        return
+    await session_repo.update(
+        session.id,
+        conversation_summary=summary,
+        summary_through=folded[-1].created_at,
+    )
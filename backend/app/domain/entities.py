@@ -56,6 +56,9 @@ class Session(BaseModel):
     cube_image_url: Optional[str] = None  # DALL-E generated image URL
     # Unified understanding document (built/updated by LLM during session)
     understanding_document: Optional[str] = None
+    # Rolling chat summary: element_messages up to summary_through are folded in
+    conversation_summary: Optional[str] = None
+    summary_through: Optional[datetime] = None
 
 class Response(BaseModel):
     id: str
@@ -241,6 +244,8 @@ class Course(BaseModel):
 
     intake_status: Literal["draft", "in_progress", "complete", "abandoned"] = "in_progress"
     intake_messages: List[IntakeMessage] = []
+    # First user turn, trimmed for the courses list (migration 034)
+    intake_preview: Optional[str] = None
 
     crisp_statement: Optional[str] = None
     # Short label used for course title/UI. Completes:
@@ -349,6 +354,22 @@ class ThoughtConnection(BaseModel):
     created_at: Optional[datetime] = None
 
 
+class CanvasVersion(BaseModel):
+    """Change counter for one canvas (course_puzzle or ignite_problem),
+    bumped by triggers on every write to its rows (migration 033)."""
+    canvas_id: str
+    version: int = 0
+    # Tombstones at or below this version have been pruned, so deltas from
+    # an older version can't be served
+    pruned_through: int = 0
+
+
+class CanvasTombstone(BaseModel):
+    item_type: Literal["thought", "connection", "message"]
+    item_id: str
+    version: int
+
+
 class FireStarter(BaseModel):
     id: Optional[UUID] = None
     user_id: UUID
@@ -359,3 +380,27 @@ class FireStarter(BaseModel):
     element_combination: List[str]
     flow_of_ideas: List[dict]
     created_at: Optional[datetime] = None
+
+
+# ============ Background jobs ============
+
+JOB_PUZZLE_GENERATION = "puzzle_generation"
+JOB_FIRE_STARTER_IMAGE = "fire_starter_image"
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    payload: dict = {}
+    status: Literal["queued", "running", "succeeded", "failed"] = "queued"
+    attempts: int = 0
+    max_attempts: int = 3
+    run_after: Optional[datetime] = None
+    locked_by: Optional[str] = None
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    @property
+    def final_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
@@ -9,9 +9,9 @@ import json
 import logging
 from typing import Optional
 
+from app.ports.llm import LLMClient
 from app.ports.repositories import CourseRepository, CoursePuzzleRepository
 from app.domain.services import build_puzzle_generation_prompt
-from app.adapters.claude_adapter import ClaudeStreamingAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -29,13 +29,17 @@ async def generate_course_puzzles(
     course_id: str,
     course_repo: CourseRepository,
     puzzle_repo: CoursePuzzleRepository,
-    llm_client: ClaudeStreamingAdapter,
+    llm_client: LLMClient,
+    final_attempt: bool = True,
 ) -> None:
     """
-    Generate puzzles for a course. Fire-and-forget asyncio task.
+    Generate puzzles for a course. Fire-and-forget asyncio task, or a job
+    run by app.worker.
 
     Idempotent on retry: deletes any existing course_puzzles before
-    generating new ones.
+    generating new ones. With final_attempt=False a failure is re-raised
+    instead of marking the course generation_failed, so the job queue can
+    retry it without the client seeing a transient failure.
     """
     try:
         await course_repo.update_course_status(course_id, "generating")
@@ -89,6 +93,9 @@ async def generate_course_puzzles(
         )
 
     except Exception as e:
+        if not final_attempt:
+            logger.warning("Puzzle generation attempt failed for course %s: %s", course_id, e)
+            raise
         logger.exception("Puzzle generation failed for course %s", course_id)
         try:
             await course_repo.update_course_status(
@@ -1,6 +1,7 @@
 """
 Domain Services - Business logic
 """
+from functools import lru_cache
 from typing import List, Dict
 import re
 import json
@@ -865,23 +866,34 @@ def build_batched_chat_prompt(
     conversation_history: list,
     user_message: str,
     existing_document: str = "",
+    conversation_summary: str = "",
 ) -> str:
     """
     Single-call replacement for element-select + coaching + doc-update.
     Returns a JSON object: {element, response, understanding}.
+
+    `conversation_history` is the recent turns only once older ones have
+    been folded into `conversation_summary` (see domain/conversation_state.py).
     """
-    history_text = ""
     if conversation_history:
-        for msg in conversation_history:
-            role_label = "User" if msg.get("role") == "user" else "Coach"
-            history_text += f"{role_label}: {msg.get('message_text', '')}\n"
+        history_text = "".join(
+            f"{'User' if msg.get('role') == 'user' else 'Coach'}: {msg.get('message_text', '')}\n"
+            for msg in conversation_history
+        )
     else:
         history_text = "(No prior conversation yet)"
 
+    summary_block = ""
+    if conversation_summary:
+        summary_block = f"""
+EARLIER IN THE CONVERSATION (summary):
+{conversation_summary}
+"""
+
     return f"""You are helping someone think through a puzzle. Read the conversation and do three things at once.
 
 PUZZLE: {problem_description}
-
+{summary_block}
 CONVERSATION SO FAR:
 {history_text}
 
@@ -933,6 +945,35 @@ BAD example (never do this):
 Output ONLY the JSON. No markdown fences. No extra text."""
 
 
+def build_conversation_summary_prompt(
+    problem_description: str,
+    existing_summary: str,
+    messages: list,
+) -> str:
+    """Fold older chat turns into the rolling conversation summary."""
+    transcript = "\n".join(
+        f"{'User' if msg.get('role') == 'user' else 'Coach'}: {msg.get('message_text', '')}"
+        for msg in messages
+    )
+    return f"""Compress a coaching conversation about a puzzle so it can be continued without the full transcript.
+
+PUZZLE: {problem_description}
+
+SUMMARY SO FAR:
+{existing_summary or "(none yet)"}
+
+NEW TURNS TO FOLD IN:
+{transcript}
+
+Write the updated summary. Rules:
+- Keep what a coach needs to continue: approaches tried, claims made and later dropped, questions already asked, where the user got stuck.
+- Keep the user's own key phrasings where they matter.
+- Chronological, plain short sentences. No headers, no bullets, no evaluation.
+- At most 150 words.
+
+Return ONLY the summary text."""
+
+
 def build_extract_understanding_prompt(
     problem_description: str,
     element: str,
@@ -1018,6 +1059,7 @@ Output ONLY the JSON object. No markdown fences. No explanation."""
 
 # ============ Phase 2: Course intake chatbot ============
 
+@lru_cache(maxsize=1)
 def build_intake_chatbot_system_prompt() -> str:
     """Build the SYSTEM prompt for the intake chatbot.
 
@@ -1377,17 +1419,22 @@ Applied moves on canvas (right side, green nodes):
             f"{opening_guide_message[:4000]}\n"
         )
 
-    return f"""You are the AI Guide for **Ignite** (application mode) in DramaRama.
-
-The user places thoughts on a canvas, tags them with **elements** of effective thinking (Earth, Fire, Air, Water, Change), and connects ideas to work a real puzzle.
-
+    return _ignite_guide_prompt_prefix() + f"""
 CURRENT PUZZLE:
 Title: {problem_title}
 Description:
 {problem_description}
-{terrain_block}{fs_block}{opening_block}
+{terrain_block}{fs_block}{opening_block}"""
+
+
+@lru_cache(maxsize=1)
+def _ignite_guide_prompt_prefix() -> str:
+    return """You are the AI Guide for **Ignite** (application mode) in DramaRama.
+
+The user places thoughts on a canvas, tags them with **elements** of effective thinking (Earth, Fire, Air, Water, Change), and connects ideas to work a real puzzle.
+
 Rules:
-- You **do** have access to the Fire Starter, matched Forge puzzle, terrain, and applied nodes listed above. Never say you cannot see Forge sessions or Fire Starters.
+- You **do** have access to the Fire Starter, matched Forge puzzle, terrain, and applied nodes listed below. Never say you cannot see Forge sessions or Fire Starters.
 - When asked how a Fire Starter was applied, explain using the applied nodes, description, and opening message — cite specific moves.
 - Be concise and practical. Reference their actual canvas nodes when possible.
 - Use **element** terminology, never "lens". Never refer to "Sandbox"; this is Ignite.
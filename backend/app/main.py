@@ -3,24 +3,68 @@ DramaRama Backend API
 FastAPI application with hexagonal architecture
 """
 import logging
+import math
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from mangum import Mangum
 
 from app.api.routes import router as api_router
 from app.api.ignite_routes import router as ignite_router
+from app.adapters.claude_adapter import get_anthropic_client, llm_usage
+from app.adapters.llm_cache_adapter import get_llm_response_cache
+from app.adapters.pg_notify_adapter import get_course_status_listener
+from app.adapters.supabase_adapter import close_supabase_client, get_supabase_client
+from app.core.cache import cache_stats
 from app.core.config import settings
+from app.core.position_buffer import position_buffer_stats, stop_position_buffers
+from app.core.security import get_jwks_manager
+from app.core.status_bus import course_status_bus
+from app.dependencies import get_openai_client
 
 # Route app logs through Uvicorn's configured logger so they reliably show up in
 # `journalctl -u dramarama.service` when running under systemd.
 logger = logging.getLogger("uvicorn.error")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared clients once per process so the first request doesn't
+    # pay for client construction; every request after that reuses their
+    # keep-alive connection pools.
+    get_supabase_client()
+    get_anthropic_client()
+    logger.info("Shared Supabase and Anthropic clients ready")
+    jwks = get_jwks_manager()
+    if jwks:
+        jwks.start()
+    status_listener = get_course_status_listener(course_status_bus)
+    if status_listener:
+        status_listener.start()
+    yield
+    # Buffered canvas positions are written before the clients close
+    await stop_position_buffers()
+    if status_listener:
+        await status_listener.stop()
+    if jwks:
+        await jwks.stop()
+    close_supabase_client()
+    await get_anthropic_client().close()
+    get_anthropic_client.cache_clear()
+    if get_openai_client.cache_info().currsize:
+        get_openai_client().close()
+        get_openai_client.cache_clear()
+
+
 app = FastAPI(
     title="DramaRama API",
     description="Backend API for DramaRama - The Mental Gym for Algorithms",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Friendlier error when Supabase schema hasn't been created yet
@@ -95,6 +139,27 @@ if PostgrestAPIError:
             content={"detail": f"Database error: {detail}"},
         )
 
+def _json_safe(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    return value
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_error_handler(request: Request, exc: RequestValidationError):
+    # Same body as FastAPI's default handler, but a rejected NaN/Infinity
+    # (e.g. a position of 1e400) is echoed back as a string instead of
+    # failing JSON encoding with a 500.
+    return JSONResponse(
+        status_code=422,
+        content={"detail": _json_safe(jsonable_encoder(exc.errors()))},
+    )
+
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -118,8 +183,23 @@ app.include_router(ignite_router, prefix="/api")
 async def health_check():
     return {"status": "healthy", "service": "dramarama-api"}
 
-# AWS Lambda handler
-handler = Mangum(app, lifespan="off")
+@app.get("/health/caches")
+async def cache_health():
+    """Per-process cache sizes and hit/miss counters."""
+    return cache_stats()
+
+@app.get("/health/position-writes")
+async def position_writes_health():
+    """Buffered canvas position writes: pending, coalesced, written, flush lag."""
+    return position_buffer_stats()
+
+@app.get("/health/llm-usage")
+async def llm_usage_health():
+    """Per-process Claude token totals and response-cache hit rates."""
+    return {**llm_usage.snapshot(), "response_cache": get_llm_response_cache().stats()}
+
+# AWS Lambda handler (startup runs on cold start so the shared clients are warm)
+handler = Mangum(app, lifespan="auto")
 
 if __name__ == "__main__":
     import uvicorn
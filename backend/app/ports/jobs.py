@@ -0,0 +1,33 @@
+"""
+Job Queue Port - Abstract interface for durable background work
+"""
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from app.domain.entities import Job
+
+
+class JobQueue(ABC):
+    @abstractmethod
+    async def enqueue(self, kind: str, payload: dict, max_attempts: int = 3) -> Job:
+        """Queue a job. If a job of `kind` for the same payload course_id is
+        already queued or running, return that one instead."""
+        pass
+
+    @abstractmethod
+    async def claim(self, kind: str, limit: int, worker_id: str, lease_seconds: float) -> List[Job]:
+        """Lease up to `limit` runnable jobs of `kind` (queued and due, or with an
+        expired lease and attempts left) to `worker_id`, incrementing their
+        attempt count. Expired leases with no attempts left are marked failed."""
+        pass
+
+    @abstractmethod
+    async def complete(self, job_id: str, worker_id: str) -> None:
+        pass
+
+    @abstractmethod
+    async def fail(
+        self, job_id: str, worker_id: str, error: str, retry_in_seconds: Optional[float]
+    ) -> None:
+        """Record a failed attempt; requeue after `retry_in_seconds`, or give up if None."""
+        pass
@@ -2,11 +2,46 @@
 LLM Port - Abstract interface for LLM clients
 """
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, List
 
 class LLMClient(ABC):
     @abstractmethod
     async def generate_stream(self, prompt: str) -> AsyncGenerator[str, None]:
         """Generate streaming response from LLM"""
         pass
-    
+
+    @abstractmethod
+    async def generate_stream_with_system(
+        self,
+        prompt: str,
+        system: str = "",
+        max_tokens: int = 1500,
+    ) -> AsyncGenerator[str, None]:
+        """Stream a response for a single user prompt with a custom system prompt."""
+        pass
+
+    @abstractmethod
+    async def generate_stream_with_messages(
+        self,
+        messages: List[Dict[str, str]],
+        system: str = "",
+        max_tokens: int = 1500,
+    ) -> AsyncGenerator[str, None]:
+        """Stream a response for a structured {role, content} message history."""
+        pass
+
+    @abstractmethod
+    async def generate_text(
+        self,
+        prompt: str,
+        system: str = "",
+        max_tokens: int = 1500,
+        cache: bool = False,
+    ) -> str:
+        """Generate a complete (non-streaming) response.
+
+        Implementations must not block the event loop for the round-trip.
+        With `cache=True` an identical earlier call's response may be
+        returned instead; only opt in where any past answer is acceptable.
+        """
+        pass
@@ -2,10 +2,12 @@
 Repository Ports - Abstract interfaces for data access
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from app.domain.entities import (
     User, Session, Response, Hint, Puzzle, Component, ElementMessage, DeepUnderstanding,
     Course, IntakeMessage, CoursePuzzle, Thought, ThoughtConnection,
+    CanvasVersion, CanvasTombstone,
 )
 
 class UserRepository(ABC):
@@ -31,7 +33,12 @@ class SessionRepository(ABC):
         pass
     
     @abstractmethod
-    async def get_user_sessions(self, user_id: str, limit: int = 50) -> List[Session]:
+    async def get_user_sessions(
+        self, user_id: str, limit: int = 50, view: str = "list"
+    ) -> List[Session]:
+        """Newest first. `view` picks the columns read: "stats" (status,
+        prompts_completed, started_at), "list" (what the sessions list
+        shows) or "detail" (everything). Fields outside it are left None."""
         pass
 
     @abstractmethod
@@ -56,6 +63,11 @@ class ResponseRepository(ABC):
     async def get_session_responses(self, session_id: str) -> List[Response]:
         pass
 
+    @abstractmethod
+    async def get_element_word_counts(self, user_id: str) -> Dict[str, int]:
+        """Total response word count per element across all of a user's sessions."""
+        pass
+
 class HintRepository(ABC):
     @abstractmethod
     async def create(self, hint: Hint) -> Hint:
@@ -121,6 +133,13 @@ class ElementMessageRepository(ABC):
         """Get all messages for a session, ordered by prompt_index then created_at."""
         pass
 
+    @abstractmethod
+    async def get_for_session_since(
+        self, session_id: str, after: Optional[datetime]
+    ) -> List[ElementMessage]:
+        """Messages created after `after` (all of them if None), ordered by created_at."""
+        pass
+
     @abstractmethod
     async def get_latest_user_messages_per_prompt(self, session_id: str) -> dict:
         """Get the most recent user message for each prompt_index. Returns {prompt_index: message_text}."""
@@ -150,8 +169,18 @@ class CourseRepository(ABC):
         ...
 
     @abstractmethod
-    async def get_user_courses(self, user_id: str, limit: int = 50) -> List[Course]:
-        """Return courses for a user, newest first. Includes all statuses."""
+    async def get_status(self, course_id: str) -> Optional[Dict[str, Optional[str]]]:
+        """`{"course_status", "generation_error"}` only (same shape as the
+        status bus events), or None if the course doesn't exist."""
+        ...
+
+    @abstractmethod
+    async def get_user_courses(
+        self, user_id: str, limit: int = 50, view: str = "summary"
+    ) -> List[Course]:
+        """Return courses for a user, newest first. Includes all statuses.
+        `view` "summary" skips intake_messages and the intake answers
+        (intake_preview is set instead); "detail" reads everything."""
         ...
 
     @abstractmethod
@@ -293,9 +322,10 @@ class ThoughtRepository(ABC):
         time_spent_seconds: Optional[int],
         is_nudge: bool = False,
     ) -> Thought:
-        """Create a thought. Server assigns flow_order = max(flow_order)+1
-        for the (course_puzzle_id) group. Set is_nudge=True for
-        AI-generated nudge thoughts seeded at Stage 2 transition."""
+        """Create a thought. Server atomically assigns the next flow_order
+        for the (course_puzzle_id) group, unique under concurrent creates.
+        Set is_nudge=True for AI-generated nudge thoughts seeded at Stage 2
+        transition."""
         ...
 
     @abstractmethod
@@ -312,8 +342,10 @@ class ThoughtRepository(ABC):
     async def get_by_course_puzzle(
         self,
         course_puzzle_id: str,
+        changed_since: Optional[int] = None,
     ) -> List[Thought]:
-        """Return thoughts for a puzzle, ordered by flow_order ASC."""
+        """Return thoughts for a puzzle, ordered by flow_order ASC. With
+        changed_since, only those written after that canvas version."""
         ...
 
     @abstractmethod
@@ -362,7 +394,26 @@ class ThoughtRepository(ABC):
         thought_id: str,
         pos_x: float,
         pos_y: float,
+        owner_id: Optional[str] = None,
     ) -> Thought:
+        """With owner_id, only updates a thought that user created; raises
+        ValueError when nothing matched (same as for a missing thought)."""
+        ...
+
+    @abstractmethod
+    async def update_positions(
+        self,
+        owner_id: str,
+        positions: List[Tuple[str, float, float]],
+    ) -> int:
+        """Set (thought_id, pos_x, pos_y) for many of owner_id's thoughts in
+        one write; ids the user didn't create are skipped. Returns the number
+        of thoughts updated."""
+        ...
+
+    @abstractmethod
+    async def filter_owned(self, owner_id: str, thought_ids: List[str]) -> List[str]:
+        """The subset of thought_ids whose rows were created by owner_id."""
         ...
 
     @abstractmethod
@@ -370,6 +421,7 @@ class ThoughtRepository(ABC):
         self,
         thought_id: str,
         content: str,
+        owner_id: Optional[str] = None,
     ) -> Thought:
         ...
 
@@ -379,12 +431,14 @@ class ThoughtRepository(ABC):
         thought_id: str,
         element: Optional[str],
         sub_element: Optional[str],
+        owner_id: Optional[str] = None,
     ) -> Thought:
         ...
 
     @abstractmethod
-    async def delete(self, thought_id: str) -> None:
-        """Cascade-deletes any thought_connections via FK ON DELETE CASCADE."""
+    async def delete(self, thought_id: str, owner_id: Optional[str] = None) -> bool:
+        """Cascade-deletes any thought_connections via FK ON DELETE CASCADE.
+        Returns whether a row was deleted (scoped to owner_id if given)."""
         ...
 
 
@@ -411,9 +465,24 @@ class ThoughtConnectionRepository(ABC):
     async def get_by_course_puzzle(
         self,
         course_puzzle_id: str,
+        changed_since: Optional[int] = None,
     ) -> List[ThoughtConnection]:
+        """With changed_since, only connections written after that canvas version."""
+        ...
+
+    @abstractmethod
+    async def delete(self, connection_id: str, owner_id: Optional[str] = None) -> bool:
+        """Returns whether a row was deleted (scoped to owner_id if given)."""
+        ...
+
+
+class CanvasVersionRepository(ABC):
+    @abstractmethod
+    async def get(self, canvas_id: str) -> CanvasVersion:
+        """Current version (0 for a canvas never written since migration 033)."""
         ...
 
     @abstractmethod
-    async def delete(self, connection_id: str) -> None:
+    async def get_tombstones(self, canvas_id: str, since: int) -> List[CanvasTombstone]:
+        """Items deleted from the canvas after version `since`."""
         ...
@@ -0,0 +1,260 @@
+"""
+Fire Starter image backfill — concurrent, rate-limited, resumable.
+
+Drives FireStarterImageService over every Fire Starter that still lacks an
+image:
+- pending rows are read in keyset pages (id, name, description) so workers
+  never re-fetch a row;
+- up to `concurrency` images render at once, each one first taking a token
+  from a bucket sized to the OpenAI images rate limit;
+- outcomes are written `batch_size` at a time through the
+  apply_fire_starter_image_results RPC instead of one UPDATE per row;
+- each outcome is appended to a JSONL checkpoint before it is written, so a
+  crashed run re-applies images it already paid for instead of regenerating
+  them. The checkpoint is removed once a run finishes cleanly.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from app.services.fire_starter_image_service import FireStarterImageService
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 500
+
+
+class TokenBucket:
+    """Async token bucket: `rate_per_minute` sustained, `burst` at most at once."""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Back off after the API reports a rate limit; drains saved-up burst."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+
+class BackfillCheckpoint:
+    """Append-only JSONL journal of outcomes, keyed by Fire Starter id."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def load(self) -> List[dict]:
+        if not self.path.exists():
+            return []
+        results = {}
+        for line in self.path.read_text().splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                results[entry["id"]] = entry
+        return list(results.values())
+
+    def record(self, results: List[dict]) -> None:
+        with self.path.open("a") as f:
+            for entry in results:
+                f.write(json.dumps(entry) + "\n")
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+@dataclass
+class BackfillStats:
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    rate_limited: int = 0
+    flushes: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def done(self) -> int:
+        return self.completed + self.failed
+
+    def per_minute(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed * 60 if elapsed > 0 else 0.0
+
+    def line(self) -> str:
+        rate = self.per_minute()
+        remaining = self.total - self.done
+        eta = f"{remaining / rate:.1f} min" if rate and remaining else "-"
+        return (
+            f"{self.done}/{self.total} done ({self.completed} ok, {self.failed} failed, "
+            f"{self.rate_limited} rate-limited) {rate:.1f}/min, ETA {eta}"
+        )
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or "rate limit" in str(error).lower()
+
+
+class FireStarterImageBackfill:
+    def __init__(
+        self,
+        service: FireStarterImageService,
+        checkpoint: BackfillCheckpoint,
+        concurrency: int = 4,
+        rate_per_minute: float = 15.0,
+        burst: int = 4,
+        batch_size: int = 20,
+        max_rate_limit_retries: int = 3,
+        rate_limit_pause_seconds: float = 60.0,
+        progress: Callable[[BackfillStats], None] = lambda stats: None,
+        progress_every_seconds: float = 10.0,
+    ):
+        self.service = service
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate_per_minute, burst)
+        self.batch_size = batch_size
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.rate_limit_pause_seconds = rate_limit_pause_seconds
+        self.progress = progress
+        self.progress_every_seconds = progress_every_seconds
+        self.stats = BackfillStats()
+        self._pending: List[dict] = []
+        self._flush_lock = asyncio.Lock()
+
+    def fetch_pending_sync(self, limit: Optional[int] = None, skip: frozenset = frozenset()) -> List[dict]:
+        """Fire Starters without an image that haven't failed, oldest id first."""
+        rows: List[dict] = []
+        after = None
+        while limit is None or len(rows) < limit:
+            query = (
+                self.service.supabase.table("fire_starters")
+                .select("id, name, description")
+                .is_("image_url", "null")
+                .neq("image_generation_status", "failed")
+                .order("id")
+                .limit(PAGE_SIZE)
+            )
+            if after:
+                query = query.gt("id", after)
+            page = query.execute().data or []
+            rows.extend(r for r in page if r["id"] not in skip)
+            if len(page) < PAGE_SIZE:
+                break
+            after = page[-1]["id"]
+        return rows[:limit] if limit is not None else rows
+
+    async def _flush(self, force: bool = False) -> None:
+        async with self._flush_lock:
+            if not self._pending or (not force and len(self._pending) < self.batch_size):
+                return
+            batch, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self.service.apply_results_sync, batch)
+            except Exception:
+                # The checkpoint still holds these; the next run re-applies them
+                logger.exception("Writing %d backfill results failed", len(batch))
+                raise
+            self.stats.flushes += 1
+
+    async def _record(self, entry: dict) -> None:
+        self.checkpoint.record([entry])
+        self._pending.append(entry)
+        if entry["status"] == "completed":
+            self.stats.completed += 1
+        else:
+            self.stats.failed += 1
+        await self._flush()
+
+    async def _render(self, row: dict) -> None:
+        for attempt in range(self.max_rate_limit_retries + 1):
+            await self.bucket.acquire()
+            try:
+                stored = await asyncio.to_thread(self.service.render_image_sync, row)
+            except Exception as e:
+                if _is_rate_limit(e) and attempt < self.max_rate_limit_retries:
+                    self.stats.rate_limited += 1
+                    self.bucket.pause(self.rate_limit_pause_seconds)
+                    continue
+                logger.warning("Backfill image for %s failed: %s", row["id"], e)
+                await self._record({"id": row["id"], "image_url": None, "image_renditions": None,
+                                    "status": "failed", "error": str(e)[:500]})
+                return
+            await self._record({"id": row["id"], "image_url": stored.url,
+                                "image_renditions": stored.renditions or None,
+                                "status": "completed", "error": None})
+            return
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            row = await queue.get()
+            try:
+                if row is None:
+                    return
+                await self._render(row)
+            finally:
+                queue.task_done()
+
+    async def _report(self) -> None:
+        while True:
+            await asyncio.sleep(self.progress_every_seconds)
+            self.progress(self.stats)
+
+    async def run(self, limit: Optional[int] = None, dry_run: bool = False) -> BackfillStats:
+        journal = self.checkpoint.load()
+        if journal and not dry_run:
+            # Outcomes from an interrupted run: write them before anything else
+            await asyncio.to_thread(self.service.apply_results_sync, journal)
+            logger.info("Re-applied %d result(s) from checkpoint %s", len(journal), self.checkpoint.path)
+        skip = frozenset(entry["id"] for entry in journal)
+
+        rows = await asyncio.to_thread(self.fetch_pending_sync, limit, skip)
+        self.stats = BackfillStats(total=len(rows))
+        if dry_run or not rows:
+            return self.stats
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for start in range(0, len(rows), PAGE_SIZE):
+            page = rows[start:start + PAGE_SIZE]
+            await asyncio.to_thread(self.service.mark_generating_sync, [r["id"] for r in page])
+            for row in page:
+                queue.put_nowait(row)
+        for _ in range(self.concurrency):
+            queue.put_nowait(None)
+
+        reporter = asyncio.create_task(self._report())
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*workers)
+            await self._flush(force=True)
+        finally:
+            for task in (reporter, *workers):
+                task.cancel()
+        self.progress(self.stats)
+        self.checkpoint.clear()
+        return self.stats
@@ -4,15 +4,12 @@ Async Fire Starter illustration generation — OpenAI Images + Supabase Storage.
 from __future__ import annotations
 
 import asyncio
-import base64
 import logging
-import uuid
 from datetime import datetime, timezone
 from typing import Any, Optional
 
-import httpx
-
 from app.prompts.fire_starter_image_prompt import build_fire_starter_image_prompt
+from app.services.image_pipeline import ImageStore, StoredImage, prompt_key
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +21,7 @@ class FireStarterImageService:
     def __init__(self, openai_client: Any, supabase_client: Any) -> None:
         self.openai_client = openai_client
         self.supabase = supabase_client
+        self.images = ImageStore(supabase_client, STORAGE_BUCKET)
 
     def _update_row(self, fire_starter_id: str, fields: dict) -> None:
         self.supabase.table("fire_starters").update(fields).eq("id", fire_starter_id).execute()
@@ -38,8 +36,8 @@ class FireStarterImageService:
         )
         return result.data if result.data else None
 
-    def _generate_image_sync(self, prompt: str) -> tuple[bytes, str]:
-        """Returns (image_bytes, model_used). Tries gpt-image-1 then dall-e-3."""
+    def _generate_image_sync(self, prompt: str) -> tuple[Any, str]:
+        """Returns (result item, model_used). Tries gpt-image-1 then dall-e-3."""
         last_error: Exception | None = None
         for model in IMAGE_MODELS:
             try:
@@ -59,17 +57,9 @@ class FireStarterImageService:
                     raise RuntimeError(f"{model} returned no image data")
 
                 item = response.data[0]
-                if getattr(item, "b64_json", None):
-                    return base64.b64decode(item.b64_json), model
-
-                url = getattr(item, "url", None)
-                if url:
-                    with httpx.Client(timeout=60.0) as client:
-                        r = client.get(url)
-                        r.raise_for_status()
-                        return r.content, model
-
-                raise RuntimeError(f"{model} returned neither b64_json nor url")
+                if not getattr(item, "b64_json", None) and not getattr(item, "url", None):
+                    raise RuntimeError(f"{model} returned neither b64_json nor url")
+                return item, model
             except Exception as e:
                 last_error = e
                 logger.warning("Image model %s failed: %s", model, e)
@@ -77,14 +67,49 @@ class FireStarterImageService:
 
         raise last_error or RuntimeError("All image models failed")
 
-    def _upload_sync(self, image_bytes: bytes) -> str:
-        file_path = f"fire_starters/{uuid.uuid4()}.png"
-        self.supabase.storage.from_(STORAGE_BUCKET).upload(
-            file_path,
-            image_bytes,
-            file_options={"content-type": "image/png", "upsert": "true"},
+    def render_image_sync(self, row: dict) -> StoredImage:
+        """Generate and store the illustration (plus renditions) for a
+        fire_starters row (needs id, name, description). Writes nothing to
+        the row, so callers can batch the status updates. An identical
+        prompt reuses the image stored for it instead of generating again."""
+        description = (row.get("description") or "").strip()
+        name = (row.get("name") or "").strip()
+        prompt = build_fire_starter_image_prompt(description or name)
+        key = prompt_key(prompt, size="1024x1024", models=IMAGE_MODELS)
+
+        cached = self.images.find_by_prompt(key)
+        if cached:
+            logger.info("Reusing stored image for Fire Starter %s (same prompt)", row.get("id"))
+            return cached
+
+        item, model_used = self._generate_image_sync(prompt)
+        logger.info(
+            "Generated Fire Starter image for %s using %s",
+            row.get("id"),
+            model_used,
         )
-        return self.supabase.storage.from_(STORAGE_BUCKET).get_public_url(file_path)
+        stored = self.images.store_generated(item, prefix="fire_starters")
+        self.images.remember_prompt(key, stored, model_used)
+        return stored
+
+    def mark_generating_sync(self, fire_starter_ids: list[str]) -> None:
+        if fire_starter_ids:
+            (
+                self.supabase.table("fire_starters")
+                .update({"image_generation_status": "generating"})
+                .in_("id", fire_starter_ids)
+                .execute()
+            )
+
+    def apply_results_sync(self, results: list[dict]) -> int:
+        """Write many outcomes ({id, image_url, image_renditions, status,
+        error}) in one call (migrations/029_image_renditions.sql)."""
+        if not results:
+            return 0
+        result = self.supabase.rpc(
+            "apply_fire_starter_image_results", {"p_results": results}
+        ).execute()
+        return result.data or 0
 
     def _generate_and_store_sync(self, fire_starter_id: str) -> Optional[str]:
         self._update_row(fire_starter_id, {"image_generation_status": "generating"})
@@ -94,54 +119,53 @@ class FireStarterImageService:
             logger.error("Fire Starter %s not found for image generation", fire_starter_id)
             return None
 
-        description = (row.get("description") or "").strip()
-        name = (row.get("name") or "").strip()
-        lesson = description or name
-        prompt = build_fire_starter_image_prompt(lesson)
-
-        image_bytes, model_used = self._generate_image_sync(prompt)
-        logger.info(
-            "Generated Fire Starter image for %s using %s",
-            fire_starter_id,
-            model_used,
-        )
-
-        public_url = self._upload_sync(image_bytes)
+        stored = self.render_image_sync(row)
         now = datetime.now(timezone.utc).isoformat()
         self._update_row(
             fire_starter_id,
             {
-                "image_url": public_url,
+                "image_url": stored.url,
+                "image_renditions": stored.renditions or None,
                 "image_generation_status": "completed",
                 "image_generated_at": now,
                 "image_generation_error": None,
             },
         )
-        return public_url
-
-    async def generate_and_store_image(self, fire_starter_id: str) -> Optional[str]:
+        return stored.url
+
+    async def generate_and_store_image(
+        self, fire_starter_id: str, final_attempt: bool = True
+    ) -> Optional[str]:
+        """Generate and store the illustration; records "failed" on the row
+        unless final_attempt=False, in which case the error is re-raised so
+        the job queue can retry."""
         try:
             return await asyncio.to_thread(self._generate_and_store_sync, fire_starter_id)
         except Exception as e:
+            if not final_attempt:
+                raise
             logger.exception(
                 "Fire Starter image generation failed for %s: %s",
                 fire_starter_id,
                 e,
             )
-            err_msg = str(e)[:500]
-            try:
-                await asyncio.to_thread(
-                    self._update_row,
-                    fire_starter_id,
-                    {
-                        "image_generation_status": "failed",
-                        "image_generation_error": err_msg,
-                    },
-                )
-            except Exception as update_err:
-                logger.error(
-                    "Failed to record image error for %s: %s",
-                    fire_starter_id,
-                    update_err,
-                )
+            await self.record_failure(fire_starter_id, str(e))
             return None
+
+    async def record_failure(self, fire_starter_id: str, error: str) -> None:
+        """Mark the row's image generation "failed" (best effort)."""
+        try:
+            await asyncio.to_thread(
+                self._update_row,
+                fire_starter_id,
+                {
+                    "image_generation_status": "failed",
+                    "image_generation_error": error[:500],
+                },
+            )
+        except Exception as update_err:
+            logger.error(
+                "Failed to record image error for %s: %s",
+                fire_starter_id,
+                update_err,
+            )
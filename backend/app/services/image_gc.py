@@ -0,0 +1,169 @@
+"""
+Garbage collection for the generated-images bucket.
+
+An object is live when its original or any of its renditions (same
+`{prefix}/{content_hash}` stem) is referenced by a row: Fire Starter images
+and renditions, user avatars, session cube images. Everything else older
+than the grace period is garbage, except session backgrounds, which no row
+records. Deleting an original also drops its generated_images index row
+(and, by cascade, the prompts that pointed at it).
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, List, Optional, Set
+
+from app.services.image_pipeline import SESSION_BACKGROUND_PREFIX
+
+logger = logging.getLogger(__name__)
+
+LIST_PAGE_SIZE = 1000
+SELECT_PAGE_SIZE = 1000
+REMOVE_BATCH_SIZE = 100
+
+# (table, column) holding public URLs of stored images; JSON columns are
+# searched for URLs at any depth
+IMAGE_REFERENCES = (
+    ("fire_starters", "image_url"),
+    ("fire_starters", "image_renditions"),
+    ("users", "avatar_image_url"),
+    ("sessions", "cube_image_url"),
+)
+
+
+@dataclass
+class StoredObject:
+    path: str
+    size: int = 0
+    created_at: Optional[datetime] = None
+
+    @property
+    def group(self) -> str:
+        """`{dir}/{stem}`: an original and its renditions share it."""
+        directory, _, name = self.path.rpartition("/")
+        stem = name.split(".", 1)[0].split("_", 1)[0]
+        return f"{directory}/{stem}" if directory else stem
+
+
+@dataclass
+class GCReport:
+    objects: int = 0
+    live: int = 0
+    protected: int = 0
+    garbage: List[StoredObject] = field(default_factory=list)
+    deleted: int = 0
+
+    @property
+    def garbage_bytes(self) -> int:
+        return sum(o.size for o in self.garbage)
+
+
+def _parse_dt(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def list_objects(bucket: Any, prefix: str = "") -> List[StoredObject]:
+    """Every object under `prefix`, walking folders recursively."""
+    objects: List[StoredObject] = []
+    offset = 0
+    while True:
+        page = bucket.list(prefix, {"limit": LIST_PAGE_SIZE, "offset": offset}) or []
+        for entry in page:
+            path = f"{prefix}/{entry['name']}" if prefix else entry["name"]
+            if entry.get("id") is None:
+                objects.extend(list_objects(bucket, path))
+                continue
+            objects.append(StoredObject(
+                path=path,
+                size=int((entry.get("metadata") or {}).get("size") or 0),
+                created_at=_parse_dt(entry.get("created_at")),
+            ))
+        if len(page) < LIST_PAGE_SIZE:
+            return objects
+        offset += LIST_PAGE_SIZE
+
+
+def _urls(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for nested in value.values():
+            yield from _urls(nested)
+
+
+def referenced_paths(supabase: Any, bucket_name: str) -> Set[str]:
+    """Object paths in `bucket_name` that some row points at."""
+    marker = f"/object/public/{bucket_name}/"
+    paths: Set[str] = set()
+    for table, column in IMAGE_REFERENCES:
+        start = 0
+        while True:
+            rows = (
+                supabase.table(table)
+                .select(column)
+                .not_.is_(column, "null")
+                .range(start, start + SELECT_PAGE_SIZE - 1)
+                .execute()
+            ).data or []
+            for row in rows:
+                for url in _urls(row.get(column)):
+                    if marker in url:
+                        paths.add(url.split(marker, 1)[1].split("?", 1)[0])
+            if len(rows) < SELECT_PAGE_SIZE:
+                break
+            start += SELECT_PAGE_SIZE
+    return paths
+
+
+def find_garbage(
+    objects: List[StoredObject],
+    referenced: Set[str],
+    min_age: timedelta,
+    now: Optional[datetime] = None,
+) -> GCReport:
+    now = now or datetime.now(timezone.utc)
+    live_groups = {StoredObject(p).group for p in referenced}
+    report = GCReport(objects=len(objects))
+    for obj in objects:
+        if obj.group in live_groups:
+            report.live += 1
+        elif (
+            obj.path.startswith(f"{SESSION_BACKGROUND_PREFIX}/")
+            or obj.created_at is None
+            or now - obj.created_at < min_age
+        ):
+            report.protected += 1
+        else:
+            report.garbage.append(obj)
+    return report
+
+
+def delete_garbage(supabase: Any, bucket_name: str, report: GCReport) -> None:
+    bucket = supabase.storage.from_(bucket_name)
+    paths = [o.path for o in report.garbage]
+    for i in range(0, len(paths), REMOVE_BATCH_SIZE):
+        bucket.remove(paths[i:i + REMOVE_BATCH_SIZE])
+        report.deleted += len(paths[i:i + REMOVE_BATCH_SIZE])
+    hashes = sorted({o.group.rpartition("/")[2] for o in report.garbage})
+    for i in range(0, len(hashes), REMOVE_BATCH_SIZE):
+        supabase.table("generated_images").delete().in_(
+            "content_hash", hashes[i:i + REMOVE_BATCH_SIZE]
+        ).execute()
+    logger.info("Deleted %d unreferenced image object(s)", report.deleted)
+
+
+def collect_garbage(
+    supabase: Any,
+    bucket_name: str = "generated-images",
+    min_age: timedelta = timedelta(days=1),
+    delete: bool = False,
+) -> GCReport:
+    objects = list_objects(supabase.storage.from_(bucket_name))
+    report = find_garbage(objects, referenced_paths(supabase, bucket_name), min_age)
+    if delete and report.garbage:
+        delete_garbage(supabase, bucket_name, report)
+    return report
@@ -0,0 +1,260 @@
+"""
+Generated-image storage — streams originals to Supabase Storage, adds
+small WebP/AVIF renditions, and names every object by its content hash.
+
+The image APIs answer with either a temporary URL or base64 PNG. Instead of
+holding the downloaded bytes and then handing a second copy to the upload,
+the source is streamed into a temporary file and the upload reads from that
+file. Renditions are then cut from the same file at each configured width,
+so a 256px avatar or card can load a ~10-20 KB WebP instead of the
+1024x1024 PNG.
+
+Everything here is blocking; callers run it in a worker thread.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pillow is optional; without it only the original is stored
+try:
+    from PIL import Image, features
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+# Session backgrounds are returned to the client but never stored on a row,
+# so garbage collection can't tell which are in use and leaves them alone
+SESSION_BACKGROUND_PREFIX = "session_backgrounds"
+CONTENT_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+SAVE_OPTIONS = {"webp": {"quality": 80, "method": 4}, "avif": {"quality": 60}}
+
+
+@dataclass
+class StoredImage:
+    url: str
+    # {"webp": {"256": url, "512": url}, ...}
+    renditions: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    content_hash: Optional[str] = None
+
+    def url_for_width(self, width: int, fmt: str = "webp") -> str:
+        """Smallest rendition at least `width` wide, else the original."""
+        by_width = self.renditions.get(fmt) or {}
+        fits = sorted(int(w) for w in by_width if int(w) >= width)
+        return by_width[str(fits[0])] if fits else self.url
+
+
+def rendition_widths() -> List[int]:
+    return sorted({int(w) for w in settings.IMAGE_RENDITION_WIDTHS.split(",") if w.strip()})
+
+
+def rendition_formats() -> List[str]:
+    formats = []
+    for fmt in (f.strip().lower() for f in settings.IMAGE_RENDITION_FORMATS.split(",")):
+        if fmt not in CONTENT_TYPES:
+            continue
+        if PIL_AVAILABLE and not features.check(fmt):
+            logger.warning("Pillow has no %s support; skipping %s renditions", fmt, fmt)
+            continue
+        formats.append(fmt)
+    return formats
+
+
+def make_renditions(source_path: str) -> List[Tuple[str, int, bytes]]:
+    """(format, width, encoded bytes) for each configured width narrower
+    than the source."""
+    if not PIL_AVAILABLE:
+        return []
+    formats = rendition_formats()
+    out = []
+    with Image.open(source_path) as image:
+        image.load()
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        for width in rendition_widths():
+            if width >= image.width:
+                continue
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                buf = io.BytesIO()
+                resized.save(buf, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+                out.append((fmt, width, buf.getvalue()))
+    return out
+
+
+class _HashingWriter:
+    """File wrapper that SHA-256s everything written through it."""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.sha.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+
+def prompt_key(prompt: str, **params: Any) -> str:
+    """Stable hash of an image prompt and the generation parameters."""
+    raw = json.dumps([prompt.strip(), params], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ImageStore:
+    """Content-addressed image storage (migrations/030_generated_image_index.sql).
+
+    Objects are named `{prefix}/{sha256}.png` (renditions
+    `{prefix}/{sha256}_{width}.{fmt}`) and indexed in generated_images, so
+    storing bytes that are already there is a lookup, not an upload. Index
+    failures are logged and treated as misses; they never fail a store.
+    """
+
+    def __init__(self, supabase_client: Any, bucket: str = "generated-images"):
+        self.supabase = supabase_client
+        self.bucket = bucket
+
+    def _upload(self, path: str, file: Any, content_type: str) -> str:
+        storage = self.supabase.storage.from_(self.bucket)
+        storage.upload(path, file, file_options={"content-type": content_type, "upsert": "true"})
+        return storage.get_public_url(path)
+
+    @staticmethod
+    def _from_index(row: dict) -> StoredImage:
+        return StoredImage(
+            url=row["url"],
+            renditions=row.get("renditions") or {},
+            content_hash=row.get("content_hash"),
+        )
+
+    def _lookup(self, content_hash: str) -> Optional[StoredImage]:
+        try:
+            result = (
+                self.supabase.table("generated_images")
+                .select("content_hash, url, renditions")
+                .eq("content_hash", content_hash)
+                .limit(1)
+                .execute()
+            )
+        except Exception as e:
+            logger.warning("Image index lookup failed: %s", e)
+            return None
+        return self._from_index(result.data[0]) if result.data else None
+
+    def _index(self, stored: StoredImage, path: str, size: int) -> None:
+        try:
+            self.supabase.table("generated_images").upsert({
+                "content_hash": stored.content_hash,
+                "path": path,
+                "url": stored.url,
+                "renditions": stored.renditions or None,
+                "size_bytes": size,
+            }).execute()
+        except Exception as e:
+            logger.warning("Image index write failed for %s: %s", stored.content_hash, e)
+
+    def find_by_prompt(self, prompt_hash: str) -> Optional[StoredImage]:
+        """A previously stored image for this exact prompt, if any."""
+        try:
+            result = (
+                self.supabase.table("image_prompts")
+                .select("content_hash, generated_images(content_hash, url, renditions)")
+                .eq("prompt_hash", prompt_hash)
+                .limit(1)
+                .execute()
+            )
+        except Exception as e:
+            logger.warning("Image prompt lookup failed: %s", e)
+            return None
+        image = result.data[0].get("generated_images") if result.data else None
+        return self._from_index(image) if image else None
+
+    def remember_prompt(self, prompt_hash: str, stored: StoredImage, model: str) -> None:
+        if not stored.content_hash:
+            return
+        try:
+            self.supabase.table("image_prompts").upsert({
+                "prompt_hash": prompt_hash,
+                "content_hash": stored.content_hash,
+                "model": model,
+            }).execute()
+        except Exception as e:
+            logger.warning("Image prompt index write failed: %s", e)
+
+    def _store_file(self, source_path: str, prefix: str, content_hash: str, size: int) -> StoredImage:
+        existing = self._lookup(content_hash)
+        if existing:
+            logger.info("Image %s already stored; reusing it", content_hash[:12])
+            return existing
+
+        path = f"{prefix}/{content_hash}.png"
+        # Upload by path: the client streams the multipart body from disk
+        stored = StoredImage(
+            url=self._upload(path, source_path, "image/png"),
+            content_hash=content_hash,
+        )
+        try:
+            renditions = make_renditions(source_path)
+        except Exception as e:
+            # The original is stored; missing renditions fall back to it
+            logger.warning("Image renditions failed for %s: %s", path, e)
+            renditions = []
+        for fmt, width, data in renditions:
+            rendition_url = self._upload(
+                f"{prefix}/{content_hash}_{width}.{fmt}", data, CONTENT_TYPES[fmt]
+            )
+            stored.renditions.setdefault(fmt, {})[str(width)] = rendition_url
+        self._index(stored, path, size)
+        return stored
+
+    def _with_temp_file(self, write, prefix: str) -> StoredImage:
+        fd, path = tempfile.mkstemp(suffix=".png")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer = _HashingWriter(f)
+                write(writer)
+            return self._store_file(path, prefix, writer.sha.hexdigest(), writer.size)
+        finally:
+            os.unlink(path)
+
+    def store_from_url(self, url: str, prefix: str, http: Optional[httpx.Client] = None) -> StoredImage:
+        def write(f) -> None:
+            client = http or httpx.Client(timeout=60.0)
+            try:
+                with client.stream("GET", url) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_bytes(DOWNLOAD_CHUNK_BYTES):
+                        f.write(chunk)
+            finally:
+                if http is None:
+                    client.close()
+
+        return self._with_temp_file(write, prefix)
+
+    def store_b64(self, b64_data: str, prefix: str) -> StoredImage:
+        return self._with_temp_file(lambda f: f.write(base64.b64decode(b64_data)), prefix)
+
+    def store_generated(self, item: Any, prefix: str) -> StoredImage:
+        """Store one `images.generate` result item (b64_json or url)."""
+        if getattr(item, "b64_json", None):
+            return self.store_b64(item.b64_json, prefix)
+        url = getattr(item, "url", None)
+        if url:
+            return self.store_from_url(url, prefix)
+        raise RuntimeError("Image result has neither b64_json nor url")
@@ -0,0 +1,222 @@
+"""
+Background job worker - runs queued puzzle and image generation
+
+Usage (from backend/):
+  python -m app.worker
+
+Polls the `jobs` table (migrations/027_jobs.sql) and runs each kind with its
+own concurrency cap. A job is leased for JOB_LEASE_SECONDS; if the worker
+dies mid-job the lease expires and another worker picks it up. Failed
+attempts are retried with exponential backoff up to the job's max_attempts;
+only the last attempt records the failure on the course / Fire Starter row.
+A handler cut off by the JOB_LEASE_SECONDS timeout is cancelled before its
+own failure handling runs, so on the last attempt the worker records that
+failure itself (`default_timeout_handlers`).
+
+Course status changes made here reach API status streams through the
+course_status NOTIFY trigger (migration 020) when DATABASE_URL is set.
+"""
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.adapters.claude_adapter import ClaudeStreamingAdapter, get_anthropic_client
+from app.adapters.job_queue_adapter import get_job_queue
+from app.adapters.supabase_adapter import (
+    SupabaseCoursePuzzleRepository,
+    SupabaseCourseRepository,
+    close_supabase_client,
+)
+from app.core.config import settings
+from app.dependencies import get_fire_starter_image_service
+from app.domain.entities import JOB_FIRE_STARTER_IMAGE, JOB_PUZZLE_GENERATION, Job
+from app.domain.puzzle_generation import generate_course_puzzles
+from app.ports.jobs import JobQueue
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Job], Awaitable[None]]
+# (job, error message) -> record the give-up on the job's target row
+JobFailureHandler = Callable[[Job, str], Awaitable[None]]
+
+
+async def run_puzzle_generation(job: Job) -> None:
+    await generate_course_puzzles(
+        course_id=job.payload["course_id"],
+        course_repo=SupabaseCourseRepository(),
+        puzzle_repo=SupabaseCoursePuzzleRepository(),
+        llm_client=ClaudeStreamingAdapter(),
+        final_attempt=job.final_attempt,
+    )
+
+
+async def run_fire_starter_image(job: Job) -> None:
+    await get_fire_starter_image_service().generate_and_store_image(
+        job.payload["fire_starter_id"],
+        final_attempt=job.final_attempt,
+    )
+
+
+async def fail_puzzle_generation(job: Job, error: str) -> None:
+    await SupabaseCourseRepository().update_course_status(
+        job.payload["course_id"], "generation_failed", generation_error=error[:500]
+    )
+
+
+async def fail_fire_starter_image(job: Job, error: str) -> None:
+    await get_fire_starter_image_service().record_failure(job.payload["fire_starter_id"], error)
+
+
+def default_handlers() -> Dict[str, JobHandler]:
+    return {
+        JOB_PUZZLE_GENERATION: run_puzzle_generation,
+        JOB_FIRE_STARTER_IMAGE: run_fire_starter_image,
+    }
+
+
+def default_timeout_handlers() -> Dict[str, JobFailureHandler]:
+    return {
+        JOB_PUZZLE_GENERATION: fail_puzzle_generation,
+        JOB_FIRE_STARTER_IMAGE: fail_fire_starter_image,
+    }
+
+
+def default_concurrency() -> Dict[str, int]:
+    return {
+        JOB_PUZZLE_GENERATION: settings.JOB_CONCURRENCY_PUZZLE_GENERATION,
+        JOB_FIRE_STARTER_IMAGE: settings.JOB_CONCURRENCY_FIRE_STARTER_IMAGE,
+    }
+
+
+class JobWorker:
+    """Claims jobs up to each kind's free slots, runs them, records the outcome."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        concurrency: Dict[str, int],
+        worker_id: Optional[str] = None,
+        lease_seconds: float = settings.JOB_LEASE_SECONDS,
+        poll_seconds: float = settings.JOB_POLL_SECONDS,
+        retry_base_seconds: float = settings.JOB_RETRY_BASE_SECONDS,
+        timeout_handlers: Optional[Dict[str, JobFailureHandler]] = None,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.timeout_handlers = timeout_handlers or {}
+        self.concurrency = concurrency
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self._running: Dict[str, set] = {kind: set() for kind in handlers}
+        self._wake = asyncio.Event()
+        self._stopping = False
+
+    def retry_delay(self, attempts: int) -> float:
+        return self.retry_base_seconds * (2 ** max(attempts - 1, 0))
+
+    async def _run(self, job: Job) -> None:
+        try:
+            await asyncio.wait_for(self.handlers[job.kind](job), timeout=self.lease_seconds)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if isinstance(e, asyncio.TimeoutError):
+                error = f"Timed out after {self.lease_seconds:g}s"
+            retry_in = None if job.final_attempt else self.retry_delay(job.attempts)
+            logger.warning(
+                "Job %s (%s) attempt %d/%d failed: %s%s",
+                job.id, job.kind, job.attempts, job.max_attempts, error,
+                "" if retry_in is None else f"; retrying in {retry_in:.0f}s",
+            )
+            if retry_in is None and isinstance(e, asyncio.TimeoutError):
+                await self._record_timeout(job, error)
+            await self.queue.fail(job.id, self.worker_id, error, retry_in)
+        else:
+            await self.queue.complete(job.id, self.worker_id)
+            logger.info("Job %s (%s) succeeded", job.id, job.kind)
+        finally:
+            self._wake.set()
+
+    async def _record_timeout(self, job: Job, error: str) -> None:
+        handler = self.timeout_handlers.get(job.kind)
+        if handler is None:
+            return
+        try:
+            await handler(job, error)
+        except Exception:
+            logger.exception("Recording the timeout of job %s (%s) failed", job.id, job.kind)
+
+    def _start(self, job: Job) -> None:
+        task = asyncio.create_task(self._run(job))
+        running = self._running[job.kind]
+        running.add(task)
+        task.add_done_callback(running.discard)
+
+    async def poll_once(self) -> int:
+        """Fill every kind's free slots; returns how many jobs were started."""
+        started = 0
+        for kind in self.handlers:
+            free = self.concurrency.get(kind, 1) - len(self._running[kind])
+            if free <= 0:
+                continue
+            try:
+                jobs = await self.queue.claim(kind, free, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.warning("Claiming %s jobs failed: %s", kind, e)
+                continue
+            for job in jobs:
+                self._start(job)
+            started += len(jobs)
+        return started
+
+    async def run(self) -> None:
+        logger.info("Job worker %s started (concurrency %s)", self.worker_id, self.concurrency)
+        while not self._stopping:
+            self._wake.clear()
+            if await self.poll_once():
+                # Claimed something: check again right away for more work
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+        await self.drain()
+
+    async def drain(self) -> None:
+        """Wait for in-flight jobs (used on shutdown)."""
+        in_flight = [t for running in self._running.values() for t in running]
+        if in_flight:
+            logger.info("Waiting for %d in-flight job(s)", len(in_flight))
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._wake.set()
+
+
+async def main() -> None:
+    worker = JobWorker(
+        get_job_queue(),
+        default_handlers(),
+        default_concurrency(),
+        timeout_handlers=default_timeout_handlers(),
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        close_supabase_client()
+        await get_anthropic_client().close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
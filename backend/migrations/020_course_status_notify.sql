@@ -0,0 +1,26 @@
+-- Migration 020: NOTIFY on course_status changes
+-- Lets every API worker wake its open /course/{id}/status-stream SSE
+-- connections when any worker (or a manual SQL edit) changes a course's
+-- status. Workers LISTEN on 'course_status' when DATABASE_URL is set.
+
+CREATE OR REPLACE FUNCTION notify_course_status_change()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM pg_notify(
+    'course_status',
+    json_build_object(
+      'course_id', NEW.id,
+      'course_status', NEW.course_status,
+      'generation_error', NEW.generation_error
+    )::text
+  );
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS courses_notify_status_change ON courses;
+CREATE TRIGGER courses_notify_status_change
+  AFTER UPDATE OF course_status ON courses
+  FOR EACH ROW
+  WHEN (OLD.course_status IS DISTINCT FROM NEW.course_status)
+  EXECUTE FUNCTION notify_course_status_change();
@@ -0,0 +1,89 @@
+-- Migration 021: per-user element word counts for the dashboard
+-- /user/stats and /user/regenerate-avatar used to fetch every session's
+-- responses one session at a time to sum word counts per element.
+-- user_stats keeps those sums up to date via triggers; the
+-- user_element_word_counts() RPC computes them in one grouped query and is
+-- used for the backfill below and as the fallback when a user has no row.
+
+CREATE OR REPLACE FUNCTION user_element_word_counts(p_user_id UUID)
+RETURNS TABLE (element TEXT, word_count BIGINT)
+LANGUAGE sql STABLE AS $$
+  SELECT r.element::text, COALESCE(SUM(r.word_count), 0)::bigint
+  FROM responses r
+  JOIN sessions s ON s.id = r.session_id
+  WHERE s.user_id = p_user_id
+  GROUP BY r.element;
+$$;
+
+CREATE TABLE IF NOT EXISTS user_stats (
+  user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+  element_words JSONB NOT NULL DEFAULT '{}'::jsonb,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+COMMENT ON TABLE user_stats IS 'Trigger-maintained per-user aggregates; element_words maps element -> total response word count';
+
+CREATE OR REPLACE FUNCTION bump_user_element_words(p_user_id UUID, p_element TEXT, p_delta BIGINT)
+RETURNS void
+LANGUAGE sql AS $$
+  INSERT INTO user_stats (user_id, element_words)
+  VALUES (p_user_id, jsonb_build_object(p_element, GREATEST(p_delta, 0)))
+  ON CONFLICT (user_id) DO UPDATE
+  SET element_words = user_stats.element_words || jsonb_build_object(
+        p_element,
+        GREATEST(COALESCE((user_stats.element_words ->> p_element)::bigint, 0) + p_delta, 0)
+      ),
+      updated_at = now();
+$$;
+
+CREATE OR REPLACE FUNCTION responses_maintain_user_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM bump_user_element_words(s.user_id, NEW.element::text, COALESCE(NEW.word_count, 0))
+    FROM sessions s WHERE s.id = NEW.session_id;
+  END IF;
+  -- When a session is deleted its responses cascade after the session row is
+  -- gone, so this finds nothing; sessions_subtract_user_stats handles that case.
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM bump_user_element_words(s.user_id, OLD.element::text, -COALESCE(OLD.word_count, 0))
+    FROM sessions s WHERE s.id = OLD.session_id;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS responses_user_stats ON responses;
+CREATE TRIGGER responses_user_stats
+  AFTER INSERT OR DELETE OR UPDATE OF element, word_count, session_id ON responses
+  FOR EACH ROW
+  EXECUTE FUNCTION responses_maintain_user_stats();
+
+CREATE OR REPLACE FUNCTION sessions_subtract_user_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM bump_user_element_words(OLD.user_id, r.element::text, -SUM(r.word_count))
+  FROM responses r
+  WHERE r.session_id = OLD.id
+  GROUP BY r.element;
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS sessions_user_stats ON sessions;
+CREATE TRIGGER sessions_user_stats
+  BEFORE DELETE ON sessions
+  FOR EACH ROW
+  EXECUTE FUNCTION sessions_subtract_user_stats();
+
+-- Backfill existing users
+INSERT INTO user_stats (user_id, element_words)
+SELECT t.user_id, jsonb_object_agg(t.element, t.word_count)
+FROM (
+  SELECT s.user_id, r.element::text AS element, SUM(r.word_count)::bigint AS word_count
+  FROM responses r
+  JOIN sessions s ON s.id = r.session_id
+  GROUP BY s.user_id, r.element
+) t
+GROUP BY t.user_id
+ON CONFLICT (user_id) DO UPDATE SET element_words = EXCLUDED.element_words, updated_at = now();
@@ -0,0 +1,17 @@
+-- Migration 022: atomic intake message append
+-- append_intake_message used to read the whole intake_messages array, append
+-- in Python and write the array back, so two concurrent appends could drop a
+-- message. This function appends server-side in a single UPDATE: the row lock
+-- serialises concurrent calls and each one appends to the latest array.
+-- Existing rows keep their data in place; no backfill is needed.
+
+CREATE OR REPLACE FUNCTION append_intake_message(p_course_id UUID, p_message JSONB)
+RETURNS SETOF courses
+LANGUAGE sql AS $$
+  UPDATE courses
+  SET intake_messages = COALESCE(intake_messages, '[]'::jsonb) || jsonb_build_array(p_message),
+      intake_status = CASE WHEN intake_status = 'draft' THEN 'in_progress' ELSE intake_status END,
+      updated_at = now()
+  WHERE id = p_course_id
+  RETURNING *;
+$$;
@@ -0,0 +1,55 @@
+-- Migration 023: bulk Ignite graph writes
+-- create_ignite_graph inserts a batch of ignite_thoughts plus the connections
+-- between them in one transaction and returns the new thoughts in input order.
+-- Connection endpoints are either an index into p_thoughts
+-- ({"from_index": 0, "to_index": 1}) or an existing thought id
+-- ({"from_thought_id": "...", "to_index": 0}).
+-- Used by the API when IGNITE_GRAPH_RPC=true; otherwise it issues one
+-- multi-row insert for thoughts and one for connections.
+
+CREATE OR REPLACE FUNCTION create_ignite_graph(
+  p_problem_id UUID,
+  p_user_id UUID,
+  p_thoughts JSONB,
+  p_connections JSONB DEFAULT '[]'::jsonb
+)
+RETURNS SETOF ignite_thoughts
+LANGUAGE plpgsql AS $$
+DECLARE
+  new_ids UUID[];
+BEGIN
+  SELECT array_agg(gen_random_uuid())
+  INTO new_ids
+  FROM generate_series(1, jsonb_array_length(p_thoughts));
+
+  IF new_ids IS NULL THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO ignite_thoughts (
+    id, ignite_problem_id, user_id, content, element, sub_element,
+    pos_x, pos_y, is_terrain, is_fire_starter_node, terrain_type, flow_order
+  )
+  SELECT
+    new_ids[t.ord], p_problem_id, p_user_id,
+    t.value ->> 'content', t.value ->> 'element', t.value ->> 'sub_element',
+    (t.value ->> 'pos_x')::float, (t.value ->> 'pos_y')::float,
+    COALESCE((t.value ->> 'is_terrain')::boolean, false),
+    COALESCE((t.value ->> 'is_fire_starter_node')::boolean, false),
+    t.value ->> 'terrain_type', (t.value ->> 'flow_order')::int
+  FROM jsonb_array_elements(p_thoughts) WITH ORDINALITY AS t(value, ord);
+
+  INSERT INTO ignite_thought_connections (ignite_problem_id, from_thought_id, to_thought_id)
+  SELECT
+    p_problem_id,
+    COALESCE((c ->> 'from_thought_id')::uuid, new_ids[(c ->> 'from_index')::int + 1]),
+    COALESCE((c ->> 'to_thought_id')::uuid, new_ids[(c ->> 'to_index')::int + 1])
+  FROM jsonb_array_elements(COALESCE(p_connections, '[]'::jsonb)) AS c;
+
+  RETURN QUERY
+  SELECT th.*
+  FROM unnest(new_ids) WITH ORDINALITY AS n(id, ord)
+  JOIN ignite_thoughts th ON th.id = n.id
+  ORDER BY n.ord;
+END;
+$$;
@@ -0,0 +1,47 @@
+-- Migration 024: per-problem user thought counter for the Ignite list
+-- GET /ignite used to pull every ignite_thoughts row for all of a user's
+-- problems to count the user-authored ones (not terrain, not Fire Starter
+-- nodes) in Python. user_thought_count is maintained by trigger so the list
+-- is a single select on ignite_problems whatever the canvas sizes.
+
+ALTER TABLE ignite_problems
+  ADD COLUMN IF NOT EXISTS user_thought_count INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION ignite_thoughts_maintain_user_count()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE')
+     AND NOT COALESCE(OLD.is_terrain, false)
+     AND NOT COALESCE(OLD.is_fire_starter_node, false) THEN
+    UPDATE ignite_problems
+    SET user_thought_count = GREATEST(user_thought_count - 1, 0)
+    WHERE id = OLD.ignite_problem_id;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE')
+     AND NOT COALESCE(NEW.is_terrain, false)
+     AND NOT COALESCE(NEW.is_fire_starter_node, false) THEN
+    UPDATE ignite_problems
+    SET user_thought_count = user_thought_count + 1
+    WHERE id = NEW.ignite_problem_id;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS ignite_thoughts_user_count ON ignite_thoughts;
+CREATE TRIGGER ignite_thoughts_user_count
+  AFTER INSERT OR DELETE OR UPDATE OF ignite_problem_id, is_terrain, is_fire_starter_node
+  ON ignite_thoughts
+  FOR EACH ROW
+  EXECUTE FUNCTION ignite_thoughts_maintain_user_count();
+
+-- Backfill
+UPDATE ignite_problems p
+SET user_thought_count = c.n
+FROM (
+  SELECT ignite_problem_id, COUNT(*)::int AS n
+  FROM ignite_thoughts
+  WHERE NOT COALESCE(is_terrain, false) AND NOT COALESCE(is_fire_starter_node, false)
+  GROUP BY ignite_problem_id
+) c
+WHERE p.id = c.ignite_problem_id;
@@ -0,0 +1,17 @@
+-- Migration 025: persistent LLM response cache
+-- Optional second tier behind the in-process cache for idempotent LLM calls
+-- (enabled with LLM_CACHE_PERSISTENT=true). key is a sha256 of the
+-- normalized (model, system, prompt, max_tokens).
+
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+  key TEXT PRIMARY KEY,
+  model TEXT NOT NULL,
+  response TEXT NOT NULL,
+  expires_at TIMESTAMPTZ NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_expires ON llm_response_cache(expires_at);
+
+-- Expired rows are ignored on read; prune them periodically with:
+--   DELETE FROM llm_response_cache WHERE expires_at < now();
@@ -0,0 +1,11 @@
+-- Migration 026: rolling conversation summary for session chat
+-- /session/{id}/chat used to resend the whole transcript every turn. Older
+-- turns are now folded into conversation_summary; summary_through is the
+-- created_at of the last element_message included in it, so each turn only
+-- loads the messages after that checkpoint.
+
+ALTER TABLE sessions ADD COLUMN IF NOT EXISTS conversation_summary TEXT;
+ALTER TABLE sessions ADD COLUMN IF NOT EXISTS summary_through TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_element_messages_session_created
+  ON element_messages(session_id, created_at);
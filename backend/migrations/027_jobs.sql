@@ -0,0 +1,56 @@
+-- Migration 027: durable background job queue
+-- Puzzle generation and Fire Starter images used to run as in-process
+-- asyncio tasks, lost on restart/redeploy and with no concurrency cap.
+-- With JOB_QUEUE_ENABLED=true the API enqueues rows here and
+-- `python -m app.worker` leases them with claim_jobs (FOR UPDATE SKIP LOCKED),
+-- so any number of workers can poll without double-running a job.
+
+CREATE TABLE IF NOT EXISTS jobs (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  kind TEXT NOT NULL,
+  payload JSONB NOT NULL DEFAULT '{}'::jsonb,
+  status TEXT NOT NULL DEFAULT 'queued'
+    CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 3,
+  run_after TIMESTAMPTZ NOT NULL DEFAULT now(),
+  locked_by TEXT,
+  locked_until TIMESTAMPTZ,
+  last_error TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_claimable
+  ON jobs(kind, run_after)
+  WHERE status IN ('queued', 'running');
+
+-- Lease up to p_limit runnable jobs: queued and due, or running with an
+-- expired lease (the worker holding it died).
+CREATE OR REPLACE FUNCTION claim_jobs(
+  p_kind TEXT,
+  p_limit INTEGER,
+  p_worker TEXT,
+  p_lease_seconds INTEGER
+)
+RETURNS SETOF jobs
+LANGUAGE sql AS $$
+  UPDATE jobs j
+  SET status = 'running',
+      attempts = j.attempts + 1,
+      locked_by = p_worker,
+      locked_until = now() + make_interval(secs => p_lease_seconds),
+      updated_at = now()
+  WHERE j.id IN (
+    SELECT id FROM jobs
+    WHERE kind = p_kind
+      AND (
+        (status = 'queued' AND run_after <= now())
+        OR (status = 'running' AND locked_until < now())
+      )
+    ORDER BY run_after
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING j.*;
+$$;
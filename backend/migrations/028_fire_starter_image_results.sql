@@ -0,0 +1,21 @@
+-- Migration 028: batched Fire Starter image status writes
+-- The image backfill used to write each row's outcome with its own UPDATE.
+-- apply_fire_starter_image_results takes a batch of outcomes
+-- [{id, image_url, status, error}, ...] and applies them in one statement.
+-- Rows that completed get image_generated_at = now().
+
+CREATE OR REPLACE FUNCTION apply_fire_starter_image_results(p_results JSONB)
+RETURNS INTEGER
+LANGUAGE sql AS $$
+  WITH updated AS (
+    UPDATE fire_starters f
+    SET image_url = COALESCE(r.image_url, f.image_url),
+        image_generation_status = r.status,
+        image_generation_error = r.error,
+        image_generated_at = CASE WHEN r.status = 'completed' THEN now() ELSE f.image_generated_at END
+    FROM jsonb_to_recordset(p_results) AS r(id UUID, image_url TEXT, status TEXT, error TEXT)
+    WHERE f.id = r.id
+    RETURNING f.id
+  )
+  SELECT count(*)::INTEGER FROM updated;
+$$;
@@ -0,0 +1,30 @@
+-- Migration 029: downscaled renditions of generated images
+-- Fire Starter images were served only as the 1024x1024 PNG, even on cards
+-- that show them at 256px. The image pipeline now also stores WebP
+-- renditions and records their URLs here as {"webp": {"256": url, ...}}.
+-- Existing rows keep image_url; the frontend falls back to it when
+-- image_renditions is NULL.
+
+ALTER TABLE fire_starters
+ADD COLUMN IF NOT EXISTS image_renditions JSONB;
+
+COMMENT ON COLUMN fire_starters.image_renditions IS 'Rendition URLs by format and width, e.g. {"webp": {"256": url}}';
+
+-- Batched backfill writes (migration 028) now carry the renditions too
+CREATE OR REPLACE FUNCTION apply_fire_starter_image_results(p_results JSONB)
+RETURNS INTEGER
+LANGUAGE sql AS $$
+  WITH updated AS (
+    UPDATE fire_starters f
+    SET image_url = COALESCE(r.image_url, f.image_url),
+        image_renditions = COALESCE(r.image_renditions, f.image_renditions),
+        image_generation_status = r.status,
+        image_generation_error = r.error,
+        image_generated_at = CASE WHEN r.status = 'completed' THEN now() ELSE f.image_generated_at END
+    FROM jsonb_to_recordset(p_results)
+      AS r(id UUID, image_url TEXT, image_renditions JSONB, status TEXT, error TEXT)
+    WHERE f.id = r.id
+    RETURNING f.id
+  )
+  SELECT count(*)::INTEGER FROM updated;
+$$;
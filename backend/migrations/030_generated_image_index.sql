@@ -0,0 +1,28 @@
+-- Migration 030: content-addressed generated images + prompt index
+-- Generated images used to be uploaded under a fresh uuid4() name, so
+-- regenerations and backfills left orphaned objects behind and an identical
+-- prompt always paid for a new image. Objects are now named by the SHA-256
+-- of their bytes and indexed here:
+--   generated_images: one row per stored original (with its renditions)
+--   image_prompts:    prompt hash -> image, so an identical Fire Starter
+--                     image prompt reuses the stored image
+-- scripts/gc_generated_images.py deletes objects no row references and
+-- drops their index rows (prompts cascade).
+
+CREATE TABLE IF NOT EXISTS generated_images (
+  content_hash TEXT PRIMARY KEY,
+  path TEXT NOT NULL,
+  url TEXT NOT NULL,
+  renditions JSONB,
+  size_bytes BIGINT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS image_prompts (
+  prompt_hash TEXT PRIMARY KEY,
+  content_hash TEXT NOT NULL REFERENCES generated_images(content_hash) ON DELETE CASCADE,
+  model TEXT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_image_prompts_content_hash ON image_prompts(content_hash);
@@ -0,0 +1,57 @@
+-- Migration 031: server-side flow_order allocation for thoughts
+-- Creating a thought used to SELECT max(flow_order) and then INSERT max+1:
+-- two round-trips, and two fast creates on the same canvas could both get
+-- the same flow_order. flow_order is now allocated from a per-course-puzzle
+-- counter inside create_thought. The counter row's lock serialises
+-- concurrent creates, so orders stay unique, and the thought is inserted in
+-- the same call.
+
+CREATE TABLE IF NOT EXISTS thought_flow_counters (
+  course_puzzle_id UUID PRIMARY KEY REFERENCES course_puzzles(id) ON DELETE CASCADE,
+  last_order INTEGER NOT NULL
+);
+
+-- Start each existing canvas after its current highest flow_order
+INSERT INTO thought_flow_counters (course_puzzle_id, last_order)
+SELECT course_puzzle_id, max(flow_order)
+FROM thoughts
+GROUP BY course_puzzle_id
+ON CONFLICT (course_puzzle_id) DO UPDATE
+  SET last_order = GREATEST(thought_flow_counters.last_order, EXCLUDED.last_order);
+
+CREATE OR REPLACE FUNCTION create_thought(
+  p_course_puzzle_id UUID,
+  p_user_id UUID,
+  p_content TEXT,
+  p_element VARCHAR,
+  p_sub_element VARCHAR,
+  p_pos_x DOUBLE PRECISION,
+  p_pos_y DOUBLE PRECISION,
+  p_time_spent_seconds INTEGER,
+  p_is_nudge BOOLEAN,
+  p_kind VARCHAR
+)
+RETURNS SETOF thoughts
+LANGUAGE sql AS $$
+  WITH next_order AS (
+    -- A canvas created before this migration that somehow has no counter
+    -- row starts after its existing thoughts
+    INSERT INTO thought_flow_counters (course_puzzle_id, last_order)
+    VALUES (
+      p_course_puzzle_id,
+      COALESCE((SELECT max(flow_order) FROM thoughts WHERE course_puzzle_id = p_course_puzzle_id), 0) + 1
+    )
+    ON CONFLICT (course_puzzle_id) DO UPDATE
+      SET last_order = thought_flow_counters.last_order + 1
+    RETURNING last_order
+  )
+  INSERT INTO thoughts (
+    course_puzzle_id, user_id, element, sub_element, content, flow_order,
+    time_spent_seconds, pos_x, pos_y, is_nudge, kind
+  )
+  SELECT
+    p_course_puzzle_id, p_user_id, p_element, p_sub_element, p_content, last_order,
+    p_time_spent_seconds, p_pos_x, p_pos_y, p_is_nudge, p_kind
+  FROM next_order
+  RETURNING *;
+$$;
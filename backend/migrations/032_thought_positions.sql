@@ -0,0 +1,34 @@
+-- Migration 032: batched canvas position writes
+-- Dragging blocks used to send one UPDATE per block per move event. The
+-- API now buffers positions briefly, keeps only the latest one per thought,
+-- and writes each user's batch with a single call to this function.
+-- Only rows owned by p_user_id are touched. The return value is the number
+-- of rows updated.
+
+CREATE OR REPLACE FUNCTION apply_thought_positions(
+  p_table TEXT,
+  p_user_id UUID,
+  p_positions JSONB
+)
+RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+  updated INTEGER;
+BEGIN
+  IF p_table = 'thoughts' THEN
+    UPDATE thoughts t
+    SET pos_x = p.pos_x, pos_y = p.pos_y, updated_at = now()
+    FROM jsonb_to_recordset(p_positions) AS p(id UUID, pos_x DOUBLE PRECISION, pos_y DOUBLE PRECISION)
+    WHERE t.id = p.id AND t.user_id = p_user_id;
+  ELSIF p_table = 'ignite_thoughts' THEN
+    UPDATE ignite_thoughts t
+    SET pos_x = p.pos_x, pos_y = p.pos_y
+    FROM jsonb_to_recordset(p_positions) AS p(id UUID, pos_x DOUBLE PRECISION, pos_y DOUBLE PRECISION)
+    WHERE t.id = p.id AND t.user_id = p_user_id;
+  ELSE
+    RAISE EXCEPTION 'apply_thought_positions: unknown table %', p_table;
+  END IF;
+  GET DIAGNOSTICS updated = ROW_COUNT;
+  RETURN updated;
+END;
+$$;
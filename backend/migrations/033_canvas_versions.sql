@@ -0,0 +1,157 @@
+-- Migration 033: per-canvas version counters for delta sync
+-- Each canvas (a course_puzzle or an ignite_problem) now has a version
+-- counter. Triggers bump it on every insert, update or delete of the
+-- canvas's thoughts, connections, Ignite chat messages, and the
+-- puzzle/problem row itself. Each item row records the version of its
+-- last change, and a deletion leaves a tombstone at the new version. So
+-- `GET /canvas/{id}?since=N` returns only the items whose version is
+-- greater than N, plus tombstones newer than N, and the current version
+-- doubles as the ETag.
+--
+-- Tombstones older than the retention window are pruned. A canvas records
+-- the highest version pruned so far; clients asking for an older `since`
+-- get a full snapshot instead. Run periodically:
+--   SELECT prune_canvas_tombstones('30 days');
+
+CREATE TABLE IF NOT EXISTS canvas_versions (
+  canvas_id UUID PRIMARY KEY,
+  version BIGINT NOT NULL DEFAULT 0,
+  pruned_through BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS canvas_tombstones (
+  canvas_id UUID NOT NULL,
+  item_type TEXT NOT NULL,          -- 'thought' | 'connection' | 'message'
+  item_id UUID NOT NULL,
+  version BIGINT NOT NULL,
+  deleted_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_canvas_tombstones_canvas_version
+  ON canvas_tombstones(canvas_id, version);
+CREATE INDEX IF NOT EXISTS idx_canvas_tombstones_deleted_at
+  ON canvas_tombstones(deleted_at);
+
+ALTER TABLE thoughts ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE thought_connections ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE ignite_thoughts ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE ignite_thought_connections ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE ignite_chat_messages ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_thoughts_canvas_version ON thoughts(course_puzzle_id, version);
+CREATE INDEX IF NOT EXISTS idx_thought_connections_canvas_version ON thought_connections(course_puzzle_id, version);
+CREATE INDEX IF NOT EXISTS idx_ignite_thoughts_canvas_version ON ignite_thoughts(ignite_problem_id, version);
+CREATE INDEX IF NOT EXISTS idx_ignite_connections_canvas_version ON ignite_thought_connections(ignite_problem_id, version);
+CREATE INDEX IF NOT EXISTS idx_ignite_chat_canvas_version ON ignite_chat_messages(ignite_problem_id, version);
+
+-- TG_ARGV[0]: column holding the canvas id. TG_ARGV[1]: item type for
+-- tombstones; omitted for the canvas row itself (course_puzzles,
+-- ignite_problems), which only bumps the counter.
+CREATE OR REPLACE FUNCTION bump_canvas_version()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+  canvas UUID;
+  next_version BIGINT;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    canvas := (to_jsonb(OLD) ->> TG_ARGV[0])::uuid;
+  ELSE
+    canvas := (to_jsonb(NEW) ->> TG_ARGV[0])::uuid;
+  END IF;
+
+  INSERT INTO canvas_versions (canvas_id, version)
+  VALUES (canvas, 1)
+  ON CONFLICT (canvas_id) DO UPDATE SET version = canvas_versions.version + 1
+  RETURNING version INTO next_version;
+
+  IF TG_NARGS < 2 THEN
+    RETURN NULL;  -- AFTER trigger on the canvas row
+  END IF;
+  IF TG_OP = 'DELETE' THEN
+    INSERT INTO canvas_tombstones (canvas_id, item_type, item_id, version)
+    VALUES (canvas, TG_ARGV[1], OLD.id, next_version);
+    RETURN OLD;
+  END IF;
+  NEW.version := next_version;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS thoughts_canvas_version_write ON thoughts;
+CREATE TRIGGER thoughts_canvas_version_write
+  BEFORE INSERT OR UPDATE ON thoughts
+  FOR EACH ROW EXECUTE FUNCTION bump_canvas_version('course_puzzle_id', 'thought');
+DROP TRIGGER IF EXISTS thoughts_canvas_version_delete ON thoughts;
+CREATE TRIGGER thoughts_canvas_version_delete
+  AFTER DELETE ON thoughts
+  FOR EACH ROW EXECUTE FUNCTION bump_canvas_version('course_puzzle_id', 'thought');
+
+DROP TRIGGER IF EXISTS thought_connections_canvas_version_write ON thought_connections;
+CREATE TRIGGER thought_connections_canvas_version_write
+  BEFORE INSERT OR UPDATE ON thought_connections
+  FOR EACH ROW EXECUTE FUNCTION bump_canvas_version('course_puzzle_id', 'connection');
+DROP TRIGGER IF EXISTS thought_connections_canvas_version_delete ON thought_connections;
+CREATE TRIGGER thought_connections_canvas_version_delete
+  AFTER DELETE ON thought_connections
+  FOR EACH ROW EXECUTE FUNCTION bump_canvas_version('course_puzzle_id', 'connection');
+
+DROP TRIGGER IF EXISTS ignite_thoughts_canvas_version_write ON ignite_thoughts;
+CREATE TRIGGER ignite_thoughts_canvas_version_write
+  BEFORE INSERT OR UPDATE ON ignite_thoughts
+  FOR EACH ROW EXECUTE FUNCTION bump_canvas_version('ignite_problem_id', 'thought');
+DROP TRIGGER IF EXISTS ignite_thoughts_canvas_version_delete ON ignite_thoughts;
+CREATE TRIGGER ignite_thoughts_canvas_version_delete
+  AFTER DELETE ON ignite_thoughts
+  FOR EACH ROW EXECUTE FUNCTION bump_canvas_version('ignite_problem_id', 'thought');
+
+DROP TRIGGER IF EXISTS ignite_connections_canvas_version_write ON ignite_thought_connections;
+CREATE TRIGGER ignite_connections_canvas_version_write
+  BEFORE INSERT OR UPDATE ON ignite_thought_connections
+  FOR EACH ROW EXECUTE FUNCTION bump_canvas_version('ignite_problem_id', 'connection');
+DROP TRIGGER IF EXISTS ignite_connections_canvas_version_delete ON ignite_thought_connections;
+CREATE TRIGGER ignite_connections_canvas_version_delete
+  AFTER DELETE ON ignite_thought_connections
+  FOR EACH ROW EXECUTE FUNCTION bump_canvas_version('ignite_problem_id', 'connection');
+
+DROP TRIGGER IF EXISTS ignite_chat_canvas_version_write ON ignite_chat_messages;
+CREATE TRIGGER ignite_chat_canvas_version_write
+  BEFORE INSERT OR UPDATE ON ignite_chat_messages
+  FOR EACH ROW EXECUTE FUNCTION bump_canvas_version('ignite_problem_id', 'message');
+DROP TRIGGER IF EXISTS ignite_chat_canvas_version_delete ON ignite_chat_messages;
+CREATE TRIGGER ignite_chat_canvas_version_delete
+  AFTER DELETE ON ignite_chat_messages
+  FOR EACH ROW EXECUTE FUNCTION bump_canvas_version('ignite_problem_id', 'message');
+
+-- The puzzle/problem row is part of the canvas payload (stage, status, title)
+DROP TRIGGER IF EXISTS course_puzzles_canvas_version ON course_puzzles;
+CREATE TRIGGER course_puzzles_canvas_version
+  AFTER UPDATE ON course_puzzles
+  FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+  EXECUTE FUNCTION bump_canvas_version('id');
+DROP TRIGGER IF EXISTS ignite_problems_canvas_version ON ignite_problems;
+CREATE TRIGGER ignite_problems_canvas_version
+  AFTER UPDATE ON ignite_problems
+  FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+  EXECUTE FUNCTION bump_canvas_version('id');
+
+CREATE OR REPLACE FUNCTION prune_canvas_tombstones(p_older_than INTERVAL DEFAULT '30 days')
+RETURNS INTEGER
+LANGUAGE sql AS $$
+  WITH gone AS (
+    DELETE FROM canvas_tombstones
+    WHERE deleted_at < now() - p_older_than
+    RETURNING canvas_id, version
+  ),
+  floors AS (
+    SELECT canvas_id, max(version) AS version FROM gone GROUP BY canvas_id
+  ),
+  raised AS (
+    UPDATE canvas_versions cv
+    SET pruned_through = GREATEST(cv.pruned_through, f.version)
+    FROM floors f
+    WHERE cv.canvas_id = f.canvas_id
+    RETURNING 1
+  )
+  SELECT count(*)::int FROM gone;
+$$;
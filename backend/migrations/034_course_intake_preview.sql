@@ -0,0 +1,42 @@
+-- Migration 034: precomputed intake preview for the courses list
+-- The courses list shows a snippet of the first user turn for intakes that
+-- have no label yet. It used to select every course's whole
+-- intake_messages array to compute that snippet. The snippet is now stored
+-- in courses.intake_preview, backfilled here and set by
+-- append_intake_message when the first non-empty user message arrives.
+-- The rules match _intake_preview_snippet in app/api/routes.py: collapse
+-- whitespace, and cut at 96 characters with a trailing ellipsis.
+
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS intake_preview TEXT;
+
+CREATE OR REPLACE FUNCTION intake_preview_snippet(p_messages JSONB)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE AS $$
+  SELECT CASE WHEN length(t) > 96 THEN left(t, 96) || '…' ELSE t END
+  FROM (
+    SELECT btrim(regexp_replace(m->>'content', '\s+', ' ', 'g')) AS t, ord
+    FROM jsonb_array_elements(
+      CASE WHEN jsonb_typeof(p_messages) = 'array' THEN p_messages ELSE '[]'::jsonb END
+    ) WITH ORDINALITY AS e(m, ord)
+    WHERE m->>'role' = 'user'
+  ) turns
+  WHERE t <> ''
+  ORDER BY ord
+  LIMIT 1;
+$$;
+
+UPDATE courses
+SET intake_preview = intake_preview_snippet(intake_messages)
+WHERE intake_preview IS NULL AND intake_messages IS NOT NULL;
+
+CREATE OR REPLACE FUNCTION append_intake_message(p_course_id UUID, p_message JSONB)
+RETURNS SETOF courses
+LANGUAGE sql AS $$
+  UPDATE courses
+  SET intake_messages = COALESCE(intake_messages, '[]'::jsonb) || jsonb_build_array(p_message),
+      intake_preview = COALESCE(intake_preview, intake_preview_snippet(jsonb_build_array(p_message))),
+      intake_status = CASE WHEN intake_status = 'draft' THEN 'in_progress' ELSE intake_status END,
+      updated_at = now()
+  WHERE id = p_course_id
+  RETURNING *;
+$$;
@@ -0,0 +1,71 @@
+-- Migration 035: create_ignite_graph also returns the new connections
+-- Callers stream the created graph to the client (the terrain and
+-- fire_starter events of /ignite/create-stream). They need the persisted
+-- connection rows, with their ids and thought ids, not the index pairs they
+-- sent. The function now returns one JSONB object:
+--   {"thoughts": [ignite_thoughts rows in input order],
+--    "connections": [ignite_thought_connections rows in input order]}
+-- The return type changes, so the old function is dropped first. Apply this
+-- before deploying the API that reads the new shape (IGNITE_GRAPH_RPC=true).
+
+DROP FUNCTION IF EXISTS create_ignite_graph(UUID, UUID, JSONB, JSONB);
+
+CREATE FUNCTION create_ignite_graph(
+  p_problem_id UUID,
+  p_user_id UUID,
+  p_thoughts JSONB,
+  p_connections JSONB DEFAULT '[]'::jsonb
+)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+  new_ids UUID[];
+  new_conn_ids UUID[];
+BEGIN
+  SELECT array_agg(gen_random_uuid())
+  INTO new_ids
+  FROM generate_series(1, jsonb_array_length(p_thoughts));
+
+  IF new_ids IS NULL THEN
+    RETURN jsonb_build_object('thoughts', '[]'::jsonb, 'connections', '[]'::jsonb);
+  END IF;
+
+  SELECT array_agg(gen_random_uuid())
+  INTO new_conn_ids
+  FROM generate_series(1, jsonb_array_length(COALESCE(p_connections, '[]'::jsonb)));
+
+  INSERT INTO ignite_thoughts (
+    id, ignite_problem_id, user_id, content, element, sub_element,
+    pos_x, pos_y, is_terrain, is_fire_starter_node, terrain_type, flow_order
+  )
+  SELECT
+    new_ids[t.ord], p_problem_id, p_user_id,
+    t.value ->> 'content', t.value ->> 'element', t.value ->> 'sub_element',
+    (t.value ->> 'pos_x')::float, (t.value ->> 'pos_y')::float,
+    COALESCE((t.value ->> 'is_terrain')::boolean, false),
+    COALESCE((t.value ->> 'is_fire_starter_node')::boolean, false),
+    t.value ->> 'terrain_type', (t.value ->> 'flow_order')::int
+  FROM jsonb_array_elements(p_thoughts) WITH ORDINALITY AS t(value, ord);
+
+  INSERT INTO ignite_thought_connections (id, ignite_problem_id, from_thought_id, to_thought_id)
+  SELECT
+    new_conn_ids[c.ord],
+    p_problem_id,
+    COALESCE((c.value ->> 'from_thought_id')::uuid, new_ids[(c.value ->> 'from_index')::int + 1]),
+    COALESCE((c.value ->> 'to_thought_id')::uuid, new_ids[(c.value ->> 'to_index')::int + 1])
+  FROM jsonb_array_elements(COALESCE(p_connections, '[]'::jsonb)) WITH ORDINALITY AS c(value, ord);
+
+  RETURN jsonb_build_object(
+    'thoughts', (
+      SELECT COALESCE(jsonb_agg(to_jsonb(th) ORDER BY n.ord), '[]'::jsonb)
+      FROM unnest(new_ids) WITH ORDINALITY AS n(id, ord)
+      JOIN ignite_thoughts th ON th.id = n.id
+    ),
+    'connections', (
+      SELECT COALESCE(jsonb_agg(to_jsonb(tc) ORDER BY n.ord), '[]'::jsonb)
+      FROM unnest(new_conn_ids) WITH ORDINALITY AS n(id, ord)
+      JOIN ignite_thought_connections tc ON tc.id = n.id
+    )
+  );
+END;
+$$;
@@ -0,0 +1,124 @@
+-- Migration 036: job queue attempt cap on reclaim, one active job per course
+-- claim_jobs (migration 027) reclaimed any running job whose lease expired,
+-- whatever its attempt count. A job that kept killing its worker (OOM,
+-- timeout) was leased again forever. Expired leases are now reclaimed only
+-- while attempts < max_attempts. Exhausted ones are marked failed, and a
+-- puzzle_generation job's course still 'generating' is moved to
+-- 'generation_failed' so it can be retried.
+--
+-- POST /course/{id}/retry-generation accepts 'awaiting_puzzles', so it
+-- could enqueue a second puzzle_generation job while one was queued or
+-- running. A partial unique index now allows one active job per
+-- (kind, course_id). enqueue_job inserts through it and, on conflict,
+-- returns the job that is already active. Jobs without a course_id in
+-- their payload (fire starter images) are unaffected: NULL keys never
+-- conflict.
+-- Apply before deploying the API that calls enqueue_job.
+
+-- Keep the oldest active job per course; fail the duplicates so the index
+-- can be built.
+UPDATE jobs j
+SET status = 'failed',
+    locked_by = NULL,
+    locked_until = NULL,
+    last_error = 'duplicate of an active job for the same course',
+    updated_at = now()
+WHERE j.status IN ('queued', 'running')
+  AND j.payload ? 'course_id'
+  AND EXISTS (
+    SELECT 1 FROM jobs o
+    WHERE o.kind = j.kind
+      AND o.payload ->> 'course_id' = j.payload ->> 'course_id'
+      AND o.status IN ('queued', 'running')
+      AND (o.created_at, o.id) < (j.created_at, j.id)
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_jobs_active_course
+  ON jobs(kind, (payload ->> 'course_id'))
+  WHERE status IN ('queued', 'running');
+
+CREATE OR REPLACE FUNCTION enqueue_job(
+  p_kind TEXT,
+  p_payload JSONB,
+  p_max_attempts INTEGER
+)
+RETURNS SETOF jobs
+LANGUAGE plpgsql AS $$
+BEGIN
+  LOOP
+    RETURN QUERY
+    INSERT INTO jobs (kind, payload, max_attempts)
+    VALUES (p_kind, p_payload, p_max_attempts)
+    ON CONFLICT (kind, (payload ->> 'course_id')) WHERE status IN ('queued', 'running')
+    DO NOTHING
+    RETURNING *;
+    IF FOUND THEN
+      RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT * FROM jobs
+    WHERE kind = p_kind
+      AND payload ->> 'course_id' = p_payload ->> 'course_id'
+      AND status IN ('queued', 'running');
+    IF FOUND THEN
+      RETURN;
+    END IF;
+    -- The conflicting job finished in between; insert again
+  END LOOP;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION claim_jobs(
+  p_kind TEXT,
+  p_limit INTEGER,
+  p_worker TEXT,
+  p_lease_seconds INTEGER
+)
+RETURNS SETOF jobs
+LANGUAGE sql AS $$
+  WITH exhausted AS (
+    UPDATE jobs
+    SET status = 'failed',
+        locked_by = NULL,
+        locked_until = NULL,
+        last_error = COALESCE(last_error, 'lease expired on the final attempt'),
+        updated_at = now()
+    WHERE kind = p_kind
+      AND status = 'running'
+      AND locked_until < now()
+      AND attempts >= max_attempts
+    RETURNING kind, payload
+  ),
+  -- The worker that died never reached the final-attempt failure path, so
+  -- record it on the course here (as generate_course_puzzles would)
+  failed_courses AS (
+    UPDATE courses
+    SET course_status = 'generation_failed',
+        generation_error = 'Puzzle generation did not finish (worker lease expired)',
+        updated_at = now()
+    WHERE id IN (
+      SELECT (payload ->> 'course_id')::uuid FROM exhausted
+      WHERE kind = 'puzzle_generation'
+    )
+      AND course_status = 'generating'
+  )
+  UPDATE jobs j
+  SET status = 'running',
+      attempts = j.attempts + 1,
+      locked_by = p_worker,
+      locked_until = now() + make_interval(secs => p_lease_seconds),
+      updated_at = now()
+  WHERE j.id IN (
+    SELECT id FROM jobs
+    WHERE kind = p_kind
+      AND (
+        (status = 'queued' AND run_after <= now())
+        OR (status = 'running' AND locked_until < now() AND attempts < max_attempts)
+      )
+    ORDER BY run_after
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING j.*;
+$$;
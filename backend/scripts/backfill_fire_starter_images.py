@@ -1,14 +1,22 @@
 #!/usr/bin/env python3
 """
-One-off: generate images for Fire Starters missing image_url (not failed).
+Generate images for Fire Starters missing image_url (not failed).
+
+Renders up to --concurrency images at once, paced by a token bucket at
+--rate-per-minute (OpenAI images limit), and writes outcomes in batches.
+Interrupted runs resume from --checkpoint without regenerating images
+they already produced.
+
 Usage (from backend/):
-  python scripts/backfill_fire_starter_images.py
+  python scripts/backfill_fire_starter_images.py --dry-run
+  python scripts/backfill_fire_starter_images.py --limit 50 --concurrency 4 --rate-per-minute 15
 """
 from __future__ import annotations
 
+import argparse
 import asyncio
+import logging
 import sys
-import time
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -19,33 +27,46 @@ sys.path.insert(0, str(BACKEND_ROOT))
 load_dotenv(BACKEND_ROOT / ".env")
 
 from app.dependencies import get_fire_starter_image_service  # noqa: E402
-from app.adapters.supabase_adapter import get_supabase_client  # noqa: E402
+from app.services.fire_starter_backfill import (  # noqa: E402
+    BackfillCheckpoint,
+    FireStarterImageBackfill,
+)
 
 
 async def main() -> None:
-    client = get_supabase_client()
-    service = get_fire_starter_image_service()
-
-    result = (
-        client.table("fire_starters")
-        .select("id, name, image_url, image_generation_status")
-        .is_("image_url", "null")
-        .neq("image_generation_status", "failed")
-        .execute()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true", help="only count pending rows")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate-per-minute", type=float, default=15.0)
+    parser.add_argument("--burst", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--progress-every", type=float, default=10.0)
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=BACKEND_ROOT / ".fire_starter_backfill.jsonl",
     )
-    rows = result.data or []
-    print(f"Found {len(rows)} Fire Starter(s) to backfill.")
-
-    for i, row in enumerate(rows):
-        fs_id = row["id"]
-        name = row.get("name", "")
-        print(f"[{i + 1}/{len(rows)}] Generating image for {fs_id} ({name})…")
-        url = await service.generate_and_store_image(fs_id)
-        print(f"  -> {'OK ' + url[:80] if url else 'FAILED'}")
-        if i < len(rows) - 1:
-            time.sleep(2.5)
-
-    print("Backfill complete.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    backfill = FireStarterImageBackfill(
+        get_fire_starter_image_service(),
+        BackfillCheckpoint(args.checkpoint),
+        concurrency=args.concurrency,
+        rate_per_minute=args.rate_per_minute,
+        burst=args.burst,
+        batch_size=args.batch_size,
+        progress=lambda stats: print(stats.line(), flush=True),
+        progress_every_seconds=args.progress_every,
+    )
+    stats = await backfill.run(limit=args.limit, dry_run=args.dry_run)
+
+    if args.dry_run:
+        print(f"Found {stats.total} Fire Starter(s) to backfill (dry run, nothing generated).")
+        return
+    print(f"Backfill complete: {stats.completed} ok, {stats.failed} failed, "
+          f"{stats.flushes} batched write(s).")
 
 
 if __name__ == "__main__":
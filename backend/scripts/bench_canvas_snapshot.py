@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-token for POST /canvas/{id}/chat/stream against delayed fake repos.
+
+Every repository call sleeps `--delay` seconds (a stand-in for a PostgREST
+round-trip) and the LLM yields its first chunk immediately, so the time to
+the first SSE chunk is almost entirely canvas loading. Compares the old
+serial loads (three `get_by_kind` calls plus connections) with
+`load_canvas_snapshot`, then measures the real endpoint end to end.
+
+Usage (from backend/):
+  python scripts/bench_canvas_snapshot.py --delay 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+import httpx  # noqa: E402
+
+from app.domain.canvas import load_canvas_snapshot  # noqa: E402
+from app.domain.entities import Thought, ThoughtConnection  # noqa: E402
+
+CP_ID = "cp-1"
+THOUGHTS = [
+    Thought(id=f"t{i}", course_puzzle_id=CP_ID, user_id="u1", content=f"thought {i}",
+            flow_order=i, kind=("thought", "nudge", "reflection")[i % 3])
+    for i in range(30)
+]
+CONNECTIONS = [
+    ThoughtConnection(id=f"c{i}", course_puzzle_id=CP_ID, user_id="u1", from_thought_id=f"t{i}",
+                      to_thought_id=f"t{i + 1}")
+    for i in range(29)
+]
+
+
+class DelayedThoughtRepo:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    async def get_by_course_puzzle(self, course_puzzle_id):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return list(THOUGHTS)
+
+    async def get_by_kind(self, course_puzzle_id, kind):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [t for t in THOUGHTS if t.kind == kind]
+
+
+class DelayedConnectionRepo:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    async def get_by_course_puzzle(self, course_puzzle_id):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return list(CONNECTIONS)
+
+
+class InstantLLM:
+    async def generate_stream_with_system(self, prompt, system="", max_tokens=1500):
+        yield "first"
+        yield " token"
+
+
+async def _serial_load(thought_repo, connection_repo):
+    user = await thought_repo.get_by_kind(CP_ID, "thought")
+    nudge = await thought_repo.get_by_kind(CP_ID, "nudge")
+    refl = await thought_repo.get_by_kind(CP_ID, "reflection")
+    conns = await connection_repo.get_by_course_puzzle(CP_ID)
+    return user, nudge, refl, conns
+
+
+async def _time(coro_fn, runs: int) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        await coro_fn()
+    return (time.perf_counter() - start) / runs
+
+
+async def _endpoint_ttft(delay: float, runs: int) -> tuple[float, int]:
+    from app.api import routes
+    from app.core.security import get_current_user
+    from app.main import app
+
+    thought_repo = DelayedThoughtRepo(delay)
+    connection_repo = DelayedConnectionRepo(delay)
+    routes.thought_repo = thought_repo
+    routes.connection_repo = connection_repo
+    routes.llm_client = InstantLLM()
+
+    async def verify(course_puzzle_id, user):
+        await asyncio.sleep(delay)
+        return SimpleNamespace(
+            id=CP_ID, title="Bench", puzzle_text="p", primary_element="earth",
+            current_stage=1, stage3_phase=None, status="in_progress",
+        )
+
+    routes._verify_puzzle_ownership = verify
+    app.dependency_overrides[get_current_user] = lambda: {"db_user": SimpleNamespace(id="u1")}
+
+    transport = httpx.ASGITransport(app=app)
+    total = 0.0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(runs):
+            start = time.perf_counter()
+            async with client.stream(
+                "POST", f"/api/canvas/{CP_ID}/chat/stream",
+                json={"user_message": "hi", "stage": 1, "history": []},
+            ) as resp:
+                resp.raise_for_status()
+                async for _chunk in resp.aiter_bytes():
+                    total += time.perf_counter() - start
+                    break
+    return total / runs, (thought_repo.calls + connection_repo.calls) // runs
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.05)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    tr, cr = DelayedThoughtRepo(args.delay), DelayedConnectionRepo(args.delay)
+    serial = await _time(lambda: _serial_load(tr, cr), args.runs)
+    snapshot = await _time(lambda: load_canvas_snapshot(CP_ID, tr, cr), args.runs)
+    ttft, calls = await _endpoint_ttft(args.delay, args.runs)
+
+    print(f"repo delay {args.delay * 1000:.0f}ms per call")
+    print(f"serial get_by_kind x3 + connections: {serial * 1000:6.1f} ms")
+    print(f"load_canvas_snapshot:                {snapshot * 1000:6.1f} ms")
+    print(f"/canvas/{{id}}/chat/stream first chunk: {ttft * 1000:6.1f} ms "
+          f"({calls} canvas queries per request)")
+    assert snapshot < serial / 2
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
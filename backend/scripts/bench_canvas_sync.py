@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Bytes per canvas refresh: full snapshot vs ETag revalidation vs `?since=`.
+
+Calls GET /api/canvas/{id} through FastAPI's TestClient with the
+repositories swapped for in-memory fakes that keep a version counter the
+way migration 033's triggers do. The canvas has `--thoughts` thoughts and
+about as many connections. After `--moves` blocks move and one thought is
+deleted, the bench refreshes three ways and prints each response's size:
+a full reload, a conditional GET with no changes (304), and a delta.
+
+Usage (from backend/):
+  python scripts/bench_canvas_sync.py --thoughts 200 --moves 3
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.api import routes  # noqa: E402
+from app.core.security import get_current_user  # noqa: E402
+from app.domain.entities import (  # noqa: E402
+    CanvasTombstone, CanvasVersion, CoursePuzzle, Thought, ThoughtConnection,
+)
+from app.main import app  # noqa: E402
+
+CP = "00000000-0000-0000-0000-0000000000c1"
+USER = "00000000-0000-0000-0000-0000000000a1"
+
+
+class FakeCanvas:
+    """Rows with per-row versions and tombstones, bumped like the triggers."""
+
+    def __init__(self, n: int):
+        self.version = 0
+        self.thoughts: dict[str, tuple[int, Thought]] = {}
+        self.connections: dict[str, tuple[int, ThoughtConnection]] = {}
+        self.tombstones: list[CanvasTombstone] = []
+        for i in range(n):
+            self.write_thought(Thought(
+                id=f"t{i:04d}", course_puzzle_id=CP, user_id=USER, flow_order=i + 1,
+                content=f"Thought {i}: a sentence or two about the puzzle, as users write them.",
+                element="earth", sub_element="earth-1", pos_x=100.0 * i, pos_y=50.0 * i,
+            ))
+        for i in range(n - 1):
+            self.version += 1
+            self.connections[f"c{i:04d}"] = (self.version, ThoughtConnection(
+                id=f"c{i:04d}", course_puzzle_id=CP, user_id=USER,
+                from_thought_id=f"t{i:04d}", to_thought_id=f"t{i + 1:04d}",
+            ))
+
+    def write_thought(self, thought: Thought) -> None:
+        self.version += 1
+        self.thoughts[thought.id] = (self.version, thought)
+
+    def delete_thought(self, thought_id: str) -> None:
+        self.thoughts.pop(thought_id)
+        for cid, (_, c) in list(self.connections.items()):
+            if thought_id in (c.from_thought_id, c.to_thought_id):
+                self.version += 1
+                del self.connections[cid]
+                self.tombstones.append(CanvasTombstone(item_type="connection", item_id=cid, version=self.version))
+        self.version += 1
+        self.tombstones.append(CanvasTombstone(item_type="thought", item_id=thought_id, version=self.version))
+
+
+def install(canvas: FakeCanvas) -> None:
+    cp = CoursePuzzle(
+        id=CP, course_id="course", position=1, title="Bench", puzzle_text="...", answer="",
+        primary_element="earth", why_this_trains_the_element="", domain_connection="",
+        bridge_back="", status="in_progress",
+    )
+
+    async def get_with_course(_id):
+        return cp, USER
+
+    def since_filter(rows, changed_since):
+        return [r for v, r in rows.values() if changed_since is None or v > changed_since]
+
+    async def thoughts(_id, changed_since=None):
+        return sorted(since_filter(canvas.thoughts, changed_since), key=lambda t: t.flow_order)
+
+    async def connections(_id, changed_since=None):
+        return since_filter(canvas.connections, changed_since)
+
+    async def get_version(_id):
+        return CanvasVersion(canvas_id=CP, version=canvas.version)
+
+    async def tombstones(_id, since):
+        return [t for t in canvas.tombstones if t.version > since]
+
+    routes.puzzle_repo = SimpleNamespace(get_with_course=get_with_course)
+    routes.thought_repo = SimpleNamespace(get_by_course_puzzle=thoughts)
+    routes.connection_repo = SimpleNamespace(get_by_course_puzzle=connections)
+    routes.canvas_version_repo = SimpleNamespace(get=get_version, get_tombstones=tombstones)
+    app.dependency_overrides[get_current_user] = lambda: {"db_user": SimpleNamespace(id=USER)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--thoughts", type=int, default=200)
+    parser.add_argument("--moves", type=int, default=3)
+    args = parser.parse_args()
+
+    canvas = FakeCanvas(args.thoughts)
+    install(canvas)
+    http = TestClient(app)
+    url = f"/api/canvas/{CP}"
+
+    first = http.get(url)
+    assert first.status_code == 200, first.text
+    etag, version = first.headers["etag"], first.json()["version"]
+    print(f"full snapshot ({args.thoughts} thoughts): {len(first.content):8d} bytes, ETag {etag}")
+
+    unchanged = http.get(url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    print(f"unchanged, If-None-Match:        {len(unchanged.content):8d} bytes (304)")
+
+    for i in range(args.moves):
+        _, t = canvas.thoughts[f"t{i:04d}"]
+        canvas.write_thought(t.model_copy(update={"pos_x": t.pos_x + 40}))
+    canvas.delete_thought(f"t{args.thoughts - 1:04d}")
+
+    stale = http.get(url, headers={"If-None-Match": etag})
+    assert stale.status_code == 200
+    delta = http.get(url, params={"since": version})
+    body = delta.json()
+    print(f"{args.moves} moved + 1 deleted, ?since={version}: {len(delta.content):8d} bytes "
+          f"({len(body['thoughts'])} thoughts, {len(body['deleted_thought_ids'])} + "
+          f"{len(body['deleted_connection_ids'])} tombstones)")
+    print(f"  vs full reload:                {len(stale.content):8d} bytes "
+          f"({len(stale.content) / len(delta.content):.0f}x)")
+
+    # Applying the delta to the first snapshot gives the same canvas as a full reload
+    merged = {t["id"]: t for t in first.json()["thoughts"]}
+    merged.update({t["id"]: t for t in body["thoughts"]})
+    for tid in body["deleted_thought_ids"]:
+        merged.pop(tid)
+    assert merged == {t["id"]: t for t in stale.json()["thoughts"]}
+    assert delta.headers["etag"] == stale.headers["etag"]
+
+
+if __name__ == "__main__":
+    main()
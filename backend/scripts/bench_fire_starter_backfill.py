@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Throughput of the Fire Starter image backfill engine vs the old serial loop.
+
+Replaces OpenAI + Storage with a render that takes `--render` seconds (and
+answers 429 once, to exercise the rate-limit pause) and Supabase with an
+in-memory table, then runs FireStarterImageBackfill over `--rows` rows.
+Prints throughput, the number of status writes (the old loop made 3 per
+row plus a 2.5s sleep between rows), and checks an interrupted run resumes
+from its checkpoint without rendering finished rows again.
+
+Usage (from backend/):
+  python scripts/bench_fire_starter_backfill.py --rows 60 --render 0.2 --concurrency 6
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+from app.services.fire_starter_backfill import (  # noqa: E402
+    BackfillCheckpoint,
+    FireStarterImageBackfill,
+)
+from app.services.image_pipeline import StoredImage  # noqa: E402
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class Crash(BaseException):
+    """Stands in for the process dying mid-run (not caught as a render failure)."""
+
+
+class MemoryTable:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def table(self, name):
+        return MemoryQuery(self.rows)
+
+
+class MemoryQuery:
+    def __init__(self, rows):
+        self.rows, self.after, self.count = rows, None, None
+
+    def select(self, *_a):
+        return self
+
+    def is_(self, *_a):
+        return self
+
+    def neq(self, *_a):
+        return self
+
+    def order(self, *_a):
+        return self
+
+    def limit(self, n):
+        self.count = n
+        return self
+
+    def gt(self, _col, value):
+        self.after = value
+        return self
+
+    def execute(self):
+        rows = sorted(
+            (r for r in self.rows.values()
+             if r["image_url"] is None and r["status"] != "failed"
+             and (self.after is None or r["id"] > self.after)),
+            key=lambda r: r["id"],
+        )
+        return SimpleNamespace(data=[dict(r) for r in rows[: self.count]])
+
+
+class FakeImageService:
+    def __init__(self, rows, render: float, crash_after: int | None = None):
+        self.rows = rows
+        self.supabase = MemoryTable(rows)
+        self.render = render
+        self.crash_after = crash_after
+        self.renders = 0
+        self.writes = 0
+        self.rate_limited_once = False
+        self._lock = threading.Lock()
+
+    def render_image_sync(self, row):
+        with self._lock:
+            if not self.rate_limited_once:
+                self.rate_limited_once = True
+                raise RateLimited("Rate limit reached for images per minute")
+            self.renders += 1
+            if self.crash_after is not None and self.renders > self.crash_after:
+                raise Crash
+        time.sleep(self.render)
+        return StoredImage(url=f"https://cdn.example/{row['id']}.png")
+
+    def mark_generating_sync(self, ids):
+        self.writes += 1
+
+    def apply_results_sync(self, results):
+        self.writes += 1
+        for r in results:
+            row = self.rows[r["id"]]
+            row["status"] = r["status"]
+            row["image_url"] = r["image_url"] or row["image_url"]
+        return len(results)
+
+
+def _rows(n):
+    return {f"{i:04d}": {"id": f"{i:04d}", "name": f"fs {i}", "description": "",
+                         "image_url": None, "status": "pending"} for i in range(n)}
+
+
+def _engine(service, checkpoint, args):
+    return FireStarterImageBackfill(
+        service, checkpoint, concurrency=args.concurrency,
+        rate_per_minute=args.rate_per_minute, burst=args.concurrency,
+        batch_size=args.batch_size, rate_limit_pause_seconds=0.2,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=60)
+    parser.add_argument("--render", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=6)
+    parser.add_argument("--rate-per-minute", type=float, default=1200.0)
+    parser.add_argument("--batch-size", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = BackfillCheckpoint(Path(tmp) / "backfill.jsonl")
+
+        service = FakeImageService(_rows(args.rows), args.render)
+        start = time.perf_counter()
+        stats = await _engine(service, checkpoint, args).run()
+        elapsed = time.perf_counter() - start
+        serial = args.rows * (args.render + 2.5)
+        print(f"{args.rows} rows: {elapsed:.2f}s ({stats.per_minute():.0f}/min), "
+              f"{service.writes} status writes, {stats.rate_limited} rate-limit pause(s)")
+        print(f"old serial loop: ~{serial:.0f}s, {args.rows * 3} status writes")
+        assert stats.completed == args.rows
+        assert all(r["image_url"] for r in service.rows.values())
+
+        # Interrupted run: the engine dies mid-way, a second run resumes
+        rows = _rows(args.rows)
+        crashing = FakeImageService(rows, args.render / 4, crash_after=args.rows // 2)
+        crashing.rate_limited_once = True
+        try:
+            await _engine(crashing, checkpoint, args).run()
+        except Crash:
+            pass
+        journaled = len(checkpoint.load())
+        resumed = FakeImageService(rows, args.render / 4)
+        resumed.rate_limited_once = True
+        stats = await _engine(resumed, checkpoint, args).run()
+        print(f"resume: {journaled} result(s) from checkpoint re-applied, "
+              f"{resumed.renders} rendered on resume (of {args.rows})")
+        assert all(r["image_url"] for r in rows.values())
+        assert resumed.renders == args.rows - journaled
+        assert not checkpoint.path.exists()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
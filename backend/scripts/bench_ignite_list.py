@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+GET /ignite cost as canvases grow.
+
+Points a real supabase-py client at a local PostgREST stand-in holding
+`--problems` Ignite problems with N thoughts each, then times the old
+listing (problems + every thought row + a second problems query) against
+the current single query that reads the trigger-maintained
+`user_thought_count` column. The old cost grows with N; the new one stays flat.
+
+Usage (from backend/):
+  python scripts/bench_ignite_list.py --problems 20 --sizes 10 100 1000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+from supabase import create_client  # noqa: E402
+
+from app.adapters.supabase_adapter import run_query  # noqa: E402
+from app.api import ignite_routes  # noqa: E402
+
+
+class Store:
+    def __init__(self):
+        self.problems: list[dict] = []
+        self.thoughts: list[dict] = []
+        self.requests = 0
+        self.rows_sent = 0
+
+    def fill(self, n_problems: int, thoughts_each: int) -> None:
+        self.problems = [
+            {
+                "id": f"p{i}", "title": f"Problem {i}", "description": "d", "course_id": "c1",
+                "status": "active", "created_at": "2026-01-01T00:00:00Z",
+                "applied_fire_starter_id": "fs-1", "user_thought_count": thoughts_each // 2,
+            }
+            for i in range(n_problems)
+        ]
+        self.thoughts = [
+            {"ignite_problem_id": f"p{i}", "is_terrain": j % 2 == 0, "is_fire_starter_node": False}
+            for i in range(n_problems)
+            for j in range(thoughts_each)
+        ]
+
+
+def _serve(store: Store) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            table = urlparse(self.path).path.rsplit("/", 1)[-1]
+            rows = store.thoughts if table == "ignite_thoughts" else store.problems
+            store.requests += 1
+            store.rows_sent += len(rows)
+            body = json.dumps(rows).encode()
+            self.send_response(200)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _legacy_list(client, user_id: str) -> list[dict]:
+    """The pre-counter implementation of GET /ignite."""
+    problems = (await run_query(
+        client.table("ignite_problems")
+        .select("id, title, description, course_id, status, created_at")
+        .eq("user_id", user_id)
+        .order("created_at", desc=True)
+    )).data or []
+    ids = [p["id"] for p in problems]
+    th_res = await run_query(
+        client.table("ignite_thoughts")
+        .select("ignite_problem_id, is_terrain, is_fire_starter_node")
+        .in_("ignite_problem_id", ids)
+    )
+    counts: dict[str, int] = {pid: 0 for pid in ids}
+    for row in th_res.data or []:
+        if row.get("is_terrain") or row.get("is_fire_starter_node"):
+            continue
+        counts[row["ignite_problem_id"]] += 1
+    enriched = (await run_query(
+        client.table("ignite_problems")
+        .select("id, title, description, course_id, status, created_at, applied_fire_starter_id")
+        .eq("user_id", user_id)
+        .in_("id", ids)
+        .order("created_at", desc=True)
+    )).data or problems
+    for p in enriched:
+        p["user_thought_count"] = counts[p["id"]]
+    return enriched
+
+
+async def _measure(store: Store, fn, runs: int) -> tuple[float, int, int]:
+    store.requests = store.rows_sent = 0
+    start = time.perf_counter()
+    for _ in range(runs):
+        await fn()
+    return (time.perf_counter() - start) / runs, store.requests // runs, store.rows_sent // runs
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--problems", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    store = Store()
+    server = _serve(store)
+    client = create_client(f"http://127.0.0.1:{server.server_port}", "bench")
+    ignite_routes.client = client
+    current_user = {"db_user": SimpleNamespace(id="u1")}
+
+    async def new():
+        return await ignite_routes.list_ignite_problems(course_id=None, current_user=current_user)
+
+    print(f"{args.problems} problems; thoughts per problem vs per-request cost")
+    print(f"{'thoughts':>9} | {'legacy ms':>9} {'reqs':>4} {'rows':>6} | {'current ms':>10} {'reqs':>4} {'rows':>5}")
+    for size in args.sizes:
+        store.fill(args.problems, size)
+        legacy = await _measure(store, lambda: _legacy_list(client, "u1"), args.runs)
+        current = await _measure(store, new, args.runs)
+        print(f"{size:>9} | {legacy[0] * 1000:9.1f} {legacy[1]:>4} {legacy[2]:>6} | "
+              f"{current[0] * 1000:10.1f} {current[1]:>4} {current[2]:>5}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
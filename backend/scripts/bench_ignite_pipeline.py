@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Stage timings for Ignite problem creation (POST /ignite/stream).
+
+Replaces the LLM with canned JSON answers that take a fixed time per stage
+(`--terrain`, `--match`, `--apply` seconds) and the Supabase client/repos with
+in-memory fakes, then runs the pipeline and prints when each SSE stage event
+arrives. Terrain mapping and puzzle matching run concurrently, so the first
+nodes show up after the terrain call alone and the whole pipeline takes
+about max(terrain, match) + apply instead of the sum of all three.
+
+Usage (from backend/):
+  python scripts/bench_ignite_pipeline.py --terrain 0.4 --match 0.3 --apply 0.4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+from app.api import ignite_routes  # noqa: E402
+
+TERRAIN = {
+    "nodes": [{"content": f"terrain {i}", "terrain_type": "fact"} for i in range(12)],
+    "connections": [{"from_index": i, "to_index": i + 1} for i in range(11)],
+}
+MATCH = {"best_course_puzzle_id": "cp-1"}
+APPLY = {
+    "nodes": [{"element": "earth", "content": f"move {i}", "flow_order": i + 1} for i in range(5)],
+    "anchor_terrain_index": 2,
+}
+
+
+class TimedLLM:
+    def __init__(self, terrain: float, match: float, apply: float):
+        self.delays = {"terrain": terrain, "match": match, "apply": apply}
+
+    async def generate_text(self, prompt, system="", max_tokens=1024, cache=False):
+        if "best_course_puzzle_id" in prompt:
+            stage, answer = "match", MATCH
+        elif "anchor_terrain_index" in prompt:
+            stage, answer = "apply", APPLY
+        else:
+            stage, answer = "terrain", TERRAIN
+        await asyncio.sleep(self.delays[stage])
+        return json.dumps(answer)
+
+
+class FakeQuery:
+    def __init__(self, table: str):
+        self.table = table
+        self.rows: list[dict] = []
+
+    def insert(self, rows):
+        self.rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def update(self, values):
+        return self
+
+    def eq(self, *_args):
+        return self
+
+    def execute(self):
+        return SimpleNamespace(data=[{**r, "id": str(uuid.uuid4())} for r in self.rows])
+
+
+class FakePuzzleRepo:
+    async def get_by_course(self, course_id):
+        return [SimpleNamespace(
+            id="cp-1", status="completed", title="Bench puzzle",
+            puzzle_text="p", primary_element="earth",
+        )]
+
+    async def get_by_id(self, course_puzzle_id):
+        return (await self.get_by_course(None))[0]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--terrain", type=float, default=0.4)
+    parser.add_argument("--match", type=float, default=0.3)
+    parser.add_argument("--apply", type=float, default=0.4)
+    args = parser.parse_args()
+
+    ignite_routes.llm = TimedLLM(args.terrain, args.match, args.apply)
+    ignite_routes.client = SimpleNamespace(table=FakeQuery)
+    ignite_routes.puzzle_repo = FakePuzzleRepo()
+    ignite_routes.settings.IGNITE_GRAPH_RPC = False
+
+    user = SimpleNamespace(id="u1")
+    starters = [{"id": "fs-1", "course_puzzle_id": "cp-1", "name": "Bench FS",
+                 "element_combination": ["earth"]}]
+
+    start = time.perf_counter()
+    arrivals = []
+    async for event in ignite_routes._ignite_pipeline(user, "Title", "Description", "c1", starters):
+        arrivals.append((event["stage"], time.perf_counter() - start, len(event.get("thoughts") or [])))
+        # Graph events carry the persisted connection rows, not index pairs
+        for c in event.get("connections") or []:
+            assert c["id"] and c["from_thought_id"] and c["to_thought_id"], c
+    total = arrivals[-1][1]
+
+    serial = args.terrain + args.match + args.apply
+    for stage, at, n in arrivals:
+        nodes = f"  ({n} nodes)" if n else ""
+        print(f"{stage:<13} {at * 1000:7.1f} ms{nodes}")
+    print(f"serial LLM sum: {serial * 1000:.0f} ms; pipeline total {total * 1000:.0f} ms")
+
+    first_nodes = next(at for stage, at, n in arrivals if n)
+    assert first_nodes < args.terrain + 0.1
+    assert total < serial - min(args.terrain, args.match) + 0.1
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Storage objects and image API calls with content addressing + prompt index.
+
+Runs FireStarterImageService.render_image_sync over `--starters` Fire
+Starters drawn from `--distinct` lessons, against a fake OpenAI client
+(deterministic PNG per prompt) and an in-memory Supabase (Storage bucket
+plus the generated_images / image_prompts / fire_starters / users tables).
+Then simulates `--regenerations` avatar regenerations, where only the last
+avatar stays referenced, and runs the garbage collector.
+
+Prints image API calls, stored objects, and what GC finds and deletes.
+
+Usage (from backend/):
+  python scripts/bench_image_dedupe.py --starters 40 --distinct 10 --regenerations 5
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import io
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+from app.services.fire_starter_image_service import STORAGE_BUCKET, FireStarterImageService  # noqa: E402
+from app.services.image_gc import collect_garbage  # noqa: E402
+from app.services.image_pipeline import PIL_AVAILABLE  # noqa: E402
+
+PUBLIC = f"https://storage.example/storage/v1/object/public/{STORAGE_BUCKET}/"
+
+
+def _png(seed: str) -> bytes:
+    if not PIL_AVAILABLE:
+        return hashlib.sha256(seed.encode()).digest() * 64
+    from PIL import Image
+    digest = hashlib.sha256(seed.encode()).digest()
+    buf = io.BytesIO()
+    Image.new("RGB", (1024, 1024), tuple(digest[:3])).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class FakeOpenAI:
+    def __init__(self):
+        self.calls = 0
+        self.images = SimpleNamespace(generate=self.generate)
+
+    def generate(self, model, prompt, **_kwargs):
+        self.calls += 1
+        # A fresh call never returns byte-identical output; seed with the count
+        b64 = base64.b64encode(_png(f"{prompt}:{self.calls}")).decode()
+        return SimpleNamespace(data=[SimpleNamespace(b64_json=b64, url=None)])
+
+
+class FakeBucket:
+    def __init__(self):
+        self.objects: dict[str, dict] = {}
+        self.uploads = 0
+
+    def upload(self, path, file, file_options=None):
+        self.uploads += 1
+        size = os.path.getsize(file) if isinstance(file, (str, Path)) else len(file)
+        old = datetime.now(timezone.utc) - timedelta(days=3)
+        self.objects[path] = {"size": size, "created_at": old.isoformat()}
+
+    def get_public_url(self, path):
+        return PUBLIC + path
+
+    def list(self, prefix, options):
+        prefix = f"{prefix}/" if prefix else ""
+        entries, folders = [], set()
+        for path, meta in sorted(self.objects.items()):
+            if not path.startswith(prefix):
+                continue
+            rest = path[len(prefix):]
+            if "/" in rest:
+                folders.add(rest.split("/", 1)[0])
+            else:
+                entries.append({"name": rest, "id": path, "created_at": meta["created_at"],
+                                "metadata": {"size": meta["size"]}})
+        entries += [{"name": f, "id": None} for f in sorted(folders)]
+        start = options["offset"]
+        return entries[start:start + options["limit"]]
+
+    def remove(self, paths):
+        for p in paths:
+            self.objects.pop(p, None)
+        return []
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table, self.filters = db, table, []
+        self.op, self.values, self.columns, self.negate = "select", None, "*", False
+
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+
+    def select(self, columns="*"):
+        self.columns = columns
+        return self
+
+    def eq(self, col, value):
+        self.filters.append(lambda r: r.get(col) == value)
+        return self
+
+    def is_(self, col, _null):
+        negate, self.negate = self.negate, False
+        self.filters.append(lambda r: (r.get(col) is None) != negate)
+        return self
+
+    def in_(self, col, values):
+        self.filters.append(lambda r: r.get(col) in values)
+        return self
+
+    def limit(self, _n):
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def upsert(self, row):
+        self.op, self.values = "upsert", row
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def execute(self):
+        rows = self.db.setdefault(self.table, [])
+        key = {"generated_images": "content_hash", "image_prompts": "prompt_hash"}.get(self.table, "id")
+        if self.op == "upsert":
+            rows[:] = [r for r in rows if r[key] != self.values[key]] + [dict(self.values)]
+            return SimpleNamespace(data=[self.values])
+        matched = [r for r in rows if all(f(r) for f in self.filters)]
+        if self.op == "delete":
+            rows[:] = [r for r in rows if r not in matched]
+            if self.table == "generated_images":
+                gone = {r["content_hash"] for r in matched}
+                prompts = self.db.get("image_prompts", [])
+                prompts[:] = [p for p in prompts if p["content_hash"] not in gone]
+            return SimpleNamespace(data=matched)
+        if "generated_images(" in self.columns:
+            images = {r["content_hash"]: r for r in self.db.get("generated_images", [])}
+            matched = [{**r, "generated_images": images.get(r["content_hash"])} for r in matched]
+        if hasattr(self, "window"):
+            matched = matched[self.window[0]:self.window[1]]
+        return SimpleNamespace(data=matched)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.db: dict[str, list] = {"fire_starters": [], "users": [], "sessions": []}
+        self.bucket = FakeBucket()
+        self.storage = SimpleNamespace(from_=lambda _name: self.bucket)
+
+    def table(self, name):
+        return FakeQuery(self.db, name)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--starters", type=int, default=40)
+    parser.add_argument("--distinct", type=int, default=10)
+    parser.add_argument("--regenerations", type=int, default=5)
+    args = parser.parse_args()
+
+    supabase = FakeSupabase()
+    openai = FakeOpenAI()
+    service = FireStarterImageService(openai, supabase)
+
+    for i in range(args.starters):
+        row = {"id": f"fs{i}", "name": "", "description": f"Lesson {i % args.distinct}"}
+        stored = service.render_image_sync(row)
+        supabase.db["fire_starters"].append(
+            {**row, "image_url": stored.url, "image_renditions": stored.renditions or None}
+        )
+    print(f"{args.starters} Fire Starters, {args.distinct} distinct lessons: "
+          f"{openai.calls} image API call(s) (was {args.starters}), "
+          f"{len(supabase.bucket.objects)} stored object(s)")
+    assert openai.calls == args.distinct
+
+    # Avatar regenerations: each one stores a new image; only the last is kept on the user
+    for n in range(args.regenerations):
+        avatar = service.images.store_b64(base64.b64encode(_png(f"avatar:{n}")).decode(), "avatars")
+        supabase.db["users"] = [{"id": "u1", "avatar_image_url": avatar.url_for_width(256)}]
+    supabase.db["fire_starters"] = supabase.db["fire_starters"][: args.starters // 2]
+
+    before = len(supabase.bucket.objects)
+    report = collect_garbage(supabase, STORAGE_BUCKET, min_age=timedelta(hours=24))
+    print(f"GC dry run: {report.objects} objects, {report.live} referenced, "
+          f"{len(report.garbage)} unreferenced ({report.garbage_bytes / 1024:.0f} KB)")
+    report = collect_garbage(supabase, STORAGE_BUCKET, min_age=timedelta(hours=24), delete=True)
+    after = len(supabase.bucket.objects)
+    print(f"GC --delete: {before} -> {after} objects, "
+          f"{len(supabase.db['generated_images'])} index row(s), "
+          f"{len(supabase.db['image_prompts'])} prompt(s) left")
+
+    kept = {p for r in supabase.db["fire_starters"] for p in [r["image_url"].replace(PUBLIC, "")]}
+    kept.add(supabase.db["users"][0]["avatar_image_url"].replace(PUBLIC, ""))
+    assert kept <= set(supabase.bucket.objects)
+    assert after < before
+
+
+if __name__ == "__main__":
+    main()
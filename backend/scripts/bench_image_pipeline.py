@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Memory and payload size of the generated-image pipeline.
+
+Serves a synthetic 1024x1024 PNG through an httpx mock (standing in for the
+temporary DALL-E URL) and stores it with a fake Storage bucket, once the
+old way (download into memory, upload the bytes) and once through
+ImageStore.store_from_url (stream to a temp file, upload from disk, cut
+renditions). Prints the peak Python heap of each path and the size of
+every stored object. Renditions need Pillow.
+
+Usage (from backend/):
+  python scripts/bench_image_pipeline.py
+"""
+from __future__ import annotations
+
+import io
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+import httpx  # noqa: E402
+
+from app.services import image_pipeline  # noqa: E402
+from app.services.image_pipeline import PIL_AVAILABLE, ImageStore  # noqa: E402
+
+URL = "https://dalle.example/img.png"
+
+
+def _source_png() -> bytes:
+    # Noisy gradient so PNG compression behaves like a real illustration
+    from PIL import Image
+    image = Image.effect_noise((1024, 1024), 64).convert("RGB")
+    image = Image.blend(image, Image.linear_gradient("L").resize((1024, 1024)).convert("RGB"), 0.5)
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class FakeBucket:
+    def __init__(self):
+        self.objects: dict[str, int] = {}
+
+    def upload(self, path, file, file_options=None):
+        if isinstance(file, (str, Path)):
+            # httpx streams a file body in chunks; read it the same way
+            size = 0
+            with open(file, "rb") as f:
+                while chunk := f.read(64 * 1024):
+                    size += len(chunk)
+        else:
+            size = len(file)
+        self.objects[path] = size
+
+    def get_public_url(self, path):
+        return f"https://storage.example/{path}"
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.bucket = FakeBucket()
+        self.storage = self
+
+    def from_(self, _name):
+        return self.bucket
+
+    def table(self, _name):
+        # Empty image index: every store is a first upload
+        return EmptyQuery()
+
+
+class EmptyQuery:
+    def __getattr__(self, _name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=[])
+
+
+def _old_path(http: httpx.Client, supabase: FakeSupabase) -> None:
+    response = http.get(URL)
+    image_data = response.content
+    supabase.storage.from_("generated-images").upload("old.png", image_data)
+
+
+def _peak(fn) -> int:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    if not PIL_AVAILABLE:
+        print("Pillow not installed: pip install Pillow")
+        return
+    png = _source_png()
+
+    def serve(request):
+        # Chunked body, as the bytes arrive off the network
+        return httpx.Response(200, content=(png[i:i + 16384] for i in range(0, len(png), 16384)))
+
+    http = httpx.Client(transport=httpx.MockTransport(serve))
+
+    old_peak = _peak(lambda: _old_path(http, FakeSupabase()))
+
+    # Pillow decodes into C buffers tracemalloc doesn't see, so the heap is
+    # measured on the copy path alone and renditions are sized separately
+    make_renditions = image_pipeline.make_renditions
+    image_pipeline.make_renditions = lambda path: []
+    stream_peak = _peak(lambda: ImageStore(FakeSupabase()).store_from_url(URL, "bench", http=http))
+    image_pipeline.make_renditions = make_renditions
+
+    new_supabase = FakeSupabase()
+    stored = ImageStore(new_supabase).store_from_url(URL, "bench", http=http)
+
+    print(f"source PNG: {len(png) / 1024:.0f} KB")
+    print(f"peak Python heap, download+upload in memory: {old_peak / 1024:7.0f} KB")
+    print(f"peak Python heap, streamed via temp file:    {stream_peak / 1024:7.0f} KB")
+    for path, size in sorted(new_supabase.bucket.objects.items()):
+        print(f"  stored {path.split('/')[-1][-12:]:>14}: {size / 1024:7.1f} KB")
+    small = stored.url_for_width(256)
+    small_size = new_supabase.bucket.objects[small.split("storage.example/")[1]]
+    print(f"256px card payload: {small_size / 1024:.1f} KB vs {len(png) / 1024:.0f} KB "
+          f"({len(png) / small_size:.0f}x smaller)")
+    assert stream_peak < old_peak
+    assert small_size < len(png) / 10
+
+
+if __name__ == "__main__":
+    main()
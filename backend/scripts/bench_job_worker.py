@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Job worker behaviour under load (app.worker.JobWorker).
+
+Runs the real worker loop against an in-memory queue that mimics
+claim_jobs (lease + attempt count, expired leases reclaimable). Enqueues
+`--jobs` puzzle jobs whose handler takes `--work` seconds and fails on the
+first attempt for every `--flaky`-th job, plus one job whose lease was left
+behind by a "crashed" worker. Prints peak concurrency per kind, retries and
+total time, and checks every job ends up succeeded.
+
+Usage (from backend/):
+  python scripts/bench_job_worker.py --jobs 12 --concurrency 3 --work 0.1
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+from app.domain.entities import JOB_FIRE_STARTER_IMAGE, JOB_PUZZLE_GENERATION, Job  # noqa: E402
+from app.ports.jobs import JobQueue  # noqa: E402
+from app.worker import JobWorker  # noqa: E402
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MemoryJobQueue(JobQueue):
+    def __init__(self):
+        self.jobs: dict[str, Job] = {}
+
+    async def enqueue(self, kind, payload, max_attempts=3):
+        job = Job(id=str(uuid.uuid4()), kind=kind, payload=payload,
+                  max_attempts=max_attempts, run_after=_now())
+        self.jobs[job.id] = job
+        return job
+
+    async def claim(self, kind, limit, worker_id, lease_seconds):
+        now = _now()
+        runnable = [
+            j for j in self.jobs.values()
+            if j.kind == kind and (
+                (j.status == "queued" and j.run_after <= now)
+                or (j.status == "running" and j.locked_until < now)
+            )
+        ]
+        claimed = []
+        for job in sorted(runnable, key=lambda j: j.run_after)[:limit]:
+            job.status, job.attempts = "running", job.attempts + 1
+            job.locked_by, job.locked_until = worker_id, now + timedelta(seconds=lease_seconds)
+            claimed.append(job.model_copy())
+        return claimed
+
+    async def complete(self, job_id, worker_id):
+        job = self.jobs[job_id]
+        if job.locked_by == worker_id:
+            job.status, job.locked_by, job.locked_until = "succeeded", None, None
+
+    async def fail(self, job_id, worker_id, error, retry_in_seconds):
+        job = self.jobs[job_id]
+        if job.locked_by != worker_id:
+            return
+        job.locked_by, job.locked_until, job.last_error = None, None, error
+        if retry_in_seconds is None:
+            job.status = "failed"
+        else:
+            job.status, job.run_after = "queued", _now() + timedelta(seconds=retry_in_seconds)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--work", type=float, default=0.1)
+    parser.add_argument("--flaky", type=int, default=4)
+    args = parser.parse_args()
+
+    queue = MemoryJobQueue()
+    active = {JOB_PUZZLE_GENERATION: 0, JOB_FIRE_STARTER_IMAGE: 0}
+    peak = dict(active)
+
+    def handler(kind):
+        async def run(job: Job) -> None:
+            active[kind] += 1
+            peak[kind] = max(peak[kind], active[kind])
+            try:
+                await asyncio.sleep(args.work)
+                if job.payload.get("flaky") and job.attempts == 1:
+                    raise RuntimeError("transient LLM error")
+            finally:
+                active[kind] -= 1
+        return run
+
+    for i in range(args.jobs):
+        await queue.enqueue(JOB_PUZZLE_GENERATION, {"course_id": f"c{i}", "flaky": i % args.flaky == 0})
+    for i in range(args.jobs // 2):
+        await queue.enqueue(JOB_FIRE_STARTER_IMAGE, {"fire_starter_id": f"f{i}"})
+    orphan = await queue.enqueue(JOB_PUZZLE_GENERATION, {"course_id": "orphan"})
+    orphan_row = queue.jobs[orphan.id]
+    orphan_row.status, orphan_row.attempts = "running", 1
+    orphan_row.locked_by, orphan_row.locked_until = "dead-worker", _now() - timedelta(seconds=1)
+
+    worker = JobWorker(
+        queue,
+        {JOB_PUZZLE_GENERATION: handler(JOB_PUZZLE_GENERATION),
+         JOB_FIRE_STARTER_IMAGE: handler(JOB_FIRE_STARTER_IMAGE)},
+        {JOB_PUZZLE_GENERATION: args.concurrency, JOB_FIRE_STARTER_IMAGE: 1},
+        lease_seconds=30, poll_seconds=0.02, retry_base_seconds=0.05,
+    )
+    start = time.perf_counter()
+    runner = asyncio.create_task(worker.run())
+    while any(j.status != "succeeded" for j in queue.jobs.values()):
+        if any(j.status == "failed" for j in queue.jobs.values()):
+            break
+        await asyncio.sleep(0.01)
+    worker.stop()
+    await runner
+    elapsed = time.perf_counter() - start
+
+    statuses = [j.status for j in queue.jobs.values()]
+    retried = sum(1 for j in queue.jobs.values() if j.attempts > 1)
+    print(f"{len(statuses)} jobs in {elapsed * 1000:.0f} ms "
+          f"({args.work * 1000:.0f} ms each, puzzle cap {args.concurrency}, image cap 1)")
+    print(f"peak concurrency: {peak}")
+    print(f"retried: {retried} (incl. reclaimed orphan, attempts={queue.jobs[orphan.id].attempts})")
+    print(f"statuses: { {s: statuses.count(s) for s in set(statuses)} }")
+
+    assert all(s == "succeeded" for s in statuses)
+    assert peak[JOB_PUZZLE_GENERATION] <= args.concurrency
+    assert peak[JOB_FIRE_STARTER_IMAGE] <= 1
+    assert queue.jobs[orphan.id].attempts == 2
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
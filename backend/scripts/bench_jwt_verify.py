@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Per-request cost of Clerk JWT verification.
+
+Serves a freshly generated RSA key as a JWKS document from a local asyncio
+HTTP server, points CLERK_JWKS_URL at it, and times `get_user_from_token`
+three ways:
+
+  legacy     - what every request used to do: scan the JWKS, re-parse the
+               JWK with RSAAlgorithm.from_jwk, then jwt.decode
+  key cached - JWKSManager lookup by kid + jwt.decode (first sight of a token)
+  memoized   - repeat of an already-verified token (claims served until exp)
+
+It also rotates the signing key mid-run to show an unknown kid triggers one
+refetch instead of failing until restart.
+
+Usage (from backend/):
+  python scripts/bench_jwt_verify.py --iterations 2000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+_jwks_doc: dict = {"keys": []}
+_fetches = 0
+
+
+def _new_key(kid: str):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private.public_key()))
+    jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return private, jwk
+
+
+def _token(private, kid: str, sub: str) -> str:
+    now = int(time.time())
+    return jwt.encode(
+        {"sub": sub, "email": f"{sub}@example.com", "iat": now, "exp": now + 600},
+        private,
+        algorithm="RS256",
+        headers={"kid": kid},
+    )
+
+
+async def _serve_jwks() -> asyncio.AbstractServer:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        global _fetches
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            _fetches += 1
+            body = json.dumps(_jwks_doc).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\nconnection: close\r\n"
+                + f"content-length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def _legacy_verify(token: str) -> dict:
+    kid = jwt.get_unverified_header(token).get("kid")
+    public_key = None
+    for key in _jwks_doc.get("keys", []):
+        if key.get("kid") == kid:
+            public_key = jwt.algorithms.RSAAlgorithm.from_jwk(key)
+    payload = jwt.decode(token, public_key, algorithms=["RS256"], options={"verify_aud": False}, leeway=60)
+    return {"user_id": payload.get("sub")}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    server = await _serve_jwks()
+    port = server.sockets[0].getsockname()[1]
+    os.environ["CLERK_JWKS_URL"] = f"http://127.0.0.1:{port}/.well-known/jwks.json"
+    os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+    os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+    os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+    from app.core import security  # noqa: E402
+
+    private, jwk = _new_key("kid-1")
+    _jwks_doc["keys"] = [jwk]
+    tokens = [_token(private, "kid-1", f"user_{i}") for i in range(args.iterations)]
+    n = args.iterations
+
+    start = time.perf_counter()
+    for t in tokens:
+        _legacy_verify(t)
+    legacy = (time.perf_counter() - start) / n
+
+    await security.get_user_from_token(tokens[0])  # initial JWKS fetch
+    start = time.perf_counter()
+    for t in tokens:
+        await security.get_user_from_token(t)
+    key_cached = (time.perf_counter() - start) / n
+
+    start = time.perf_counter()
+    for t in tokens:
+        await security.get_user_from_token(t)
+    memoized = (time.perf_counter() - start) / n
+
+    print(f"legacy:     {legacy * 1e6:8.1f} us/request")
+    print(f"key cached: {key_cached * 1e6:8.1f} us/request")
+    print(f"memoized:   {memoized * 1e6:8.1f} us/request")
+
+    # Real rotations land long after the last fetch; skip the refetch cooldown.
+    security.get_jwks_manager().min_refresh_interval = 0
+    fetches_before = _fetches
+    rotated, rotated_jwk = _new_key("kid-2")
+    _jwks_doc["keys"] = [jwk, rotated_jwk]
+    rotated_tokens = [_token(rotated, "kid-2", f"rotated_{i}") for i in range(20)]
+    results = await asyncio.gather(*(security.get_user_from_token(t) for t in rotated_tokens))
+    assert all(r["user_id"].startswith("rotated_") for r in results)
+    print(f"key rotation: 20 concurrent requests with a new kid -> "
+          f"{_fetches - fetches_before} JWKS fetch(es)")
+
+    server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
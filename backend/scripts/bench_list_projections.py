@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+PostgREST payload size of the list reads, `select("*")` vs projections.
+
+Builds `--rows` synthetic courses (an intake transcript of `--messages`
+turns plus the intake answers) and sessions (with an understanding document
+and conversation summary) shaped like production rows. Serialises the JSON
+PostgREST would return for `*` and for each column set in the repositories'
+COLUMNS, then checks that the course summaries are the same either way.
+
+Usage (from backend/):
+  python scripts/bench_list_projections.py --rows 50 --messages 16
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+from app.adapters.supabase_adapter import (  # noqa: E402
+    SupabaseCourseRepository, SupabaseSessionRepository,
+)
+from app.api.routes import _course_to_summary  # noqa: E402
+
+SENTENCE = "I keep getting stuck when the problem has too many moving parts at once. "
+
+
+def _ts(i: int) -> str:
+    return (datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(hours=i)).isoformat()
+
+
+def course_row(i: int, messages: int) -> dict:
+    transcript = [
+        {"role": "user" if m % 2 == 0 else "assistant", "content": SENTENCE * 5, "created_at": _ts(i + m)}
+        for m in range(messages)
+    ]
+    first = " ".join(transcript[0]["content"].split())
+    return {
+        "id": f"course-{i}", "user_id": "user-1", "intake_status": "complete",
+        "intake_messages": transcript,
+        "intake_preview": f"{first[:96]}…",
+        "crisp_statement": SENTENCE * 2, "course_label": "systems design", "domain": "engineering",
+        "what": SENTENCE * 3, "why": SENTENCE * 3, "blocker": SENTENCE * 3,
+        "effective_looks_like": SENTENCE * 3, "raw_quotes": [SENTENCE] * 4,
+        "course_status": "ready", "generation_error": None,
+        "generation_started_at": _ts(i), "generation_completed_at": _ts(i + 1),
+        "created_at": _ts(i), "updated_at": _ts(i + 1),
+    }
+
+
+def session_row(i: int) -> dict:
+    return {
+        "id": f"session-{i}", "user_id": "user-1", "puzzle_id": None,
+        "problem_description": SENTENCE * 2, "thinker_description": SENTENCE * 6,
+        "started_at": _ts(i), "ended_at": _ts(i + 1), "status": "completed",
+        "prompts_completed": 9, "created_at": _ts(i),
+        "cube_primary_color": "#aa3311", "cube_secondary_color": "#1133aa",
+        "cube_complexity": 3, "cube_label": "Moving Parts",
+        "cube_image_url": f"https://storage.example/avatars/{i:064d}_256.webp",
+        "understanding_document": SENTENCE * 60, "conversation_summary": SENTENCE * 20,
+        "summary_through": _ts(i + 1),
+    }
+
+
+def project(rows: list[dict], columns: str) -> list[dict]:
+    if columns == "*":
+        return rows
+    names = [c.strip() for c in columns.split(",")]
+    return [{n: r[n] for n in names} for r in rows]
+
+
+def size(rows: list[dict]) -> int:
+    return len(json.dumps(rows, separators=(",", ":")).encode("utf-8"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=16)
+    args = parser.parse_args()
+
+    courses = [course_row(i, args.messages) for i in range(args.rows)]
+    sessions = [session_row(i) for i in range(args.rows)]
+
+    reads = [
+        ("GET /user/courses", courses, SupabaseCourseRepository.COLUMNS["summary"]),
+        ("GET /user/sessions", sessions, SupabaseSessionRepository.COLUMNS["list"]),
+        ("GET /user/stats (sessions)", sessions, SupabaseSessionRepository.COLUMNS["stats"]),
+    ]
+    print(f"{args.rows} rows per list, {args.messages}-turn intakes")
+    for name, rows, columns in reads:
+        full, lean = size(rows), size(project(rows, columns))
+        print(f"  {name:28s} select(*) {full / 1024:8.1f} KB -> {lean / 1024:6.1f} KB "
+              f"({lean / full:.0%} of the bytes)")
+
+    repo = SupabaseCourseRepository.__new__(SupabaseCourseRepository)
+    summary = SupabaseCourseRepository.COLUMNS["summary"]
+    for full_row, lean_row in zip(courses, project(courses, summary)):
+        assert _course_to_summary(repo._row_to_course(full_row)) == \
+            _course_to_summary(repo._row_to_course(lean_row))
+    assert size(project(courses, summary)) < size(courses) / 5
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Repeat-call latency for cached LLM calls (generate_text(cache=True)).
+
+Replaces the Anthropic API with an httpx mock that answers after `--delay`
+seconds, then issues the same Ignite node nudge prompt `--calls` times,
+with and without the response cache, and prints mean latency plus the
+cache's hit rate. A whitespace-only variant of the prompt is included to
+show it maps to the same key.
+
+Usage (from backend/):
+  python scripts/bench_llm_cache.py --delay 0.3 --calls 10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+import anthropic  # noqa: E402
+
+try:  # newer anthropic SDKs take clients from their own httpx fork
+    import httpx2 as httpx  # noqa: E402
+except ImportError:
+    import httpx  # noqa: E402
+
+from app.adapters.claude_adapter import ClaudeStreamingAdapter  # noqa: E402
+from app.adapters.llm_cache_adapter import get_llm_response_cache  # noqa: E402
+from app.domain.services import ignite_node_nudge_prompt  # noqa: E402
+
+
+def _mock_client(delay: float, counter: list) -> anthropic.AsyncAnthropic:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        counter.append(1)
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={
+            "id": "msg_bench", "type": "message", "role": "assistant",
+            "model": "claude-sonnet-4-20250514",
+            "content": [{"type": "text", "text": "What would change if you tried it tomorrow?"}],
+            "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {"input_tokens": 60, "output_tokens": 12},
+        })
+
+    return anthropic.AsyncAnthropic(
+        api_key="bench", http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+
+async def _run(adapter, prompts, cache: bool) -> float:
+    start = time.perf_counter()
+    for prompt in prompts:
+        await adapter.generate_text(prompt=prompt, system="Be brief.", max_tokens=200, cache=cache)
+    return (time.perf_counter() - start) / len(prompts)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.3)
+    parser.add_argument("--calls", type=int, default=10)
+    args = parser.parse_args()
+
+    api_calls: list = []
+    adapter = ClaudeStreamingAdapter(_mock_client(args.delay, api_calls))
+    prompt = ignite_node_nudge_prompt("Ask the landlord about quiet hours", "earth", None)
+    prompts = [prompt] * (args.calls - 1) + [prompt.replace("\n", "\n  ")]
+
+    uncached = await _run(adapter, prompts, cache=False)
+    uncached_calls = len(api_calls)
+    cached = await _run(adapter, prompts, cache=True)
+    cached_calls = len(api_calls) - uncached_calls
+
+    print(f"{args.calls} identical nudge calls, {args.delay * 1000:.0f}ms per API call")
+    print(f"uncached: {uncached * 1000:7.1f} ms/call, {uncached_calls} API calls")
+    print(f"cached:   {cached * 1000:7.1f} ms/call, {cached_calls} API call(s)")
+    print(f"response cache: {get_llm_response_cache().stats()}")
+    assert cached_calls == 1
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
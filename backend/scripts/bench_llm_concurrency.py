@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for ClaudeStreamingAdapter.
+
+Runs N simultaneous `generate_stream_with_messages` calls against a local
+stand-in for the Anthropic Messages API (a tiny asyncio HTTP server that
+waits `--delay` seconds before replying with a canned SSE stream). With a
+non-blocking adapter the wall time for N streams should be close to the
+latency of one; a loop-blocking adapter serializes them to roughly N x delay.
+
+Usage (from backend/):
+  python scripts/bench_llm_concurrency.py --streams 20 --delay 0.5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import anthropic
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.adapters.claude_adapter import ClaudeStreamingAdapter  # noqa: E402
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _canned_stream(words: list[str]) -> bytes:
+    parts = [
+        _sse("message_start", {
+            "type": "message_start",
+            "message": {
+                "id": "msg_bench",
+                "type": "message",
+                "role": "assistant",
+                "model": "claude-sonnet-4-20250514",
+                "content": [],
+                "stop_reason": None,
+                "stop_sequence": None,
+                "usage": {"input_tokens": 10, "output_tokens": 0},
+            },
+        }),
+        _sse("content_block_start", {
+            "type": "content_block_start",
+            "index": 0,
+            "content_block": {"type": "text", "text": ""},
+        }),
+    ]
+    for w in words:
+        parts.append(_sse("content_block_delta", {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": w},
+        }))
+    parts += [
+        _sse("content_block_stop", {"type": "content_block_stop", "index": 0}),
+        _sse("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": len(words)},
+        }),
+        _sse("message_stop", {"type": "message_stop"}),
+    ]
+    return "".join(parts).encode("utf-8")
+
+
+async def _serve_stand_in(delay: float) -> asyncio.AbstractServer:
+    """Minimal HTTP/1.1 server that answers every POST with a canned SSE body."""
+    body = _canned_stream(["What ", "do ", "you ", "notice?"])
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode("latin-1").split("\r\n"):
+                    if line.lower().startswith("content-length:"):
+                        length = int(line.split(":", 1)[1])
+                await reader.readexactly(length)
+                await asyncio.sleep(delay)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"content-type: text/event-stream\r\n"
+                    + f"content-length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+async def _one_stream(adapter: ClaudeStreamingAdapter) -> str:
+    chunks = []
+    async for text in adapter.generate_stream_with_messages(
+        messages=[{"role": "user", "content": "hello"}],
+        system="bench",
+        max_tokens=50,
+    ):
+        chunks.append(text)
+    return "".join(chunks)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = await _serve_stand_in(args.delay)
+    port = server.sockets[0].getsockname()[1]
+    adapter = ClaudeStreamingAdapter(client=anthropic.AsyncAnthropic(
+        api_key="bench",
+        base_url=f"http://127.0.0.1:{port}",
+        max_retries=0,
+    ))
+
+    start = time.perf_counter()
+    await _one_stream(adapter)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_one_stream(adapter) for _ in range(args.streams)))
+    concurrent = time.perf_counter() - start
+
+    assert all(r == "What do you notice?" for r in results), results[:3]
+    print(f"1 stream:   {single:.3f}s")
+    print(f"{args.streams} streams: {concurrent:.3f}s "
+          f"({concurrent / single:.2f}x single, serial would be ~{args.streams}x)")
+
+    await adapter.client.close()
+    server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Database writes per active user while dragging canvas blocks.
+
+Simulates `--users` users, each dragging `--selected` blocks with one
+position update per block every `1 / --events-per-second` for `--seconds`,
+against a fake writer that takes `--write-ms` per call. Compares writing
+every update through (one UPDATE per block per event) with
+PositionWriteBuffer at `--interval` seconds, and prints write QPS per user,
+rows written, and the flush lag (how long a position waited in memory).
+
+Usage (from backend/):
+  python scripts/bench_position_writes.py --users 20 --selected 4 --seconds 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+from app.core.position_buffer import PositionWriteBuffer  # noqa: E402
+
+
+class FakeDB:
+    def __init__(self, write_ms: float):
+        self.write_s = write_ms / 1000
+        self.calls = 0
+        self.rows = 0
+        self.positions: dict[str, tuple[float, float]] = {}
+
+    async def write(self, user_id, rows) -> int:
+        self.calls += 1
+        self.rows += len(rows)
+        await asyncio.sleep(self.write_s)
+        for thought_id, x, y in rows:
+            self.positions[thought_id] = (x, y)
+        return len(rows)
+
+
+async def _drag(args, user: int, send) -> None:
+    step = 1 / args.events_per_second
+    for tick in range(int(args.seconds * args.events_per_second)):
+        await send(f"u{user}", [(f"u{user}-t{b}", float(tick), float(b)) for b in range(args.selected)])
+        await asyncio.sleep(step)
+
+
+async def _direct(args) -> FakeDB:
+    db = FakeDB(args.write_ms)
+
+    async def send(user_id, rows):
+        # Old path: each block's PATCH is its own UPDATE
+        await asyncio.gather(*(db.write(user_id, [row]) for row in rows))
+
+    await asyncio.gather(*(_drag(args, u, send) for u in range(args.users)))
+    return db
+
+
+async def _buffered(args) -> tuple[FakeDB, PositionWriteBuffer]:
+    db = FakeDB(args.write_ms)
+    buf = PositionWriteBuffer("bench", db.write, args.interval, max_pending=100_000)
+
+    async def send(user_id, rows):
+        buf.add(user_id, rows)
+
+    await asyncio.gather(*(_drag(args, u, send) for u in range(args.users)))
+    await buf.stop()
+    return db, buf
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--selected", type=int, default=4)
+    parser.add_argument("--events-per-second", type=float, default=20.0)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--write-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    direct = asyncio.run(_direct(args))
+    direct_s = time.monotonic() - started
+    started = time.monotonic()
+    buffered, buf = asyncio.run(_buffered(args))
+    buffered_s = time.monotonic() - started
+
+    def qps(db, elapsed):
+        return db.calls / elapsed / args.users
+
+    print(f"{args.users} users x {args.selected} blocks @ {args.events_per_second:g} events/s "
+          f"for {args.seconds:g}s")
+    print(f"  write-through: {direct.calls:6d} writes, {direct.rows:6d} rows, "
+          f"{qps(direct, direct_s):6.2f} writes/s per user")
+    print(f"  buffered {args.interval:g}s:  {buffered.calls:6d} writes, {buffered.rows:6d} rows, "
+          f"{qps(buffered, buffered_s):6.2f} writes/s per user")
+    stats = buf.stats()
+    print(f"  coalesced {stats['coalesced']} of {stats['received']} updates; "
+          f"flush lag max {stats['max_lag_ms']:.0f} ms; {stats['pending']} left pending")
+    print(f"  reduction: {direct.calls / buffered.calls:.0f}x fewer writes")
+    assert buffered.positions == direct.positions
+    assert direct.calls / buffered.calls >= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Prompt caching check for multi-turn Claude conversations.
+
+Offline (default): prints the size of each large system prompt against
+Sonnet's 1024-token caching minimum. This shows why the system prompt gets
+no breakpoint of its own. It then sends a conversation through
+generate_stream_with_messages and checks the request shape: the system
+prompt goes as a plain string and the newest turn carries the
+`cache_control` breakpoint. No API key needed; the API is replaced by an
+httpx mock that reports cache reads after the first call.
+
+--live: replays a `--runs`-turn canvas chat against the real API and prints
+time-to-first-token and cached vs uncached input tokens per turn. Needs
+ANTHROPIC_API_KEY.
+
+Usage (from backend/):
+  python scripts/bench_prompt_cache.py
+  python scripts/bench_prompt_cache.py --live --runs 3
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+import anthropic  # noqa: E402
+
+try:  # newer anthropic SDKs take clients from their own httpx fork
+    import httpx2 as httpx  # noqa: E402
+except ImportError:
+    import httpx  # noqa: E402
+
+from app.adapters import claude_adapter  # noqa: E402
+from app.api import routes  # noqa: E402
+from app.domain.entities import Thought  # noqa: E402
+from app.domain.services import build_intake_chatbot_system_prompt, ignite_guide_system_prompt  # noqa: E402
+
+
+def _thoughts(n: int, kind: str) -> list[Thought]:
+    return [
+        Thought(id=f"{kind}{i}", course_puzzle_id="cp", user_id="u", content=f"{kind} {i} text",
+                flow_order=i, kind=kind)
+        for i in range(n)
+    ]
+
+
+def _puzzle(title: str):
+    return SimpleNamespace(title=title, puzzle_text=f"{title} prompt", primary_element="earth")
+
+
+SONNET_MIN_CACHE_TOKENS = 1024
+
+
+def _prompts() -> dict:
+    course = SimpleNamespace(crisp_statement="ship more", domain="work")
+    return {
+        "intake": build_intake_chatbot_system_prompt(),
+        "ignite guide": ignite_guide_system_prompt(
+            problem_title="A", problem_description="A description", terrain_summary="- A terrain",
+        ),
+        "canvas chat": routes._build_canvas_chat_system_prompt(
+            stage=1, cp=_puzzle("A"), user_thoughts=_thoughts(3, "thought"),
+            nudge_thoughts=[], reflection_thoughts=[], connections=[],
+        ),
+        "stage 3 chat": routes._build_stage3_chat_system_prompt(
+            _puzzle("A"), course, "bridge", user_thoughts=_thoughts(3, "thought"),
+        ),
+    }
+
+
+def _conversation(turns: int) -> list[dict]:
+    messages = []
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"Turn {i}: here is what I tried on the canvas and why."})
+        messages.append({"role": "assistant", "content": f"Reply {i}: which of those blocks surprised you most?"})
+    messages.append({"role": "user", "content": "What should I look at next?"})
+    return messages
+
+
+async def _drain(stream) -> None:
+    async for _text in stream:
+        pass
+
+
+async def _offline() -> None:
+    print(f"{'prompt':<14} {'~tokens':>8}  cacheable alone (>= {SONNET_MIN_CACHE_TOKENS})")
+    for name, system in _prompts().items():
+        print(f"{name:<14} {len(system) // 4:>8}  {len(system) // 4 >= SONNET_MIN_CACHE_TOKENS}")
+
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        sent.append(body)
+        cached = len(sent) > 1
+        usage = {
+            "input_tokens": 40,
+            "cache_creation_input_tokens": 0 if cached else 1500,
+            "cache_read_input_tokens": 1500 if cached else 0,
+            "output_tokens": 5,
+        }
+        message = {
+            "id": "msg_bench", "type": "message", "role": "assistant", "model": body["model"],
+            "content": [], "stop_reason": None, "stop_sequence": None, "usage": usage,
+        }
+        events = [
+            ("message_start", {"type": "message_start", "message": message}),
+            ("content_block_start", {"type": "content_block_start", "index": 0,
+                                     "content_block": {"type": "text", "text": ""}}),
+            ("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                     "delta": {"type": "text_delta", "text": "ok"}}),
+            ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+            ("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn"},
+                               "usage": {"output_tokens": 5}}),
+            ("message_stop", {"type": "message_stop"}),
+        ]
+        sse = "".join(f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in events)
+        return httpx.Response(200, content=sse.encode(), headers={"content-type": "text/event-stream"})
+
+    client = anthropic.AsyncAnthropic(
+        api_key="bench", http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    adapter = claude_adapter.ClaudeStreamingAdapter(client)
+    system = _prompts()["canvas chat"]
+    for turns in (2, 3):
+        await _drain(adapter.generate_stream_with_messages(_conversation(turns), system=system, max_tokens=10))
+
+    body = sent[0]
+    assert body["system"] == system
+    last = body["messages"][-1]["content"]
+    assert last[-1]["cache_control"] == {"type": "ephemeral"}
+    assert all(isinstance(m["content"], str) for m in body["messages"][:-1])
+    print(f"system sent as a plain string; breakpoint on message {len(body['messages'])} of {len(body['messages'])}")
+    print(f"usage after 2 turns: {claude_adapter.llm_usage.snapshot()}")
+
+
+async def _live(runs: int) -> None:
+    adapter = claude_adapter.ClaudeStreamingAdapter()
+    system = _prompts()["canvas chat"]
+    for i in range(runs):
+        before = dict(claude_adapter.llm_usage.totals)
+        start = time.perf_counter()
+        first = None
+        async for _text in adapter.generate_stream_with_messages(_conversation(i + 1), system=system, max_tokens=60):
+            first = first or time.perf_counter()
+        after = claude_adapter.llm_usage.totals
+        delta = {k: after[k] - before[k] for k in after}
+        print(f"call {i + 1}: ttft {(first - start) * 1000:.0f}ms "
+              f"cache_read={delta['cache_read_input_tokens']} "
+              f"cache_write={delta['cache_creation_input_tokens']} "
+              f"uncached={delta['input_tokens']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(_live(args.runs) if args.live else _offline())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Rate limiter check + microbenchmark.
+
+1. Times `is_allowed` on the in-memory backend against the old list-based
+   limiter on busy keys (the old cost grows with hits in the window), and
+   shows idle keys get swept.
+2. Starts a minimal Redis-protocol stand-in (INCRBY/DECRBY/GET/MGET/EXPIRE over
+   RESP2, so the client is pinned to protocol=2) and runs two RateLimiter instances - two "workers" - against it
+   to show a limit holds across processes instead of multiplying.
+
+Usage (from backend/):
+  python scripts/bench_rate_limiter.py --keys 100 --checks 50000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import socketserver
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+import redis  # noqa: E402
+
+from app.core.rate_limiter import InMemoryBackend, RateLimiter, RedisBackend  # noqa: E402
+
+
+class ListRateLimiter:
+    """The previous implementation: a (timestamp, count) list per key."""
+
+    def __init__(self):
+        self.requests = defaultdict(list)
+
+    def is_allowed(self, key: str, max_requests: int, window_seconds: int) -> bool:
+        cutoff = time.time() - window_seconds
+        self.requests[key] = [(ts, c) for ts, c in self.requests[key] if ts > cutoff]
+        if sum(c for _, c in self.requests[key]) >= max_requests:
+            return False
+        self.requests[key].append((time.time(), 1))
+        return True
+
+
+class _RespStandIn(socketserver.StreamRequestHandler):
+    store: dict = {}
+    lock = threading.Lock()
+
+    def _read_command(self) -> list[bytes] | None:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def _bulk(self, value: bytes | None) -> bytes:
+        return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def handle(self) -> None:
+        while (args := self._read_command()) is not None:
+            cmd = args[0].upper()
+            with self.lock:
+                if cmd in (b"INCRBY", b"DECRBY"):
+                    step = int(args[2]) if cmd == b"INCRBY" else -int(args[2])
+                    n = int(self.store.get(args[1], b"0")) + step
+                    self.store[args[1]] = str(n).encode()
+                    reply = b":%d\r\n" % n
+                elif cmd == b"GET":
+                    reply = self._bulk(self.store.get(args[1]))
+                elif cmd == b"MGET":
+                    reply = b"*%d\r\n" % (len(args) - 1) + b"".join(
+                        self._bulk(self.store.get(k)) for k in args[1:]
+                    )
+                elif cmd == b"EXPIRE":
+                    reply = b":1\r\n"
+                elif cmd == b"PING":
+                    reply = b"+PONG\r\n"
+                elif cmd == b"CLIENT":
+                    reply = b"+OK\r\n"
+                else:
+                    reply = b"-ERR unknown command '%s'\r\n" % cmd
+            self.wfile.write(reply)
+
+
+def _time_checks(limiter, keys: list[str], checks: int) -> float:
+    start = time.perf_counter()
+    for _ in range(checks):
+        limiter.is_allowed(random.choice(keys), 200, 3600)
+    return (time.perf_counter() - start) / checks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=100)
+    parser.add_argument("--checks", type=int, default=50000)
+    args = parser.parse_args()
+
+    keys = [f"course_intake:user_{i}" for i in range(args.keys)]
+    random.seed(0)
+    old = _time_checks(ListRateLimiter(), keys, args.checks)
+    random.seed(0)
+    new = _time_checks(RateLimiter(InMemoryBackend()), keys, args.checks)
+    print(f"in-memory, {args.keys} keys, 200/hour limit:")
+    print(f"  list limiter:           {old * 1e6:6.2f} us/check")
+    print(f"  sliding window counter: {new * 1e6:6.2f} us/check")
+
+    backend = InMemoryBackend(sweep_interval=0.0)
+    now_window = int(time.time() // 60)
+    backend.incr("idle:user", now_window - 5, 60)
+    backend.incr("active:user", now_window, 60)
+    assert len(backend) == 1
+    print(f"  idle keys swept: yes ({len(backend)} live key left)")
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _RespStandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    workers = [
+        RateLimiter(RedisBackend(redis.Redis(host="127.0.0.1", port=port, protocol=2)))
+        for _ in range(2)
+    ]
+    allowed = sum(
+        workers[i % 2].is_allowed("session_start:user_1", 10, 3600) for i in range(40)
+    )
+    remaining = workers[0].get_remaining("session_start:user_1", 10, 3600)
+    print(f"redis stand-in, 2 workers, 10/hour limit, 40 attempts: "
+          f"{allowed} allowed, {remaining} remaining")
+    assert allowed == 10 and remaining == 0
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Per-turn prompt size for /session/{id}/chat over a long session.
+
+Drives the real `chat_with_session` handler for `--turns` turns against
+in-memory session/message repositories and a fake LLM, records the size of
+every chat prompt it sends (~4 chars per token), and compares it with the
+full-transcript prompt the endpoint used to build for the same turn.
+Compaction runs as in production (background task after the reply).
+
+Usage (from backend/):
+  python scripts/bench_session_chat_tokens.py --turns 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+from app.api import routes  # noqa: E402
+from app.api.schemas import ChatRequest  # noqa: E402
+from app.domain.entities import Session, SessionStatus  # noqa: E402
+from app.domain.services import build_batched_chat_prompt  # noqa: E402
+
+PROBLEM = "Three students, one lies. Who is the math major? " * 3
+USER_TURN = "I think if the black-haired student is telling the truth then the other claim breaks, turn {}"
+DOC = "At least one is lying.\nIf black-hair tells truth -> math major.\nThen red-hair claim conflicts."
+
+
+class MemorySessions:
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def get_by_id(self, session_id):
+        return self.session.model_copy()
+
+    async def update(self, session_id, **kwargs):
+        self.session = self.session.model_copy(update=kwargs)
+        return self.session
+
+
+class MemoryMessages:
+    def __init__(self):
+        self.rows = []
+        self.clock = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    async def create(self, message):
+        self.clock += timedelta(seconds=1)
+        row = message.model_copy(update={"id": str(len(self.rows)), "created_at": self.clock})
+        self.rows.append(row)
+        return row
+
+    async def get_all_for_session(self, session_id):
+        return list(self.rows)
+
+    async def get_for_session_since(self, session_id, after):
+        return [m for m in self.rows if after is None or m.created_at > after]
+
+
+class RecordingLLM:
+    def __init__(self):
+        self.chat_prompts = []
+
+    async def generate_text(self, prompt, system="", max_tokens=1500, cache=False):
+        if prompt.startswith("Compress a coaching conversation"):
+            return "Tried assuming black-hair truthful; found a conflict with red-hair's claim. " * 2
+        self.chat_prompts.append(prompt)
+        return json.dumps({"element": "air", "response": "Why does that conflict?", "understanding": DOC})
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    sessions = MemorySessions(Session(
+        id="s1", user_id="u1", problem_description=PROBLEM, started_at=now,
+        status=SessionStatus.IN_PROGRESS, understanding_document=DOC,
+    ))
+    messages = MemoryMessages()
+    llm = RecordingLLM()
+    routes.session_repo = sessions
+    routes.element_message_repo = messages
+    routes.llm_client = llm
+    routes.rate_limit_user = lambda *_args: True
+    user = {"db_user": SimpleNamespace(id="u1")}
+
+    legacy_sizes = []
+    for turn in range(1, args.turns + 1):
+        text = USER_TURN.format(turn)
+        history_before = [{"role": m.role, "message_text": m.message_text} for m in messages.rows]
+        legacy_sizes.append(len(build_batched_chat_prompt(
+            problem_description=PROBLEM,
+            conversation_history=history_before + [{"role": "user", "message_text": text}],
+            user_message=text,
+            existing_document=DOC,
+        )))
+        await routes.chat_with_session("s1", ChatRequest(user_message=text), current_user=user)
+        if routes._BACKGROUND_TASKS:
+            await asyncio.gather(*routes._BACKGROUND_TASKS)
+
+    sizes = [len(p) for p in llm.chat_prompts]
+    print(f"{'turn':>4} {'full transcript ~tok':>21} {'rolling ~tok':>13}")
+    for turn in (1, 5, 10, 20, 30, 40, args.turns):
+        if turn <= args.turns:
+            print(f"{turn:>4} {legacy_sizes[turn - 1] // 4:>21} {sizes[turn - 1] // 4:>13}")
+    print(f"total prompt ~tokens over {args.turns} turns: "
+          f"full {sum(legacy_sizes) // 4}, rolling {sum(sizes) // 4}")
+    print(f"summary checkpoint: {sessions.session.summary_through}")
+
+    tail = sizes[len(sizes) // 2:]
+    assert max(tail) < 1.25 * min(tail), "per-turn prompt size should stay flat"
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for Supabase queries issued from async handlers.
+
+Points a real supabase-py client at a local stand-in for PostgREST (a
+threaded HTTP server that sleeps `--delay` seconds per request) and fires
+`--requests` concurrent user lookups two ways:
+
+  inline     - `.execute()` called directly inside the coroutine (the old
+               behaviour; each call blocks the event loop)
+  run_query  - the bounded executor in app.adapters.supabase_adapter
+
+With inline execution the wall time is ~requests x delay; with run_query it
+is ~ceil(requests / SUPABASE_MAX_CONCURRENCY) x delay.
+
+Usage (from backend/):
+  python scripts/bench_supabase_throughput.py --requests 32 --delay 0.1
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+# Settings are validated at import time; the stand-in needs no real credentials.
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench")
+os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+
+from supabase import create_client  # noqa: E402
+
+from app.adapters.supabase_adapter import run_query  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+USER_ROW = {"id": "00000000-0000-0000-0000-000000000001", "clerk_id": "user_bench"}
+
+
+def _serve_stand_in(delay: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            time.sleep(delay)
+            body = json.dumps([USER_ROW]).encode()
+            self.send_response(200)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _inline(client) -> dict:
+    return client.table("users").select("*").eq("clerk_id", "user_bench").execute().data[0]
+
+
+async def _pooled(client) -> dict:
+    return (await run_query(client.table("users").select("*").eq("clerk_id", "user_bench"))).data[0]
+
+
+async def _timed(fn, client, n: int) -> float:
+    start = time.perf_counter()
+    rows = await asyncio.gather(*(fn(client) for _ in range(n)))
+    elapsed = time.perf_counter() - start
+    assert all(r == USER_ROW for r in rows), rows[:3]
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--delay", type=float, default=0.1)
+    args = parser.parse_args()
+
+    server = _serve_stand_in(args.delay)
+    client = create_client(f"http://127.0.0.1:{server.server_port}", "bench")
+
+    inline = await _timed(_inline, client, args.requests)
+    pooled = await _timed(_pooled, client, args.requests)
+
+    print(f"{args.requests} lookups, {args.delay:.3f}s each, "
+          f"SUPABASE_MAX_CONCURRENCY={settings.SUPABASE_MAX_CONCURRENCY}")
+    print(f"inline:    {inline:.3f}s ({args.requests / inline:.1f} req/s)")
+    print(f"run_query: {pooled:.3f}s ({args.requests / pooled:.1f} req/s)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Concurrency check for SupabaseCourseRepository.append_intake_message.
+
+Creates a throwaway draft course for an existing user, fires `--messages`
+appends at once, then re-reads the course and checks that every message
+arrived exactly once and the draft moved to in_progress. The course is
+deleted afterwards. Needs migration 022 applied and real Supabase
+credentials in backend/.env.
+
+Usage (from backend/):
+  python scripts/check_intake_append_concurrency.py --user-id <users.id> --messages 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.adapters.supabase_adapter import SupabaseCourseRepository, run_query  # noqa: E402
+from app.domain.entities import IntakeMessage  # noqa: E402
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--user-id", required=True, help="users.id to own the throwaway course")
+    parser.add_argument("--messages", type=int, default=50)
+    args = parser.parse_args()
+
+    repo = SupabaseCourseRepository()
+    course = await repo.create(args.user_id)
+    try:
+        await asyncio.gather(*(
+            repo.append_intake_message(course.id, IntakeMessage(role="user", content=f"msg {i}"))
+            for i in range(args.messages)
+        ))
+        stored = await repo.get_by_id(course.id)
+        contents = [m.content for m in stored.intake_messages]
+        expected = {f"msg {i}" for i in range(args.messages)}
+        lost = expected - set(contents)
+        print(f"sent {args.messages}, stored {len(contents)}, lost {len(lost)}, "
+              f"intake_status={stored.intake_status}")
+        ok = not lost and len(contents) == args.messages and stored.intake_status == "in_progress"
+        print("OK" if ok else "FAIL")
+        return 0 if ok else 1
+    finally:
+        await run_query(repo.client.table("courses").delete().eq("id", course.id))
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Concurrency check for SupabaseThoughtRepository flow_order allocation.
+
+Fires `--thoughts` creates (thoughts and reflections mixed) at one canvas
+at once, then checks every new thought got a distinct flow_order and that
+they form one contiguous run after the canvas's previous maximum. The
+thoughts are deleted afterwards. Needs migration 031 applied and real
+Supabase credentials in backend/.env.
+
+Usage (from backend/):
+  python scripts/check_thought_flow_order_concurrency.py \\
+      --course-puzzle-id <course_puzzles.id> --user-id <users.id> --thoughts 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.adapters.supabase_adapter import SupabaseThoughtRepository, run_query  # noqa: E402
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--course-puzzle-id", required=True)
+    parser.add_argument("--user-id", required=True, help="users.id owning the canvas")
+    parser.add_argument("--thoughts", type=int, default=50)
+    args = parser.parse_args()
+
+    repo = SupabaseThoughtRepository()
+    before = await repo.get_by_course_puzzle(args.course_puzzle_id)
+    start = max((t.flow_order for t in before), default=0)
+
+    def create(i: int):
+        if i % 5 == 4:
+            return repo.create_reflection(
+                args.course_puzzle_id, args.user_id, f"flow check reflection {i}", None, None, 0, 0,
+            )
+        return repo.create(
+            args.course_puzzle_id, args.user_id, f"flow check {i}", None, None, 0, 0, None,
+        )
+
+    created = await asyncio.gather(*(create(i) for i in range(args.thoughts)))
+    try:
+        orders = sorted(t.flow_order for t in created)
+        duplicates = len(orders) - len(set(orders))
+        contiguous = orders == list(range(orders[0], orders[0] + len(orders)))
+        print(f"created {len(created)}, flow_order {orders[0]}..{orders[-1]} "
+              f"(previous max {start}), duplicates {duplicates}, contiguous {contiguous}")
+        ok = duplicates == 0 and contiguous and orders[0] > start
+        print("OK" if ok else "FAIL")
+        return 0 if ok else 1
+    finally:
+        await run_query(
+            repo.client.table("thoughts").delete().in_("id", [t.id for t in created])
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
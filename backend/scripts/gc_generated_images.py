@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Find (and with --delete, remove) generated images nothing references.
+
+Objects in the generated-images bucket whose original and renditions are
+not referenced by any Fire Starter, user avatar or session, and that are
+older than --min-age-hours, are garbage. Session backgrounds are never
+collected. Without --delete this only reports.
+
+Usage (from backend/):
+  python scripts/gc_generated_images.py
+  python scripts/gc_generated_images.py --delete --min-age-hours 48
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+load_dotenv(BACKEND_ROOT / ".env")
+
+from app.adapters.supabase_adapter import get_supabase_client  # noqa: E402
+from app.services.fire_starter_image_service import STORAGE_BUCKET  # noqa: E402
+from app.services.image_gc import collect_garbage  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delete", action="store_true", help="remove the garbage (default: report only)")
+    parser.add_argument("--min-age-hours", type=float, default=24.0)
+    parser.add_argument("--bucket", default=STORAGE_BUCKET)
+    args = parser.parse_args()
+
+    report = collect_garbage(
+        get_supabase_client(),
+        bucket_name=args.bucket,
+        min_age=timedelta(hours=args.min_age_hours),
+        delete=args.delete,
+    )
+    print(f"{report.objects} object(s): {report.live} referenced, "
+          f"{report.protected} kept (recent or session backgrounds), "
+          f"{len(report.garbage)} unreferenced ({report.garbage_bytes / 1024 / 1024:.1f} MB)")
+    if args.delete:
+        print(f"Deleted {report.deleted} object(s).")
+    elif report.garbage:
+        for obj in report.garbage[:20]:
+            print(f"  {obj.path}")
+        if len(report.garbage) > 20:
+            print(f"  ... and {len(report.garbage) - 20} more")
+        print("Re-run with --delete to remove them.")
+
+
+if __name__ == "__main__":
+    main()